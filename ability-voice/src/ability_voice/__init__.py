@@ -9,21 +9,72 @@ Environment Variables:
     KADI_MODE: Transport mode (native, stdio, broker)
     KADI_NETWORK: Network scope for this ability
     WHISPER_MODEL: Whisper model to use (default: tiny.en)
+    WHISPER_QUANTIZE: "int8" for dynamically quantized CPU inference (default: none)
+    WHISPER_QUANTIZED_DIR: Cache for quantized models (default: ~/.cache/whisper/quantized)
+    WHISPER_PROFILE: Default decoding profile: fast, balanced, accurate (default: balanced)
+    WHISPER_MODEL_MEMORY_MB: Budget for models resident at once (default: 2048)
+    WHISPER_WORKERS: Worker processes for transcription (default: 0 = in-process)
+    WHISPER_MAX_PENDING: Queued transcriptions before new calls wait, or are rejected with reject_if_busy (default: 32)
+    WHISPER_QUEUE_SIZE: In-process inference queue bound (default: 8)
+    WHISPER_BATCH_SIZE: Max concurrent clips decoded in one pass (default: 1 = no batching)
+    WHISPER_BATCH_WAIT_MS: Max latency added while a batch fills (default: 25)
+    WHISPER_CACHE_MB: Memory budget for cached transcriptions (default: 0 = no cache)
+    WHISPER_CACHE_DIR: Directory for a persistent transcription cache (default: none)
+    WHISPER_STREAM_FILE_SECONDS: Files longer than this are transcribed window
+        by window with constant memory (default: 600)
     PIPER_VOICE: Piper voice model (default: en_US-lessac-medium)
+    TTS_MAX_VOICES: Piper voices kept loaded at once (default: 3)
+    TTS_WORKERS: Piper processes per voice; long texts are synthesized across
+        them sentence by sentence (default: 2, at most the core count)
+    TTS_SENTENCE_SILENCE_MS: Silence between sentences (default: 200)
+    TTS_CACHE_MB: Memory budget for cached phrases (default: 32, 0 = no cache)
+    TTS_CACHE_DIR: Directory for a persistent FLAC phrase cache (default: none)
+    TTS_CACHE_DISK_MB: Size cap for the persistent phrase cache (default: 256)
+    TTS_CACHE_WARM: File of phrases (one per line) cached at startup (default: none)
+    KADI_WARMUP: Load and warm engines in the background at startup (default: 1)
+    KADI_SHM_DIRS: Directories transcribe may memory-map audio from (default: /dev/shm)
+    KADI_PLAYBACK_SAMPLE_RATE: Output device rate (default: device's default rate)
+    KADI_PLAYBACK_BUFFER_MS: Audio queued ahead of the output device (default: 2000)
+    KADI_BARGE_IN: Stop playback when the wake word is heard (default: 1)
+    KADI_COMMAND_PREROLL_MS: Audio kept from before the end of the wake word
+        when recording the command that follows (default: 500)
+    KADI_CAPTURE_MAX_LAG_MS: Microphone backlog after which the wake listener
+        skips to live audio (default: 2000)
+    KADI_KWS: Screen wake word windows with the keyword spotter before Whisper (default: 1)
+    KADI_KWS_TEMPLATES: Directory of enrolled wake word recordings
+        (default: ~/.local/share/kadi/wake-templates)
+    KADI_KWS_THRESHOLD: Keyword spotter DTW threshold (default: 0 = calibrated from the templates)
 """
 
 import asyncio
 import base64
 import os
+import time
+from contextlib import AsyncExitStack, aclosing, asynccontextmanager
 from typing import Optional
 
 import numpy as np
-import sounddevice as sd
 from pydantic import BaseModel, Field
 from kadi import KadiClient
 
-from .stt import SpeechToText
+from .stt import SpeechToText, TranscriptionBusyError, check_profile
+from .stt_pool import TranscriptionPool
+from .batching import BatchScheduler
+from .cache import CachedTranscriber, TranscriptionCache
+from .models import ModelRegistry
+from .streaming import StreamingTranscriber
+from .resample import resample
+from .vad import transcribe_with_vad
+from .upload import (
+    OPUS_RATES, PCM_FORMATS, UPLOAD_FORMATS, UploadRegistry, decode_audio, encode_audio, opus_rate,
+)
+from .shm import map_pcm, release_segment
+from .file_stream import audio_duration, transcribe_file_streaming
 from .tts import TextToSpeech
+from .tts_cache import PhraseCache, load_phrases
+from .voices import VoicePool
+from .playback import AudioOutput, Utterance
+from .kws import KeywordSpotter
 
 # ============================================================================
 # Configuration
@@ -32,7 +83,29 @@ from .tts import TextToSpeech
 BROKER_URL = os.getenv("KADI_BROKER_URL", "ws://localhost:8080/kadi")
 KADI_NETWORK = os.getenv("KADI_NETWORK", "voice")
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "tiny.en")
+WHISPER_QUANTIZE = os.getenv("WHISPER_QUANTIZE", "none").lower()
+WHISPER_PROFILE = os.getenv("WHISPER_PROFILE", "balanced")
+WHISPER_MODEL_MEMORY_MB = float(os.getenv("WHISPER_MODEL_MEMORY_MB", "2048"))
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "0"))
+WHISPER_MAX_PENDING = int(os.getenv("WHISPER_MAX_PENDING", "32"))
+WHISPER_QUEUE_SIZE = int(os.getenv("WHISPER_QUEUE_SIZE", "8"))
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "1"))
+WHISPER_BATCH_WAIT_MS = float(os.getenv("WHISPER_BATCH_WAIT_MS", "25"))
+WHISPER_CACHE_MB = float(os.getenv("WHISPER_CACHE_MB", "0"))
+WHISPER_CACHE_DIR = os.getenv("WHISPER_CACHE_DIR", "")
+WHISPER_STREAM_FILE_SECONDS = float(os.getenv("WHISPER_STREAM_FILE_SECONDS", "600"))
 PIPER_VOICE = os.getenv("PIPER_VOICE", "en_US-lessac-medium")
+TTS_MAX_VOICES = int(os.getenv("TTS_MAX_VOICES", "3"))
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", str(min(2, os.cpu_count() or 1))))
+TTS_SENTENCE_SILENCE_MS = float(os.getenv("TTS_SENTENCE_SILENCE_MS", "200"))
+TTS_CACHE_MB = float(os.getenv("TTS_CACHE_MB", "32"))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "")
+TTS_CACHE_DISK_MB = float(os.getenv("TTS_CACHE_DISK_MB", "256"))
+TTS_CACHE_WARM = os.getenv("TTS_CACHE_WARM", "")
+WARMUP = os.getenv("KADI_WARMUP", "1").lower() not in ("0", "false", "no")
+PLAYBACK_SAMPLE_RATE = int(os.getenv("KADI_PLAYBACK_SAMPLE_RATE", "0"))
+PLAYBACK_BUFFER_MS = int(os.getenv("KADI_PLAYBACK_BUFFER_MS", "2000"))
+BARGE_IN = os.getenv("KADI_BARGE_IN", "1").lower() not in ("0", "false", "no")
 WAKE_WORD = os.getenv("KADI_WAKE_WORD", "hey katie").lower()
 WAKE_WORD_ALTERNATIVES = os.getenv(
     "KADI_WAKE_WORD_ALT",
@@ -44,39 +117,62 @@ MIC_SAMPLE_RATE = 16000
 VAD_AGGRESSIVENESS = int(os.getenv("KADI_VAD_AGGRESSIVENESS", "2"))
 SILENCE_TIMEOUT_MS = int(os.getenv("KADI_SILENCE_TIMEOUT_MS", "1500"))
 MAX_RECORDING_SECONDS = int(os.getenv("KADI_MAX_RECORDING_SECONDS", "30"))
+COMMAND_PREROLL_MS = int(os.getenv("KADI_COMMAND_PREROLL_MS", "500"))
+CAPTURE_MAX_LAG_MS = int(os.getenv("KADI_CAPTURE_MAX_LAG_MS", "2000"))
+KWS_ENABLED = os.getenv("KADI_KWS", "1").lower() not in ("0", "false", "no")
+KWS_TEMPLATES = os.getenv("KADI_KWS_TEMPLATES", "~/.local/share/kadi/wake-templates")
+KWS_THRESHOLD = float(os.getenv("KADI_KWS_THRESHOLD", "0"))
 
 # ============================================================================
 # Input Schemas
 # ============================================================================
 
 class TranscribeInput(BaseModel):
-    audio_base64: str = Field(description="Base64-encoded audio data")
-    sample_rate: int = Field(default=16000, ge=8000, le=48000, description="Audio sample rate in Hz")
+    audio_base64: str = Field(default="", description="Base64-encoded audio data (omit when using upload_id)")
+    upload_id: Optional[str] = Field(default=None, description="Transcribe a completed chunked upload from transcribe_upload_chunk instead of audio_base64")
+    shm_path: Optional[str] = Field(default=None, description="Same-host handoff: raw mono PCM file in /dev/shm (or a shared_memory name) to memory-map instead of audio_base64; format must be 'float32' or 'int16'")
+    length: Optional[int] = Field(default=None, ge=0, description="Samples to read from shm_path (default: whole segment)")
+    offset: int = Field(default=0, ge=0, description="Byte offset of the first sample in shm_path")
+    release: bool = Field(default=False, description="Hand ownership of shm_path to the ability, which deletes it after transcribing")
+    sample_rate: int = Field(default=16000, ge=8000, le=48000, description="Audio sample rate in Hz (PCM formats only)")
     language: str = Field(default="en", description="Language code (e.g., 'en', 'es', 'fr')")
-    format: str = Field(default="float32", description="Audio format: 'float32', 'int16', or 'wav'")
+    format: str = Field(default="float32", description="Audio format: 'float32', 'int16', 'wav', 'flac', 'ogg' (Vorbis) or 'opus' (Ogg/Opus)")
+    reject_if_busy: bool = Field(default=False, description="Return a busy error instead of queueing when the engine is full")
+    model: Optional[str] = Field(default=None, description="Whisper model (e.g. 'tiny.en' for speed, 'small.en' for accuracy); defaults to WHISPER_MODEL")
+    profile: Optional[str] = Field(default=None, description="Decoding profile: 'fast' (short commands), 'balanced' or 'accurate'; defaults to WHISPER_PROFILE")
 
 class SynthesizeInput(BaseModel):
     text: str = Field(description="Text to convert to speech", min_length=1, max_length=10000)
-    voice: Optional[str] = Field(default=None, description="Voice model name")
+    voice: Optional[str] = Field(default=None, description="Voice model name (e.g. en_US-amy-medium), loaded on first use; defaults to PIPER_VOICE")
     speed: float = Field(default=1.0, ge=0.5, le=2.0, description="Speech speed multiplier")
+    format: str = Field(default="float32", description="Output encoding: 'float32' or 'int16' raw PCM, or 'wav', 'flac', 'ogg', 'opus' (Ogg/Opus, smallest)")
+    sample_rate: Optional[int] = Field(default=None, ge=8000, le=48000, description="Resample the output to this rate (default: the voice's rate; Opus uses the nearest rate it supports)")
 
 class TranscribeFileInput(BaseModel):
     file_path: str = Field(description="Absolute path to audio file")
     language: str = Field(default="en", description="Language code")
+    reject_if_busy: bool = Field(default=False, description="Return a busy error instead of queueing when the engine is full")
+    model: Optional[str] = Field(default=None, description="Whisper model (e.g. 'tiny.en' for speed, 'small.en' for accuracy); defaults to WHISPER_MODEL")
+    profile: Optional[str] = Field(default=None, description="Decoding profile: 'fast' (short commands), 'balanced' or 'accurate'; defaults to WHISPER_PROFILE")
+    vad: bool = Field(default=True, description="For recordings over 30s, drop silence and transcribe speech segments in parallel")
+    stream: bool = Field(default=False, description="Read and transcribe window by window with constant memory, emitting voice.transcription_progress events (automatic for very long files)")
 
 class ListVoicesInput(BaseModel):
     pass
 
 class SpeakInput(BaseModel):
     text: str = Field(description="Text to speak aloud", min_length=1, max_length=10000)
-    voice: Optional[str] = Field(default=None, description="Voice model name")
+    voice: Optional[str] = Field(default=None, description="Voice model name (e.g. en_US-amy-medium), loaded on first use; defaults to PIPER_VOICE")
     speed: float = Field(default=1.0, ge=0.5, le=2.0, description="Speech speed multiplier")
     volume: float = Field(default=1.0, ge=0.0, le=1.0, description="Playback volume")
     wait: bool = Field(default=True, description="Wait for playback to complete")
     lead_in_ms: int = Field(default=150, ge=0, le=1000, description="Silence before speech (ms)")
+    stream: bool = Field(default=True, description="Start playback once the first sentence is synthesized instead of after the whole text")
+    interrupt: bool = Field(default=False, description="Stop current and queued speech first instead of queueing behind it")
 
 class StartListeningInput(BaseModel):
     wake_word: Optional[str] = Field(default=None, description="Custom wake word")
+    profile: str = Field(default="balanced", description="Decoding profile for commands ('fast', 'balanced', 'accurate'); wake probes always use 'fast'")
 
 class StopListeningInput(BaseModel):
     pass
@@ -84,28 +180,211 @@ class StopListeningInput(BaseModel):
 class ListenerStatusInput(BaseModel):
     pass
 
+class VoiceStatusInput(BaseModel):
+    pass
+
+class TranscribeStreamStartInput(BaseModel):
+    language: str = Field(default="en", description="Language code")
+    sample_rate: int = Field(default=16000, ge=8000, le=48000, description="Sample rate of the pushed chunks in Hz")
+    step_ms: int = Field(default=1000, ge=200, le=5000, description="Audio to accumulate between incremental decodes (ms)")
+
+class TranscribeStreamPushChunkInput(BaseModel):
+    session_id: str = Field(description="Session ID from transcribe_stream_start")
+    audio_base64: str = Field(description="Base64-encoded mono audio chunk at the session's sample rate")
+    format: str = Field(default="float32", description="Audio format: 'float32' or 'int16'")
+
+class TranscribeStreamFinishInput(BaseModel):
+    session_id: str = Field(description="Session ID from transcribe_stream_start")
+
+class TranscribeUploadChunkInput(BaseModel):
+    audio_base64: str = Field(description="Base64-encoded slice of the encoded audio")
+    upload_id: Optional[str] = Field(default=None, description="Upload ID returned by the first chunk (omit to start a new upload)")
+    index: int = Field(default=0, ge=0, description="Chunk sequence number, starting at 0")
+    format: str = Field(default="float32", description="Audio format of the whole upload (first chunk only): 'float32', 'int16', 'wav', 'flac', 'ogg' or 'opus'")
+    sample_rate: int = Field(default=16000, ge=8000, le=48000, description="Sample rate for PCM formats (first chunk only)")
+    total_bytes: Optional[int] = Field(default=None, ge=1, description="Total encoded size, if known, so the buffer is allocated once (first chunk only)")
+
+class EnrollWakeWordInput(BaseModel):
+    audio_base64: str = Field(description="Base64-encoded recording of just the wake word being spoken")
+    format: str = Field(default="float32", description="Audio format: 'float32', 'int16', 'wav', 'flac', 'ogg' or 'opus'")
+    sample_rate: int = Field(default=16000, ge=8000, le=48000, description="Audio sample rate in Hz (PCM formats only)")
+
 # ============================================================================
 # Engine State
 # ============================================================================
 
 stt_engine: Optional[SpeechToText] = None
-tts_engine: Optional[TextToSpeech] = None
+stt_pool: Optional[TranscriptionPool] = None
+stt_batcher: Optional[BatchScheduler] = None
+stt_cache: Optional[TranscriptionCache] = None
+stt_cached: Optional[CachedTranscriber] = None
+model_registry = ModelRegistry(
+    WHISPER_MODEL,
+    max_memory_mb=WHISPER_MODEL_MEMORY_MB,
+    max_queue=WHISPER_QUEUE_SIZE,
+    quantize=WHISPER_QUANTIZE,
+)
+voice_pool = VoicePool(
+    PIPER_VOICE,
+    max_resident=TTS_MAX_VOICES,
+    cache=PhraseCache(
+        max_bytes=int(TTS_CACHE_MB * 1024 * 1024),
+        disk_dir=TTS_CACHE_DIR or None,
+        disk_max_bytes=int(TTS_CACHE_DISK_MB * 1024 * 1024),
+    ) if TTS_CACHE_MB > 0 else None,
+    workers=TTS_WORKERS,
+    sentence_silence=TTS_SENTENCE_SILENCE_MS / 1000,
+)
 wake_word_listener = None  # WakeWordListener instance
-_audio_playback_lock = asyncio.Lock()
+stream_sessions = StreamingTranscriber()
+uploads = UploadRegistry()
+wake_spotter = KeywordSpotter(threshold=KWS_THRESHOLD, templates_dir=KWS_TEMPLATES) if KWS_ENABLED else None
+audio_output = AudioOutput(sample_rate=PLAYBACK_SAMPLE_RATE, buffer_seconds=PLAYBACK_BUFFER_MS / 1000)
+# Serialize first-time construction so concurrent callers share one load
+_stt_pool_lock = asyncio.Lock()
+engine_readiness = {"stt": {"state": "cold"}, "tts": {"state": "cold"}}
 
 async def get_stt() -> SpeechToText:
     global stt_engine
     if stt_engine is None:
         print(f"[STT] Loading model: {WHISPER_MODEL}")
-        stt_engine = SpeechToText(model_name=WHISPER_MODEL)
-        await stt_engine.load()
+    stt_engine = await model_registry.get()
     return stt_engine
 
-async def get_tts() -> TextToSpeech:
-    global tts_engine
-    if tts_engine is None:
-        tts_engine = TextToSpeech(voice=PIPER_VOICE)
-    return tts_engine
+async def get_stt_pool() -> Optional[TranscriptionPool]:
+    """Return the worker pool, or None when WHISPER_WORKERS is 0."""
+    global stt_pool
+    if WHISPER_WORKERS <= 0:
+        return None
+    async with _stt_pool_lock:
+        if stt_pool is None:
+            pool = TranscriptionPool(
+                model_name=WHISPER_MODEL,
+                num_workers=WHISPER_WORKERS,
+                max_pending=WHISPER_MAX_PENDING,
+                quantize=WHISPER_QUANTIZE,
+            )
+            await pool.start()
+            stt_pool = pool
+    return stt_pool
+
+async def _get_backend():
+    global stt_batcher
+    pool = await get_stt_pool()
+    if pool is not None:
+        return pool
+    engine = await get_stt()
+    if WHISPER_BATCH_SIZE > 1:
+        if stt_batcher is None:
+            stt_batcher = BatchScheduler(
+                engine,
+                max_batch_size=WHISPER_BATCH_SIZE,
+                max_wait_ms=WHISPER_BATCH_WAIT_MS,
+            )
+        return stt_batcher
+    return engine
+
+def get_stt_cache() -> Optional[TranscriptionCache]:
+    """Return the shared result cache, or None when WHISPER_CACHE_MB is 0."""
+    global stt_cache
+    if WHISPER_CACHE_MB <= 0:
+        return None
+    if stt_cache is None:
+        stt_cache = TranscriptionCache(
+            max_bytes=int(WHISPER_CACHE_MB * 1024 * 1024),
+            disk_dir=WHISPER_CACHE_DIR or None,
+        )
+    return stt_cache
+
+def _cache_model_key(model: str) -> str:
+    """Cached results depend on the weights, so quantized models get their own key."""
+    return model if WHISPER_QUANTIZE == "none" else f"{model}-{WHISPER_QUANTIZE}"
+
+async def get_transcriber():
+    """Return the backend WHISPER_MODEL transcription calls dispatch to (pool,
+    batcher or engine), behind the result cache when WHISPER_CACHE_MB is set.
+    """
+    global stt_cached
+    cache = get_stt_cache()
+    backend = await _get_backend()
+    if cache is None:
+        return backend
+    if stt_cached is None:
+        stt_cached = CachedTranscriber(backend, cache, model_name=_cache_model_key(WHISPER_MODEL))
+    return stt_cached
+
+@asynccontextmanager
+async def transcriber(model: Optional[str] = None):
+    """Hold the transcriber for ``model`` (WHISPER_MODEL if None) for one request.
+
+    Other models run on their in-process engine from the registry, leased so
+    it can't be evicted before the request has finished with it.
+    """
+    if not model or model == WHISPER_MODEL:
+        yield await get_transcriber()
+        return
+    async with model_registry.lease(model) as engine:
+        cache = get_stt_cache()
+        yield CachedTranscriber(engine, cache, model_name=_cache_model_key(model)) if cache else engine
+
+async def get_tts(voice: Optional[str] = None) -> TextToSpeech:
+    """
+    Return the engine for ``voice`` (PIPER_VOICE if None) from the voice pool.
+
+    Raises:
+        ValueError: If the voice isn't installed
+    """
+    return await voice_pool.get(voice)
+
+async def _warm(name: str, load, exercise) -> None:
+    """Load one engine and run a throwaway inference, recording readiness."""
+    readiness = engine_readiness[name]
+    readiness.update(state="loading", error=None)
+    try:
+        started = time.perf_counter()
+        engine = await load()
+        loaded = time.perf_counter()
+        await exercise(engine)
+        readiness.update(
+            state="ready",
+            load_ms=round((loaded - started) * 1000, 1),
+            warmup_ms=round((time.perf_counter() - loaded) * 1000, 1),
+        )
+        print(f"[{name.upper()}] Ready (load {readiness['load_ms']:.0f} ms, "
+              f"warm-up {readiness['warmup_ms']:.0f} ms)")
+    except Exception as e:
+        readiness.update(state="failed", error=str(e))
+        print(f"[{name.upper()}] Warm-up failed: {e}")
+
+async def warm_up() -> None:
+    """
+    Load the configured engines and run a dummy decode through each.
+
+    Started by ``__main__`` once the client is serving, so the first real
+    request doesn't pay for model loading or first-call kernel setup. The
+    TTS_CACHE_WARM phrases are cached as part of the TTS warm-up.
+    Progress is reported by the ``voice_status`` tool.
+    """
+    # Low-level noise: pure silence would be skipped before reaching the model
+    noise = (0.01 * np.random.default_rng(0).standard_normal(MIC_SAMPLE_RATE)).astype(np.float32)
+
+    async def exercise_stt(backend):
+        await backend.transcribe(noise, sample_rate=MIC_SAMPLE_RATE)
+
+    async def exercise_tts(engine):
+        await engine.synthesize("Ready.")
+        if TTS_CACHE_WARM:
+            try:
+                phrases = load_phrases(TTS_CACHE_WARM)
+            except OSError as e:
+                print(f"[TTS] Could not read phrase list: {e}")
+                return
+            cached = await engine.warm_cache(phrases)
+            print(f"[TTS] {cached} phrases cached from {TTS_CACHE_WARM}")
+
+    # Warm the backend directly so the throwaway result never enters the cache
+    await _warm("stt", _get_backend, exercise_stt)
+    await _warm("tts", get_tts, exercise_tts)
 
 async def play_audio(
     audio_array: np.ndarray,
@@ -113,20 +392,29 @@ async def play_audio(
     volume: float = 1.0,
     wait: bool = True,
     lead_in_ms: int = 150,
-) -> None:
-    """Play audio through device speakers with lock to prevent concurrent playback."""
-    async with _audio_playback_lock:
-        sd.stop()
-        if volume != 1.0:
-            audio_array = audio_array * volume
-        audio_array = np.clip(audio_array, -1.0, 1.0).astype(np.float32)
-        if lead_in_ms > 0:
-            silence = np.zeros(int(sample_rate * lead_in_ms / 1000), dtype=np.float32)
-            audio_array = np.concatenate([silence, audio_array])
-        sd.play(audio_array, sample_rate)
-        if wait:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, sd.wait)
+) -> Utterance:
+    """Queue audio on the shared output stream, behind anything already playing."""
+    utterance = audio_output.play(volume=volume, lead_in_ms=lead_in_ms)
+    utterance.write(audio_array, sample_rate)
+    utterance.close()
+    if wait:
+        await utterance.wait()
+    return utterance
+
+def _playback_result(utterance: Utterance, wait: bool) -> dict:
+    """Playback fields of a speak result. ``played`` is only known once waited
+    for; an utterance not waited for is reported as ``queued`` instead."""
+    return {
+        "played": utterance.played if wait else None,
+        "queued": not utterance.done,
+        "waited": wait,
+        "cancelled": utterance.cancelled,
+        "playback_error": utterance.error,
+    }
+
+def _since(started: float, at: Optional[float]) -> Optional[float]:
+    """Milliseconds from ``started`` to ``at`` (both perf_counter), None if ``at`` is unset."""
+    return round((at - started) * 1000, 1) if at is not None else None
 
 # ============================================================================
 # KadiClient
@@ -150,29 +438,55 @@ client = KadiClient(
 @client.tool(TranscribeInput)
 async def transcribe(params) -> dict:
     """Convert speech audio to text using Whisper."""
-    engine = await get_stt()
-    audio_bytes = base64.b64decode(params["audio_base64"])
-    fmt = params.get("format", "float32")
-    sample_rate = params.get("sample_rate", 16000)
-    language = params.get("language", "en")
-
-    if fmt == "float32":
-        audio_array = np.frombuffer(audio_bytes, dtype=np.float32)
-    elif fmt == "int16":
-        audio_array = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-    elif fmt == "wav":
-        import io, soundfile as sf
-        audio_array, _ = sf.read(io.BytesIO(audio_bytes))
-        if len(audio_array.shape) > 1:
-            audio_array = audio_array.mean(axis=1)
-    else:
-        return {"error": f"Unsupported format: {fmt}"}
-
-    return await engine.transcribe(
-        audio_data=audio_array,
-        sample_rate=sample_rate,
-        language=language,
-    )
+    async with AsyncExitStack() as stack:
+        try:
+            engine = await stack.enter_async_context(transcriber(params.get("model")))
+            profile = check_profile(params.get("profile") or WHISPER_PROFILE)
+        except ValueError as e:
+            return {"error": str(e)}
+        language = params.get("language", "en")
+        busy = "reject" if params.get("reject_if_busy", False) else "wait"
+
+        shm_path = params.get("shm_path")
+        handed_over = False  # only a segment that mapped as valid PCM may be released
+        try:
+            if shm_path:
+                # Caller keeps ownership unless release=True (see shm.py)
+                audio_array = map_pcm(
+                    shm_path,
+                    params.get("format", "float32"),
+                    params.get("length"),
+                    params.get("offset", 0),
+                )
+                handed_over = True
+                sample_rate = params.get("sample_rate", 16000)
+            elif params.get("upload_id"):
+                upload = uploads.get(params["upload_id"])
+                audio_array, sample_rate = await asyncio.to_thread(upload.decode)
+                uploads.close(upload.upload_id)
+            else:
+                audio_bytes = base64.b64decode(params["audio_base64"])
+                audio_array, sample_rate = await asyncio.to_thread(
+                    decode_audio,
+                    audio_bytes,
+                    params.get("format", "float32"),
+                    params.get("sample_rate", 16000),
+                )
+
+            return await engine.transcribe(
+                audio_data=audio_array,
+                sample_rate=sample_rate,
+                language=language,
+                busy=busy,
+                profile=profile,
+            )
+        except TranscriptionBusyError as e:
+            return {"error": str(e), "busy": True}
+        except (KeyError, ValueError, FileNotFoundError) as e:
+            return {"error": str(e)}
+        finally:
+            if handed_over and params.get("release", False):
+                release_segment(shm_path)
 
 # ============================================================================
 # Tool 2: Synthesize (TTS)
@@ -181,17 +495,33 @@ async def transcribe(params) -> dict:
 @client.tool(SynthesizeInput)
 async def synthesize(params) -> dict:
     """Convert text to speech audio using Piper TTS. Returns base64 audio."""
-    engine = await get_tts()
-    length_scale = 1.0 / params.get("speed", 1.0)
-    result = await engine.synthesize(text=params["text"], length_scale=length_scale)
-    audio_array = np.array(result["audio"], dtype=np.float32)
-    audio_b64 = base64.b64encode(audio_array.tobytes()).decode("utf-8")
-    return {
-        "audio_base64": audio_b64,
-        "sample_rate": result["sample_rate"],
-        "duration_seconds": result["duration_seconds"],
-        "format": "float32",
-    }
+    async with AsyncExitStack() as stack:
+        try:
+            engine = await stack.enter_async_context(voice_pool.lease(params.get("voice")))
+        except ValueError as e:
+            return {"error": str(e)}
+        fmt = params.get("format", "float32")
+        if fmt not in UPLOAD_FORMATS:
+            return {"error": f"Unsupported format: {fmt}. Supported: {UPLOAD_FORMATS}"}
+        if fmt == "opus" and params.get("sample_rate") not in (None, *OPUS_RATES):
+            return {"error": f"Opus supports sample rates {OPUS_RATES}"}
+        length_scale = 1.0 / params.get("speed", 1.0)
+        result = await engine.synthesize(text=params["text"], length_scale=length_scale)
+        audio_array, sample_rate = result["audio"], result["sample_rate"]
+        target_rate = params.get("sample_rate") or (opus_rate(sample_rate) if fmt == "opus" else sample_rate)
+        if target_rate != sample_rate:
+            audio_array = await asyncio.to_thread(resample, audio_array, sample_rate, target_rate)
+        try:
+            data = await asyncio.to_thread(encode_audio, audio_array, target_rate, fmt)
+        except ValueError as e:
+            return {"error": str(e)}
+        return {
+            "audio_base64": base64.b64encode(data).decode("utf-8"),
+            "sample_rate": target_rate,
+            "duration_seconds": result["duration_seconds"],
+            "format": fmt,
+            "bytes": len(data),
+        }
 
 # ============================================================================
 # Tool 3: Transcribe File
@@ -200,10 +530,51 @@ async def synthesize(params) -> dict:
 @client.tool(TranscribeFileInput)
 async def transcribe_file(params) -> dict:
     """Transcribe audio from a local file path."""
-    engine = await get_stt()
-    return await engine.transcribe_file(
-        file_path=params["file_path"], language=params.get("language", "en")
-    )
+    async with AsyncExitStack() as stack:
+        try:
+            engine = await stack.enter_async_context(transcriber(params.get("model")))
+            profile = check_profile(params.get("profile") or WHISPER_PROFILE)
+        except ValueError as e:
+            return {"error": str(e)}
+        file_path = params["file_path"]
+        language = params.get("language", "en")
+        reject_if_busy = params.get("reject_if_busy", False)
+        if reject_if_busy and engine.is_queue_full():
+            return {"error": "Transcription queue full", "busy": True}
+
+        try:
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"Audio file not found: {file_path}")
+            duration = await asyncio.to_thread(audio_duration, file_path)
+            if params.get("stream", False) or duration is None or duration > WHISPER_STREAM_FILE_SECONDS:
+                return await transcribe_file_streaming(
+                    engine, file_path, language=language,
+                    event_emitter=lambda topic, data: client.emit(topic, data),
+                    vad_aggressiveness=VAD_AGGRESSIVENESS if params.get("vad", True) else None,
+                    profile=profile,
+                )
+
+            if not params.get("vad", True):
+                return await engine.transcribe_file(
+                    file_path=file_path,
+                    language=language,
+                    busy="reject" if reject_if_busy else "wait",
+                    profile=profile,
+                )
+
+            audio_array, sample_rate = await asyncio.to_thread(SpeechToText.read_file, file_path)
+            audio_array = await asyncio.to_thread(resample, audio_array, sample_rate, MIC_SAMPLE_RATE)
+            if len(audio_array) <= 30 * MIC_SAMPLE_RATE:
+                return await engine.transcribe(
+                    audio_data=audio_array, sample_rate=MIC_SAMPLE_RATE, language=language,
+                    profile=profile,
+                )
+            return await transcribe_with_vad(
+                engine, audio_array, language=language, aggressiveness=VAD_AGGRESSIVENESS,
+                profile=profile, max_in_flight=max(WHISPER_WORKERS, WHISPER_BATCH_SIZE, 1),
+            )
+        except TranscriptionBusyError as e:
+            return {"error": str(e), "busy": True}
 
 # ============================================================================
 # Tool 4: List Voices
@@ -211,12 +582,11 @@ async def transcribe_file(params) -> dict:
 
 @client.tool(ListVoicesInput)
 async def list_voices(params) -> dict:
-    """List available Piper TTS voice models."""
-    engine = await get_tts()
-    voices = engine.get_available_voices()
+    """List available Piper TTS voice models and which ones are loaded."""
     return {
-        "voices": voices,
-        "current_voice": engine.voice,
+        "voices": voice_pool.available(),
+        "current_voice": voice_pool.default_voice,
+        "loaded": [v["voice"] for v in voice_pool.status()["voices"]],
         "recommended": list(TextToSpeech.RECOMMENDED_VOICES.keys()),
     }
 
@@ -227,34 +597,88 @@ async def list_voices(params) -> dict:
 @client.tool(SpeakInput)
 async def speak(params) -> dict:
     """Synthesize text and play it on device speakers."""
-    engine = await get_tts()
-    speed = params.get("speed", 1.0)
-    length_scale = 1.0 / speed
-    result = await engine.synthesize(text=params["text"], length_scale=length_scale)
-    audio_array = np.array(result["audio"], dtype=np.float32)
-    volume = params.get("volume", 1.0)
-    wait = params.get("wait", True)
-    lead_in_ms = params.get("lead_in_ms", 150)
-    await play_audio(
-        audio_array=audio_array,
-        sample_rate=result["sample_rate"],
-        volume=volume,
-        wait=wait,
-        lead_in_ms=lead_in_ms,
-    )
-    return {
-        "success": True,
-        "text": params["text"],
-        "duration_seconds": result["duration_seconds"],
-        "sample_rate": result["sample_rate"],
-        "played": True,
-        "waited": wait,
-    }
+    started = time.perf_counter()
+    async with AsyncExitStack() as stack:
+        # Leased, not just fetched: the voice must stay resident until
+        # the last sentence has been synthesized
+        try:
+            engine = await stack.enter_async_context(voice_pool.lease(params.get("voice")))
+        except ValueError as e:
+            return {"error": str(e)}
+        speed = params.get("speed", 1.0)
+        length_scale = 1.0 / speed
+        volume = params.get("volume", 1.0)
+        wait = params.get("wait", True)
+        lead_in_ms = params.get("lead_in_ms", 150)
+
+        if params.get("interrupt", False):
+            audio_output.cancel()
+
+        if not params.get("stream", True):
+            result = await engine.synthesize(text=params["text"], length_scale=length_scale)
+            utterance = await play_audio(
+                audio_array=result["audio"],
+                sample_rate=result["sample_rate"],
+                volume=volume,
+                wait=wait,
+                lead_in_ms=lead_in_ms,
+            )
+            return {
+                "success": True,
+                "text": params["text"],
+                "duration_seconds": result["duration_seconds"],
+                "sample_rate": result["sample_rate"],
+                **_playback_result(utterance, wait),
+                "chunks": 1,
+                "time_to_first_audio_ms": _since(started, utterance.started_at),
+                "start_latency_ms": utterance.start_latency_ms,
+            }
+
+        # Synthesis runs ahead of playback through the utterance's queue, so
+        # sentence n+1 is generated while sentence n plays
+        utterance = audio_output.play(volume=volume, lead_in_ms=lead_in_ms)
+        duration = 0.0
+        sample_rate = None
+        count = 0
+        try:
+            # aclosing: breaking out must cancel the look-ahead synthesis now,
+            # not whenever the generator is garbage-collected
+            async with aclosing(engine.synthesize_stream(params["text"], length_scale=length_scale)) as pieces:
+                async for result in pieces:
+                    if utterance.done:  # cancelled, or the output failed
+                        break
+                    if not len(result["audio"]):
+                        continue
+                    utterance.write(result["audio"], result["sample_rate"])
+                    duration += result["duration_seconds"]
+                    sample_rate = result["sample_rate"]
+                    count += 1
+        finally:
+            utterance.close()
+
+        if wait:
+            await utterance.wait()
+        return {
+            "success": True,
+            "text": params["text"],
+            "duration_seconds": duration,
+            "sample_rate": sample_rate,
+            **_playback_result(utterance, wait),
+            "chunks": count,
+            "time_to_first_audio_ms": _since(started, utterance.started_at),
+            "start_latency_ms": utterance.start_latency_ms,
+        }
 
 # ============================================================================
 # Tool 6: Start Listening (wake word)
 # ============================================================================
 
+def _listener_event(topic: str, data: dict):
+    # Barge-in: the user started talking to us, so stop talking over them
+    if topic == "voice.wake_word_detected" and BARGE_IN:
+        audio_output.cancel()
+    return client.emit(topic, data)
+
 @client.tool(StartListeningInput)
 async def start_listening(params) -> dict:
     """Start listening for wake word and voice commands."""
@@ -264,6 +688,10 @@ async def start_listening(params) -> dict:
     word = (params.get("wake_word") or WAKE_WORD).lower().strip()
     if wake_word_listener and wake_word_listener.is_listening:
         return {"success": True, "status": "already_listening", "wake_word": wake_word_listener.wake_word}
+    try:
+        profile = check_profile(params.get("profile", "balanced"))
+    except ValueError as e:
+        return {"error": str(e)}
 
     wake_word_listener = WakeWordListener(
         wake_word=word,
@@ -271,8 +699,12 @@ async def start_listening(params) -> dict:
         vad_aggressiveness=VAD_AGGRESSIVENESS,
         silence_timeout_ms=SILENCE_TIMEOUT_MS,
         max_recording_seconds=MAX_RECORDING_SECONDS,
-        stt_getter=get_stt,
-        event_emitter=lambda topic, data: client.emit(topic, data),
+        command_preroll_ms=COMMAND_PREROLL_MS,
+        max_lag_ms=CAPTURE_MAX_LAG_MS,
+        stt_getter=get_transcriber,
+        event_emitter=_listener_event,
+        profile=profile,
+        spotter=wake_spotter,
     )
     await wake_word_listener.start()
     return {
@@ -309,5 +741,135 @@ async def listener_status(params) -> dict:
             "wake_word": wake_word_listener.wake_word,
             "alternatives": wake_word_listener.alternatives,
             "is_recording_command": wake_word_listener.is_recording_command,
+            "profile": wake_word_listener.profile,
+            "probe_profile": wake_word_listener.probe_profile,
+            "stats": wake_word_listener.stats(),
         }
     return {"active": False, "message": "Wake word listener is not running"}
+
+# ============================================================================
+# Tool 9: Voice Status
+# ============================================================================
+
+@client.tool(VoiceStatusInput)
+async def voice_status(params) -> dict:
+    """Get status of the transcription backend (worker pool health or inference queue),
+    the resident Whisper models and Piper voices, the output stream, and engine
+    warm-up readiness."""
+    if stt_cached is not None:
+        stt = stt_cached.status()
+    elif stt_pool is not None:
+        stt = stt_pool.status()
+    elif stt_batcher is not None:
+        stt = stt_batcher.status()
+    elif stt_engine is not None:
+        stt = stt_engine.status()
+    else:
+        stt = {"backend": "in_process", "model": WHISPER_MODEL, "loaded": False}
+    return {
+        "stt": stt,
+        "models": model_registry.status(),
+        "tts": voice_pool.status(),
+        "playback": audio_output.status(),
+        "readiness": engine_readiness,
+    }
+
+# ============================================================================
+# Tool 10-12: Streaming Transcription
+# ============================================================================
+
+@client.tool(TranscribeStreamStartInput)
+async def transcribe_stream_start(params) -> dict:
+    """Open a streaming transcription session. Partial and committed text are emitted as events."""
+    # Sessions decode their own mel windows, so they always use the in-process engine
+    engine = await get_stt()
+    try:
+        session = stream_sessions.start(
+            engine,
+            language=params.get("language", "en"),
+            step_ms=params.get("step_ms", 1000),
+            event_emitter=lambda topic, data: client.emit(topic, data),
+            sample_rate=params.get("sample_rate", 16000),
+        )
+    except RuntimeError as e:
+        return {"error": str(e)}
+    return {"success": True, "session_id": session.session_id}
+
+@client.tool(TranscribeStreamPushChunkInput)
+async def transcribe_stream_push_chunk(params) -> dict:
+    """Append an audio chunk to a streaming session."""
+    try:
+        session = stream_sessions.get(params["session_id"])
+    except KeyError as e:
+        return {"error": str(e)}
+    fmt = params.get("format", "float32")
+    if fmt not in PCM_FORMATS:
+        return {"error": f"Unsupported format: {fmt}"}
+    try:
+        audio_array, _ = decode_audio(base64.b64decode(params["audio_base64"]), fmt, session.sample_rate)
+    except ValueError as e:
+        return {"error": str(e)}
+    return await session.push(audio_array)
+
+@client.tool(TranscribeStreamFinishInput)
+async def transcribe_stream_finish(params) -> dict:
+    """Finish a streaming session and return the final transcript."""
+    try:
+        session = stream_sessions.get(params["session_id"])
+    except KeyError as e:
+        return {"error": str(e)}
+    try:
+        return await session.finish()
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        stream_sessions.close(session.session_id)
+
+# ============================================================================
+# Tool 13: Chunked Upload
+# ============================================================================
+
+@client.tool(TranscribeUploadChunkInput)
+async def transcribe_upload_chunk(params) -> dict:
+    """Upload audio in several messages; pass the returned upload_id to transcribe once complete."""
+    try:
+        if params.get("upload_id"):
+            upload = uploads.get(params["upload_id"])
+        else:
+            upload = uploads.start(
+                params.get("format", "float32"),
+                params.get("sample_rate", 16000),
+                params.get("total_bytes"),
+            )
+    except (KeyError, ValueError, RuntimeError) as e:
+        return {"error": str(e)}
+    try:
+        upload.append(params.get("index", 0), base64.b64decode(params["audio_base64"]))
+    except ValueError as e:
+        return {"error": str(e), **upload.status()}
+    return upload.status()
+
+# ============================================================================
+# Tool 14: Enroll Wake Word
+# ============================================================================
+
+@client.tool(EnrollWakeWordInput)
+async def enroll_wake_word(params) -> dict:
+    """Add a recording of the wake word as a keyword spotter template."""
+    if wake_spotter is None:
+        return {"error": "Keyword spotter is disabled (KADI_KWS=0)"}
+    try:
+        audio_bytes = base64.b64decode(params["audio_base64"])
+        audio_array, sample_rate = await asyncio.to_thread(
+            decode_audio,
+            audio_bytes,
+            params.get("format", "float32"),
+            params.get("sample_rate", 16000),
+        )
+        result = await asyncio.to_thread(wake_spotter.enroll, audio_array, sample_rate)
+    except (KeyError, ValueError) as e:
+        return {"error": str(e)}
+    # A listener started before the first enrollment picks the spotter up now
+    if wake_word_listener is not None and wake_word_listener.spotter is None:
+        wake_word_listener.spotter = wake_spotter
+    return {"success": True, **result}
@@ -7,12 +7,23 @@ from dotenv import load_dotenv
 # Load .env BEFORE importing the package (which reads env vars at module level)
 load_dotenv()
 
-from . import client
+from . import WARMUP, client, warm_up
+
+def _warmup_done(task: asyncio.Task) -> None:
+    """Log a warm-up that failed outright instead of losing the exception."""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[ability-voice] Warm-up failed: {task.exception()}")
 
 async def main():
     mode = os.getenv("KADI_MODE", "stdio")
     print(f"[ability-voice] Starting in {mode} mode...")
-    print(f"[ability-voice] 8 tools registered")
+    print(f"[ability-voice] 14 tools registered")
+    # The task first runs once serve() yields to the loop, so tools already
+    # answer (and report readiness) while models load. The loop only keeps
+    # a weak reference to tasks, so hold this one until serve() returns
+    warmup_task = asyncio.create_task(warm_up()) if WARMUP else None
+    if warmup_task is not None:
+        warmup_task.add_done_callback(_warmup_done)
     await client.serve(mode)
 
 asyncio.run(main())
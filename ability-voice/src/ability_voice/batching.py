@@ -0,0 +1,207 @@
+"""
+Micro-batching scheduler for concurrent Whisper requests.
+
+When several agents call ``transcribe`` at the same time, decoding the
+clips one after another repeats the fixed per-call cost (a full 30s
+encoder pass even for a 2s command) for every caller. ``BatchScheduler``
+holds requests that arrive within a short window, pads them to 30s log-mel
+segments, runs the encoder and greedy decoder once for the whole batch,
+and hands each caller its own result.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .stt import DEFAULT_PROFILE, SpeechToText, TranscriptionBusyError, check_profile
+
+MAX_BATCH_SECONDS = 30.0
+# Profiles whose decoding a single greedy batched pass can stand in for.
+# "balanced" keeps segment timestamps and a temperature fallback, which the
+# batched pass has neither of, so only "fast" is batched
+BATCHABLE_PROFILES = ("fast",)
+
+
+class _PendingRequest:
+    __slots__ = ("audio", "sample_rate", "future", "enqueued_at")
+
+    def __init__(self, audio, sample_rate: int, future: asyncio.Future):
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchScheduler:
+    """
+    Collects concurrent transcribe calls into batched model passes.
+
+    A batch is flushed when it reaches ``max_batch_size`` requests or when
+    its oldest request has waited ``max_wait_ms``, whichever comes first.
+    Requests are batched per language. Only "fast" requests are batched:
+    clips longer than 30s, and "balanced" or "accurate" requests
+    (timestamps, temperature fallback and beam search can't be batched),
+    bypass the scheduler and use the engine's regular transcription.
+
+    Exposes the same ``transcribe`` / ``transcribe_file`` coroutines as
+    ``SpeechToText``.
+
+    Example:
+        >>> scheduler = BatchScheduler(engine, max_batch_size=8, max_wait_ms=25)
+        >>> result = await scheduler.transcribe(audio_data)
+    """
+
+    def __init__(
+        self,
+        engine: SpeechToText,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 25.0,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            engine: Loaded SpeechToText engine that runs the batches
+            max_batch_size: Maximum clips per model pass
+            max_wait_ms: Maximum latency added while a batch fills
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._batches: Dict[Tuple[str, str], List[_PendingRequest]] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        # Strong references to running batches, so they can't be collected mid-run
+        self._running: Set[asyncio.Task] = set()
+
+        # Statistics
+        self.batches_run = 0
+        self.requests_batched = 0
+        self.bypassed = 0
+
+    async def transcribe(
+        self,
+        audio_data: Union[bytes, np.ndarray],
+        sample_rate: int = 16000,
+        language: str = "en",
+        busy: str = "wait",
+        profile: str = DEFAULT_PROFILE,
+    ) -> dict:
+        """
+        Transcribe audio, sharing a model pass with concurrent callers.
+
+        Args:
+            audio_data: Audio as raw bytes (float32) or numpy array
+            sample_rate: Audio sample rate in Hz
+            language: Language code for transcription
+            busy: Queue-full behaviour, as for SpeechToText.transcribe()
+            profile: Decoding profile, as for SpeechToText.transcribe()
+
+        Returns:
+            Transcription result dict; ``timing`` adds ``batch_wait_ms``
+            and ``batch_size``
+        """
+        if isinstance(audio_data, bytes):
+            audio_array = np.frombuffer(audio_data, dtype=np.float32)
+        else:
+            audio_array = np.asarray(audio_data)
+
+        check_profile(profile)
+        if len(audio_array) / sample_rate > MAX_BATCH_SECONDS or profile not in BATCHABLE_PROFILES:
+            self.bypassed += 1
+            return await self.engine.transcribe(
+                audio_array, sample_rate=sample_rate, language=language,
+                busy=busy, profile=profile,
+            )
+
+        if busy == "skip" and (self.engine.is_busy() or self._batches):
+            raise TranscriptionBusyError("stt engine is busy")
+        if busy == "reject" and self.engine.is_queue_full():
+            raise TranscriptionBusyError("stt queue full")
+
+        loop = asyncio.get_running_loop()
+        request = _PendingRequest(audio_array, sample_rate, loop.create_future())
+        key = (language, profile)
+        batch = self._batches.setdefault(key, [])
+        batch.append(request)
+
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(
+                self.max_wait_ms / 1000, self._flush, key
+            )
+        return await request.future
+
+    def _flush(self, key: Tuple[str, str]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._batches.pop(key, [])
+        if batch:
+            task = asyncio.ensure_future(self._run(batch, *key))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[_PendingRequest], language: str, profile: str) -> None:
+        flushed_at = time.perf_counter()
+        self.batches_run += 1
+        self.requests_batched += len(batch)
+        try:
+            results = await self.engine.transcribe_batch(
+                [(r.audio, r.sample_rate) for r in batch],
+                language=language, profile=profile,
+            )
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        for request, result in zip(batch, results):
+            result["timing"]["batch_wait_ms"] = round(
+                (flushed_at - request.enqueued_at) * 1000, 1
+            )
+            if not request.future.done():
+                request.future.set_result(result)
+
+    async def transcribe_file(
+        self,
+        file_path: str,
+        language: str = "en",
+        busy: str = "wait",
+        profile: str = DEFAULT_PROFILE,
+    ) -> dict:
+        """Transcribe a file; short files are batched like any other clip."""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Audio file not found: {file_path}")
+        audio_array, sample_rate = await asyncio.to_thread(
+            SpeechToText.read_file, file_path
+        )
+        return await self.transcribe(
+            audio_array, sample_rate=sample_rate, language=language,
+            busy=busy, profile=profile,
+        )
+
+    def is_busy(self) -> bool:
+        return self.engine.is_busy() or bool(self._batches)
+
+    def is_queue_full(self) -> bool:
+        return self.engine.is_queue_full()
+
+    def status(self) -> dict:
+        """Engine status plus batching statistics."""
+        status = self.engine.status()
+        status["batching"] = {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches_run": self.batches_run,
+            "requests_batched": self.requests_batched,
+            "avg_batch_size": round(self.requests_batched / max(self.batches_run, 1), 2),
+            "bypassed": self.bypassed,
+            "waiting": sum(len(b) for b in self._batches.values()),
+        }
+        return status
@@ -0,0 +1,130 @@
+"""
+Compare fp32 and int8-quantized Whisper on reference clips.
+
+Usage:
+    python -m ability_voice.benchmark CLIPS_DIR [--model base.en] [--runs 3]
+        [--output report.md]
+
+Every audio file in CLIPS_DIR (wav/flac/ogg) needs a sibling ``.txt`` file
+with its reference transcript. For each mode the script reports model load
+time, resident weight size, median latency per clip, real-time factor and
+word error rate against the references, as a markdown table.
+"""
+
+import argparse
+import asyncio
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from .stt import DEVICE, SpeechToText
+
+AUDIO_SUFFIXES = (".wav", ".flac", ".ogg")
+
+
+def _words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """Word-level edit distance and reference length."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1], len(ref)
+
+
+def _find_clips(clips_dir: Path) -> List[Tuple[Path, str]]:
+    clips = []
+    for path in sorted(clips_dir.iterdir()):
+        reference = path.with_suffix(".txt")
+        if path.suffix.lower() in AUDIO_SUFFIXES and reference.exists():
+            clips.append((path, reference.read_text(encoding="utf-8").strip()))
+    return clips
+
+
+async def _run_mode(model: str, quantize: str, clips, runs: int) -> dict:
+    stt = SpeechToText(model_name=model, quantize=quantize)
+    started = time.perf_counter()
+    await stt.load()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    errors = words = 0
+    latencies = []
+    audio_seconds = 0.0
+    for path, reference in clips:
+        audio, sample_rate = SpeechToText.read_file(str(path))
+        audio_seconds += len(audio) / sample_rate
+        await stt.transcribe(audio, sample_rate)  # warm-up, not timed
+        times = []
+        for _ in range(runs):
+            result = await stt.transcribe(audio, sample_rate)
+            times.append(result["timing"]["compute_ms"])
+        latencies.append(statistics.median(times))
+        e, n = word_errors(reference, result["text"])
+        errors += e
+        words += n
+
+    return {
+        "mode": "int8" if stt.quantize == "int8" else "fp32" if DEVICE == "cpu" else "fp16",
+        "load_ms": load_ms,
+        "weights_mb": stt.memory_bytes / (1024 * 1024),
+        "latency_ms": sum(latencies),
+        "rtf": sum(latencies) / 1000 / max(audio_seconds, 1e-9),
+        "wer": errors / max(words, 1),
+    }
+
+
+def format_report(model: str, clips, rows: List[dict]) -> str:
+    """Render benchmark rows as a markdown report."""
+    lines = [
+        f"# Whisper quantization benchmark: {model} on {DEVICE}",
+        "",
+        f"{len(clips)} clips, latency is the sum of per-clip medians.",
+        "",
+        "| Mode | Load (ms) | Weights (MB) | Latency (ms) | RTF | WER |",
+        "|------|-----------|--------------|--------------|-----|-----|",
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['mode']} | {row['load_ms']:.0f} | {row['weights_mb']:.0f} | "
+            f"{row['latency_ms']:.0f} | {row['rtf']:.3f} | {row['wer']:.2%} |"
+        )
+    if len(rows) == 2 and rows[1]["latency_ms"] > 0:
+        lines += [
+            "",
+            f"int8 speed-up: {rows[0]['latency_ms'] / rows[1]['latency_ms']:.2f}x, "
+            f"WER change: {(rows[1]['wer'] - rows[0]['wer']) * 100:+.2f} points",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+async def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("clips_dir", type=Path, help="Directory of audio clips with .txt references")
+    parser.add_argument("--model", default="base.en", help="Whisper model (default: base.en)")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per clip (default: 3)")
+    parser.add_argument("--output", type=Path, help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    clips = _find_clips(args.clips_dir)
+    if not clips:
+        print(f"No clips with .txt references found in {args.clips_dir}", file=sys.stderr)
+        return 1
+
+    rows = [await _run_mode(args.model, mode, clips, args.runs) for mode in ("none", "int8")]
+    report = format_report(args.model, clips, rows)
+    print(report)
+    if args.output:
+        args.output.write_text(report, encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
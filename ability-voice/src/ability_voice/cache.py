@@ -0,0 +1,247 @@
+"""
+Content-addressed cache for transcription results.
+
+Pipelines often send the exact same clip more than once: retries, fan-out
+of one recording to several agents, replayed test fixtures. Whisper output
+is deterministic for a given input, so results are cached under a hash of
+the PCM samples, sample rate, language and model name:
+
+    - an in-memory LRU tier bounded by a byte budget
+    - an optional on-disk tier (one JSON file per entry) that survives
+      restarts and refills the memory tier on hit
+
+``CachedTranscriber`` puts the cache in front of any transcription backend
+(engine, batch scheduler or worker pool) without changing its interface.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Union
+
+import numpy as np
+
+from .resample import to_mono
+from .stt import DEFAULT_PROFILE, SpeechToText, check_profile
+
+
+def audio_key(
+    audio_data: Union[bytes, np.ndarray],
+    sample_rate: int,
+    language: str,
+    model_name: str,
+    profile: str = DEFAULT_PROFILE,
+) -> str:
+    """
+    Hash audio content and decoding parameters into a cache key.
+
+    The samples are hashed as the contiguous mono float32 array the engine
+    would transcribe, so the same audio keys the same whether it arrives as
+    bytes or as an array, and arrays of another dtype or channel layout
+    can't collide with it byte for byte.
+
+    Args:
+        audio_data: Raw float32 bytes or a numpy array
+        sample_rate: Audio sample rate in Hz
+        language: Language code
+        model_name: Whisper model name
+        profile: Decoding profile
+
+    Returns:
+        32-character hex digest
+    """
+    if isinstance(audio_data, bytes):
+        samples = np.frombuffer(audio_data, dtype=np.float32)
+    else:
+        samples = to_mono(audio_data)
+    pcm = np.ascontiguousarray(samples, dtype=np.float32).data
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{model_name}|{profile}|{language}|{int(sample_rate)}|".encode())
+    digest.update(pcm)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Two-tier LRU cache of transcription result dicts.
+
+    Example:
+        >>> cache = TranscriptionCache(max_bytes=64 << 20, disk_dir="~/.cache/kadi-stt")
+        >>> key = audio_key(audio, 16000, "en", "base.en")
+        >>> cache.get(key) or cache.put(key, result)
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20, disk_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget for cached results (serialized size)
+            disk_dir: Directory for the persistent tier (None = memory only)
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = os.path.expanduser(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (result, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return a copy of the cached result, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return copy.deepcopy(entry[0])
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                    payload = f.read()
+                result = json.loads(payload)
+            except (OSError, ValueError):
+                result = None
+            if result is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._insert(key, result, len(payload))
+                return copy.deepcopy(result)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: dict) -> None:
+        """Store a result (without per-call timing) in both tiers."""
+        result = {k: v for k, v in result.items() if k != "timing"}
+        payload = json.dumps(result, default=float)
+        with self._lock:
+            self._insert(key, result, len(payload))
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)  # atomic: readers never see partial files
+            except OSError as e:
+                print(f"[STT] Cache write failed: {e}")
+
+    def _insert(self, key: str, result: dict, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (result, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop the memory tier (the disk tier is left in place)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and memory usage."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk_dir": self.disk_dir,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / max(lookups, 1), 3),
+        }
+
+
+class CachedTranscriber:
+    """
+    Transcription backend wrapper that answers repeated clips from a cache.
+
+    Exposes the same ``transcribe`` / ``transcribe_file`` coroutines as
+    ``SpeechToText``; everything else is delegated to the wrapped backend.
+    """
+
+    def __init__(self, backend, cache: TranscriptionCache, model_name: str):
+        self.backend = backend
+        self.cache = cache
+        self.model_name = model_name
+
+    async def transcribe(
+        self,
+        audio_data: Union[bytes, np.ndarray],
+        sample_rate: int = 16000,
+        language: str = "en",
+        busy: str = "wait",
+        profile: str = DEFAULT_PROFILE,
+    ) -> dict:
+        """Return the cached result for this clip, or transcribe and cache it."""
+        started = time.perf_counter()
+        key = audio_key(audio_data, sample_rate, language, self.model_name, check_profile(profile))
+        cached = self.cache.get(key)
+        if cached is not None:
+            cached["timing"] = {
+                "cache_hit": True,
+                "lookup_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+            return cached
+
+        result = await self.backend.transcribe(
+            audio_data, sample_rate=sample_rate, language=language,
+            busy=busy, profile=profile,
+        )
+        self.cache.put(key, result)
+        return result
+
+    async def transcribe_file(
+        self,
+        file_path: str,
+        language: str = "en",
+        busy: str = "wait",
+        profile: str = DEFAULT_PROFILE,
+    ) -> dict:
+        """Transcribe a file, keyed by its decoded audio content."""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Audio file not found: {file_path}")
+        audio_array, sample_rate = await asyncio.to_thread(
+            SpeechToText.read_file, file_path
+        )
+        return await self.transcribe(
+            audio_array, sample_rate=sample_rate, language=language,
+            busy=busy, profile=profile,
+        )
+
+    def status(self) -> dict:
+        """Backend status plus cache statistics."""
+        status = self.backend.status()
+        status["cache"] = self.cache.stats()
+        return status
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
@@ -0,0 +1,172 @@
+"""
+Hand-off of microphone audio from the PortAudio thread to the event loop.
+
+The input callback runs on PortAudio's own thread, where calling into an
+``asyncio.Queue`` is not safe, and a bounded queue that silently drops
+chunks hides the moment the listener falls behind. ``CaptureBuffer`` is a
+single-producer/single-consumer ring instead:
+
+    - the callback copies each block into preallocated storage and
+      advances ``_written``; the event loop reads and advances ``_read``.
+      Each counter has one writer, so no lock is needed
+    - the loop is woken with ``call_soon_threadsafe``
+    - a block that doesn't fit is dropped whole and counted as an overrun,
+      never overwriting audio the loop hasn't read
+    - every block is timestamped, so the loop knows how long audio waited
+      between capture and processing, and can skip a stale backlog to get
+      back to live audio
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+
+class CaptureBuffer:
+    """
+    Lock-free SPSC buffer between an input stream callback and the event loop.
+
+    Example:
+        >>> capture = CaptureBuffer(16000 * 10)
+        >>> capture.attach(asyncio.get_running_loop())
+        >>> # in the stream callback: capture.write(indata[:, 0], status.input_overflow)
+        >>> chunk = await capture.read(4800, timeout=0.5)
+    """
+
+    def __init__(self, capacity: int, sample_rate: int = 16000):
+        """
+        Args:
+            capacity: Samples that can wait unread before blocks are dropped
+            sample_rate: Used to report backlog and lag in seconds
+        """
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._written = 0  # callback thread only
+        self._read = 0     # event loop only
+        # (end position, perf_counter) per block; deque append/popleft are atomic
+        self._stamps: deque = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+
+        # Statistics
+        self.blocks = 0
+        self.overruns = 0          # blocks dropped because the buffer was full
+        self.dropped_samples = 0
+        self.device_overflows = 0  # PortAudio reported lost input
+        self.recoveries = 0        # backlogs skipped to catch up
+        self.skipped_samples = 0
+        self.last_lag = 0.0        # capture-to-processing delay of the last read
+        self.max_lag = 0.0
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start accepting blocks for ``loop``, discarding anything left over."""
+        self._read = self._written
+        self._stamps.clear()
+        self._ready = asyncio.Event()
+        self._loop = loop
+
+    def detach(self) -> None:
+        """Stop accepting blocks."""
+        self._loop = None
+
+    @property
+    def backlog(self) -> int:
+        """Samples captured but not read yet."""
+        return self._written - self._read
+
+    @property
+    def lag(self) -> float:
+        """Seconds the oldest unread block has waited (or the last read's delay if none)."""
+        try:
+            return time.perf_counter() - self._stamps[0][1]
+        except IndexError:
+            return self.last_lag
+
+    def write(self, block: np.ndarray, overflowed: bool = False) -> None:
+        """Callback thread: copy a block in and wake the loop."""
+        loop = self._loop
+        if loop is None:
+            return
+        if overflowed:
+            self.device_overflows += 1
+        n = len(block)
+        if self._written - self._read + n > self.capacity:
+            self.overruns += 1
+            self.dropped_samples += n
+            return
+        start = self._written % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = block[:first]
+        self._data[:n - first] = block[first:]
+        self._written += n  # publish only after the samples are in place
+        self.blocks += 1
+        self._stamps.append((self._written, time.perf_counter()))
+        try:
+            loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # loop closed while the stream was still running
+
+    async def read(self, max_samples: int, timeout: float) -> Optional[np.ndarray]:
+        """
+        Event loop: wait for audio and return up to ``max_samples`` of it.
+
+        Returns:
+            A copy of the oldest unread samples, or None on timeout
+        """
+        if self._written == self._read:
+            self._ready.clear()
+            if self._written == self._read:
+                try:
+                    await asyncio.wait_for(self._ready.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return None
+        n = min(self._written - self._read, max_samples)
+        start = self._read % self.capacity
+        first = min(n, self.capacity - start)
+        chunk = np.concatenate([self._data[start:start + first], self._data[:n - first]])
+        self._read += n
+        self._settle()
+        return chunk
+
+    def recover(self, keep: int = 0) -> int:
+        """
+        Skip the backlog, keeping only the newest ``keep`` samples.
+
+        Returns:
+            Samples skipped
+        """
+        skipped = max(0, self._written - self._read - keep)
+        if skipped:
+            self._read += skipped
+            self.recoveries += 1
+            self.skipped_samples += skipped
+            self._settle(processed=False)
+        return skipped
+
+    def _settle(self, processed: bool = True) -> None:
+        """Drop stamps of consumed blocks; if they were read, take the lag from the newest."""
+        stamp = None
+        while self._stamps and self._stamps[0][0] <= self._read:
+            stamp = self._stamps.popleft()
+        if stamp is not None and processed:
+            self.last_lag = time.perf_counter() - stamp[1]
+            self.max_lag = max(self.max_lag, self.last_lag)
+
+    def status(self) -> dict:
+        """Backlog, lag and loss counters."""
+        return {
+            "blocks": self.blocks,
+            "backlog_ms": round(self.backlog / self.sample_rate * 1000, 1),
+            "capacity_ms": round(self.capacity / self.sample_rate * 1000, 1),
+            "lag_ms": round(self.lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "overruns": self.overruns,
+            "dropped_samples": self.dropped_samples,
+            "device_overflows": self.device_overflows,
+            "recoveries": self.recoveries,
+            "skipped_samples": self.skipped_samples,
+        }
@@ -0,0 +1,186 @@
+"""
+Offloaded execution engine for blocking inference calls.
+
+Model inference (Whisper decode, Piper synthesis) holds the CPU/GPU for
+hundreds of milliseconds to seconds. Running it directly inside a coroutine
+stalls the whole asyncio loop, so the KĀDI client stops answering tool
+calls, heartbeats and events. ``InferenceExecutor`` runs those calls on a
+dedicated worker thread behind a bounded submission queue and records how
+long each call waited and computed.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, Type
+
+BUSY_MODES = ("wait", "reject", "skip")
+
+
+class EngineBusyError(RuntimeError):
+    """Raised when an executor rejects work because it is at capacity."""
+
+
+class InferenceExecutor:
+    """
+    Bounded, single-lane executor for blocking model calls.
+
+    Calls run one at a time (in submission order) on a dedicated thread so
+    a model is never entered concurrently. At most ``max_queue`` calls may
+    be outstanding (queued + running). What happens when a caller arrives
+    at a full queue depends on the ``busy`` mode passed to ``run()``:
+
+        - ``"wait"``: wait for a free slot (backpressure on the caller)
+        - ``"reject"``: raise ``busy_error`` immediately
+        - ``"skip"``: raise ``busy_error`` if *anything* is queued or running
+
+    Example:
+        >>> executor = InferenceExecutor("stt", max_queue=8)
+        >>> value, timing = await executor.run(model.transcribe, audio)
+        >>> timing["compute_ms"]
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_queue: int = 8,
+        busy_error: Type[EngineBusyError] = EngineBusyError,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            name: Name used for the worker thread and log messages
+            max_queue: Maximum outstanding (queued + running) calls
+            busy_error: Exception type raised on rejection
+        """
+        if max_queue < 1:
+            raise ValueError("max_queue must be >= 1")
+        self.name = name
+        self.max_queue = max_queue
+        self._busy_error = busy_error
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-infer")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._outstanding = 0
+        self._running = False
+
+        # Aggregate statistics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._total_wait_ms = 0.0
+        self._total_compute_ms = 0.0
+        self._max_wait_ms = 0.0
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        busy: str = "wait",
+        **kwargs,
+    ) -> Tuple[Any, dict]:
+        """
+        Run ``fn(*args, **kwargs)`` on the worker thread.
+
+        Args:
+            fn: Blocking callable to execute
+            busy: Behaviour when the queue is full ("wait", "reject", "skip")
+
+        Returns:
+            Tuple of (return value, timing dict with queue_wait_ms and compute_ms)
+
+        Raises:
+            EngineBusyError (or the configured subclass): when rejected
+        """
+        if busy not in BUSY_MODES:
+            raise ValueError(f"Unknown busy mode: {busy}. Supported: {BUSY_MODES}")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_queue)
+
+        if busy == "skip" and self._outstanding > 0:
+            self.rejected += 1
+            raise self._busy_error(f"{self.name} engine is busy")
+        if busy == "reject" and self._slots.locked():
+            self.rejected += 1
+            raise self._busy_error(
+                f"{self.name} queue full ({self.max_queue} outstanding)"
+            )
+
+        await self._slots.acquire()
+        self._outstanding += 1
+        self.submitted += 1
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+        timing = {}
+
+        def _call():
+            started_at = time.perf_counter()
+            self._running = True
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._running = False
+                finished_at = time.perf_counter()
+                timing["queue_wait_ms"] = round((started_at - submitted_at) * 1000, 1)
+                timing["compute_ms"] = round((finished_at - started_at) * 1000, 1)
+
+        def _release(_future):
+            # Release from the loop thread once the call has really finished,
+            # even if the awaiting caller was cancelled or timed out.
+            loop.call_soon_threadsafe(self._finish, timing)
+
+        future = self._pool.submit(_call)
+        future.add_done_callback(_release)
+        try:
+            value = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        return value, timing
+
+    def _finish(self, timing: dict) -> None:
+        self._outstanding -= 1
+        self._slots.release()
+        if "compute_ms" in timing:
+            self.completed += 1
+            self._total_wait_ms += timing["queue_wait_ms"]
+            self._total_compute_ms += timing["compute_ms"]
+            self._max_wait_ms = max(self._max_wait_ms, timing["queue_wait_ms"])
+
+    @property
+    def busy(self) -> bool:
+        """True while a call is running or queued."""
+        return self._outstanding > 0
+
+    @property
+    def full(self) -> bool:
+        """True when every queue slot is taken."""
+        return self._outstanding >= self.max_queue
+
+    @property
+    def outstanding(self) -> int:
+        """Number of queued + running calls."""
+        return self._outstanding
+
+    def status(self) -> dict:
+        """Queue depth and timing statistics."""
+        done = max(self.completed, 1)
+        return {
+            "outstanding": self._outstanding,
+            "running": self._running,
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_queue_wait_ms": round(self._total_wait_ms / done, 1),
+            "max_queue_wait_ms": round(self._max_wait_ms, 1),
+            "avg_compute_ms": round(self._total_compute_ms / done, 1),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker thread after outstanding calls finish."""
+        self._pool.shutdown(wait=False)
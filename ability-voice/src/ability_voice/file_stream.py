@@ -0,0 +1,193 @@
+"""
+Memory-bounded transcription of long audio files.
+
+Reading a multi-hour recording with ``sf.read`` materialises the whole
+file (plus resampled and normalised copies) before Whisper sees a single
+sample. ``transcribe_file_streaming`` instead pulls the file through
+``soundfile.blocks``, resamples each block with a ``StreamingResampler``
+into one preallocated 30s window, and transcribes window by window. Peak
+audio memory is one window plus one read block, whatever the file length.
+
+Window seams follow Whisper's own seek rule: when a full window yields
+more than one segment, the last segment may be cut mid-word, so its audio
+is carried over to the start of the next window and re-transcribed there.
+Committed segments are reported as ``voice.transcription_progress`` events
+as soon as each window finishes.
+"""
+
+import asyncio
+import os
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from .resample import StreamingResampler, to_mono
+from .stt import DEFAULT_PROFILE
+from .vad import speech_frames
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30
+BLOCK_SECONDS = 5  # source audio decoded per read
+
+
+def audio_duration(file_path: str) -> Optional[float]:
+    """File length in seconds from its header, or None if unknown (blocking)."""
+    info = sf.info(file_path)
+    return info.frames / info.samplerate if info.frames > 0 else None
+
+
+def _next_block(blocks):
+    return next(blocks, None)
+
+
+async def transcribe_file_streaming(
+    transcriber,
+    file_path: str,
+    language: str = "en",
+    event_emitter: Optional[Callable] = None,
+    vad_aggressiveness: Optional[int] = 2,
+    profile: str = DEFAULT_PROFILE,
+) -> dict:
+    """
+    Transcribe an audio file window by window with constant memory.
+
+    Args:
+        transcriber: Anything with SpeechToText's ``transcribe`` coroutine
+            (engine, batch scheduler or worker pool)
+        file_path: Path to a soundfile-readable audio file
+        language: Language code
+        event_emitter: Optional ``(topic, data)`` callback for progress events
+        vad_aggressiveness: Skip windows with no detected speech (None
+            transcribes every window)
+        profile: Decoding profile for every window
+
+    Returns:
+        Transcription dict (text, language, segments on the file's timeline)
+        plus a ``streaming`` summary of windows processed and skipped
+
+    Raises:
+        FileNotFoundError: If audio file doesn't exist
+        RuntimeError: If soundfile is not installed
+    """
+    if sf is None:
+        raise RuntimeError("soundfile is required for file transcription")
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Audio file not found: {file_path}")
+
+    info = await asyncio.to_thread(sf.info, file_path)
+    total_seconds = info.frames / info.samplerate if info.frames > 0 else None
+    resampler = StreamingResampler(info.samplerate, SAMPLE_RATE)
+    blocks = sf.blocks(
+        file_path,
+        blocksize=int(info.samplerate * BLOCK_SECONDS),
+        dtype="float32",
+        always_2d=True,
+    )
+    print(f"[STT] Streaming transcription of {file_path} "
+          f"({total_seconds or 0:.1f}s, {info.samplerate} Hz)")
+
+    window = np.zeros(WINDOW_SECONDS * SAMPLE_RATE, dtype=np.float32)
+    filled = 0          # valid samples in window
+    window_start = 0    # file position of window[0], in 16 kHz samples
+    segments = []
+    texts = []
+    detected_language = language
+    windows_run = 0
+    windows_skipped = 0
+    started = time.perf_counter()
+
+    async def run_window(final: bool) -> None:
+        nonlocal filled, window_start, detected_language, windows_run, windows_skipped
+        audio = window[:filled]
+        offset = window_start / SAMPLE_RATE
+        consumed = filled
+
+        if vad_aggressiveness is not None and not (
+            await asyncio.to_thread(speech_frames, audio, vad_aggressiveness)
+        ).any():
+            windows_skipped += 1
+            new_segments = []
+        else:
+            windows_run += 1
+            result = await transcriber.transcribe(
+                audio_data=audio, sample_rate=SAMPLE_RATE, language=language,
+                profile=profile,
+            )
+            detected_language = result.get("language", detected_language)
+            new_segments = result.get("segments", [])
+            # Hold back a possibly truncated last segment for the next window
+            # (at most half a window, so every pass makes progress)
+            if not final and len(new_segments) > 1:
+                carry_from = int(new_segments[-1].get("start", 0) * SAMPLE_RATE)
+                if filled // 2 <= carry_from < filled:
+                    consumed = carry_from
+                    new_segments = new_segments[:-1]
+            new_segments = [
+                {
+                    "start": round(offset + seg.get("start", 0), 2),
+                    "end": round(offset + seg.get("end", 0), 2),
+                    "text": seg.get("text", "").strip(),
+                }
+                for seg in new_segments
+                if seg.get("text", "").strip()
+            ]
+
+        segments.extend(new_segments)
+        texts.extend(seg["text"] for seg in new_segments)
+
+        # Shift the carried-over tail to the front of the window in place
+        window[:filled - consumed] = window[consumed:filled]
+        filled -= consumed
+        window_start += consumed
+
+        if event_emitter:
+            event_emitter("voice.transcription_progress", {
+                "file_path": file_path,
+                "processed_seconds": round(window_start / SAMPLE_RATE, 2),
+                "total_seconds": round(total_seconds, 2) if total_seconds else None,
+                "segments": new_segments,
+                "final": final,
+            })
+
+    async def feed(chunk: np.ndarray) -> None:
+        nonlocal filled
+        while len(chunk):
+            take = min(len(chunk), len(window) - filled)
+            window[filled:filled + take] = chunk[:take]
+            filled += take
+            chunk = chunk[take:]
+            if filled == len(window):
+                await run_window(final=False)
+
+    try:
+        while True:
+            block = await asyncio.to_thread(_next_block, blocks)
+            if block is None:
+                break
+            await feed(resampler.process(to_mono(block)))
+        await feed(resampler.flush())
+        if filled:
+            await run_window(final=True)
+    finally:
+        blocks.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"[STT] Streamed {window_start / SAMPLE_RATE:.1f}s in {elapsed:.1f}s "
+          f"({windows_run} windows, {windows_skipped} silent)")
+    return {
+        "text": " ".join(texts).strip(),
+        "language": detected_language,
+        "segments": segments,
+        "streaming": {
+            "duration_seconds": round(window_start / SAMPLE_RATE, 2),
+            "windows": windows_run,
+            "silent_windows": windows_skipped,
+            "elapsed_ms": round(elapsed * 1000, 1),
+        },
+    }
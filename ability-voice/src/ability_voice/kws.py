@@ -0,0 +1,288 @@
+"""
+Keyword spotting first stage for the wake word listener.
+
+Running Whisper on every window that contains speech keeps a core busy in
+any room where people are talking. ``KeywordSpotter`` is a cheap filter in
+front of it: the last second or two of microphone audio is turned into
+MFCC features and matched against enrolled recordings of the wake word
+with subsequence dynamic time warping (DTW). Only windows that score
+under the threshold are forwarded to Whisper for confirmation.
+
+Templates are short recordings of the wake word (WAV/FLAC, any rate) kept
+in a directory; a handful from the actual speaker and microphone works
+best. With no templates enrolled the listener keeps probing with Whisper
+alone.
+"""
+
+import os
+import time
+from itertools import combinations
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .resample import resample, to_mono
+from .vad import FRAME_SIZE, SAMPLE_RATE, speech_frames
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+FRAME_LENGTH = 400  # 25ms analysis frames
+HOP_LENGTH = 160    # 10ms hop
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+DEFAULT_THRESHOLD = 4.0  # used until two templates allow calibration
+CALIBRATION_MARGIN = 1.5
+
+_filterbank: Optional[np.ndarray] = None
+_dct: Optional[np.ndarray] = None
+
+
+def _mel_filterbank() -> np.ndarray:
+    """Triangular mel filters, shape (N_MELS, N_FFT // 2 + 1)."""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(20.0), hz_to_mel(SAMPLE_RATE / 2 - 400), N_MELS + 2)
+    bins = np.floor((N_FFT + 1) * mel_to_hz(mels) / SAMPLE_RATE).astype(int)
+    filters = np.zeros((N_MELS, N_FFT // 2 + 1), dtype=np.float32)
+    for m in range(1, N_MELS + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        filters[m - 1, left:center] = (np.arange(left, center) - left) / max(center - left, 1)
+        filters[m - 1, center:right] = (right - np.arange(center, right)) / max(right - center, 1)
+    return filters
+
+
+def _dct_matrix() -> np.ndarray:
+    """Orthonormal DCT-II rows 1..N_MFCC-1 (c0, the loudness term, is dropped)."""
+    n = np.arange(N_MELS)
+    k = np.arange(1, N_MFCC)[:, None]
+    return (np.cos(np.pi * k * (2 * n + 1) / (2 * N_MELS)) * np.sqrt(2.0 / N_MELS)).astype(np.float32)
+
+
+def mfcc(audio: np.ndarray) -> np.ndarray:
+    """
+    Mean-normalized MFCCs of 16 kHz mono audio.
+
+    Returns:
+        float32 array of shape (frames, N_MFCC - 1); empty if the audio is
+        shorter than one analysis frame
+    """
+    global _filterbank, _dct
+    if _filterbank is None:
+        _filterbank, _dct = _mel_filterbank(), _dct_matrix()
+    audio = np.asarray(audio, dtype=np.float32)
+    if len(audio) < FRAME_LENGTH:
+        return np.zeros((0, N_MFCC - 1), dtype=np.float32)
+    emphasized = np.append(audio[0], audio[1:] - 0.97 * audio[:-1])
+    # Strided view over the signal: no copy until the window is applied
+    frames = np.lib.stride_tricks.sliding_window_view(emphasized, FRAME_LENGTH)[::HOP_LENGTH]
+    spectrum = np.abs(np.fft.rfft(frames * np.hamming(FRAME_LENGTH), N_FFT)) ** 2
+    features = np.log(spectrum @ _filterbank.T + 1e-10) @ _dct.T
+    return (features - features.mean(axis=0)).astype(np.float32)
+
+
+def dtw_match(template: np.ndarray, query: np.ndarray) -> Tuple[float, int]:
+    """
+    Best match of ``template`` anywhere inside ``query`` (subsequence DTW).
+
+    Steps are (1,1), (1,2) and (2,1), so the keyword may be spoken at half
+    to twice the template's speed. Every path visits each template frame
+    exactly once, and the score is the mean frame distance along the best
+    path: lower is a closer match.
+
+    Returns:
+        (score, query frame the match ends on)
+    """
+    n, m = len(template), len(query)
+    if n < 2 or m < 2:
+        return float("inf"), m - 1
+    cost = np.sqrt(np.maximum(
+        (template ** 2).sum(1)[:, None] + (query ** 2).sum(1)[None, :] - 2.0 * template @ query.T,
+        0.0,
+    ))
+    inf = np.float32(np.inf)
+    acc = np.full((n, m), inf, dtype=np.float32)
+    acc[0] = cost[0]  # the match may start at any query frame
+    for i in range(1, n):
+        best = np.full(m, inf, dtype=np.float32)
+        best[1:] = acc[i - 1, :-1]
+        best[2:] = np.minimum(best[2:], acc[i - 1, :-2])
+        if i >= 2:
+            best[1:] = np.minimum(best[1:], acc[i - 2, :-1] + cost[i - 1, 1:])
+        acc[i] = best + cost[i]
+    end = int(acc[-1].argmin())
+    return float(acc[-1, end] / n), end
+
+
+def dtw_score(template: np.ndarray, query: np.ndarray) -> float:
+    """Score of the best match of ``template`` inside ``query`` (see dtw_match)."""
+    return dtw_match(template, query)[0]
+
+
+def trim_silence(audio: np.ndarray) -> np.ndarray:
+    """Cut 16 kHz audio down to its first..last speech frame."""
+    flags = speech_frames(audio)
+    if not flags.any():
+        return audio
+    speech = np.flatnonzero(flags)
+    return audio[speech[0] * FRAME_SIZE:(speech[-1] + 1) * FRAME_SIZE]
+
+
+class KeywordSpotter:
+    """
+    MFCC + DTW template matcher for a single keyword.
+
+    Example:
+        >>> spotter = KeywordSpotter(templates_dir="~/.local/share/kadi/wake-templates")
+        >>> spotter.enroll(recording, 16000)
+        >>> hit, score = spotter.detect(last_two_seconds)
+    """
+
+    def __init__(self, threshold: float = 0.0, templates_dir: Optional[str] = None):
+        """
+        Initialize the spotter and load any enrolled templates.
+
+        Args:
+            threshold: Match threshold on the DTW score (0 = calibrate from
+                the spread between enrolled templates)
+            templates_dir: Directory of enrolled recordings (new enrollments
+                are saved here when soundfile is installed)
+        """
+        self.fixed_threshold = threshold
+        self.templates_dir = Path(os.path.expanduser(templates_dir)) if templates_dir else None
+        self._templates: List[np.ndarray] = []
+        self._durations: List[float] = []
+        self.threshold = threshold or DEFAULT_THRESHOLD
+
+        # Statistics
+        self.checks = 0
+        self.candidates = 0
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.last_score: Optional[float] = None
+        self.last_end: Optional[int] = None  # samples into the last window where the match ended
+        self.best_score: Optional[float] = None
+
+        if self.templates_dir is not None and self.templates_dir.is_dir():
+            self._load()
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._templates)
+
+    @property
+    def window_samples(self) -> int:
+        """Audio scanned per check: room for the longest template spoken slowly."""
+        longest = max(self._durations, default=1.0)
+        return int(SAMPLE_RATE * min(longest * 1.5 + 0.2, 3.0))
+
+    def _load(self) -> None:
+        if sf is None:
+            print("[WakeWord] soundfile not installed, can't load wake word templates")
+            return
+        for path in sorted(self.templates_dir.iterdir()):
+            if path.suffix.lower() not in (".wav", ".flac"):
+                continue
+            try:
+                audio, sample_rate = sf.read(str(path), dtype="float32")
+                self._add(to_mono(audio), sample_rate)
+            except Exception as e:
+                print(f"[WakeWord] Skipping template {path.name}: {e}")
+        if self._templates:
+            print(f"[WakeWord] Loaded {len(self._templates)} wake word templates "
+                  f"(threshold {self.threshold:.3f})")
+
+    def _add(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        if sample_rate != SAMPLE_RATE:
+            audio = resample(audio, sample_rate, SAMPLE_RATE)
+        audio = trim_silence(audio)
+        if len(audio) < SAMPLE_RATE * 0.2:
+            raise ValueError("Template is too short (need at least 200ms of speech)")
+        self._templates.append(mfcc(audio))
+        self._durations.append(len(audio) / SAMPLE_RATE)
+        self._calibrate()
+        return audio
+
+    def enroll(self, audio: np.ndarray, sample_rate: int) -> dict:
+        """
+        Add a recording of the wake word as a template.
+
+        Raises:
+            ValueError: If the recording holds less than 200ms of speech
+        """
+        audio = self._add(np.asarray(audio, dtype=np.float32), sample_rate)
+        saved = None
+        if self.templates_dir is not None and sf is not None:
+            self.templates_dir.mkdir(parents=True, exist_ok=True)
+            path = self.templates_dir / f"template-{int(time.time() * 1000)}.wav"
+            sf.write(str(path), audio, SAMPLE_RATE, subtype="PCM_16")
+            saved = str(path)
+        return {
+            "templates": len(self._templates),
+            "duration_seconds": round(len(audio) / SAMPLE_RATE, 3),
+            "threshold": round(self.threshold, 4),
+            "saved": saved,
+        }
+
+    def _calibrate(self) -> None:
+        """Place the threshold just above how far enrolled templates are from each other."""
+        if self.fixed_threshold or len(self._templates) < 2:
+            return
+        spread = [
+            max(dtw_score(a, b), dtw_score(b, a))
+            for a, b in combinations(self._templates, 2)
+        ]
+        self.threshold = float(np.mean(spread)) * CALIBRATION_MARGIN
+
+    def detect(self, window: np.ndarray, new_seconds: Optional[float] = None) -> Tuple[bool, float]:
+        """
+        Score a window of 16 kHz audio against every template.
+
+        Args:
+            window: Recent audio, normally ``window_samples`` long
+            new_seconds: Audio not covered by the previous check, for the
+                CPU-per-audio-second figure (default: the whole window)
+
+        Returns:
+            (candidate, best score)
+        """
+        started = time.thread_time()
+        features = mfcc(window)
+        score, end = min((dtw_match(t, features) for t in self._templates), default=(float("inf"), 0))
+        self.last_end = min(end * HOP_LENGTH + FRAME_LENGTH, len(window))
+        self.cpu_seconds += time.thread_time() - started
+        self.audio_seconds += new_seconds if new_seconds is not None else len(window) / SAMPLE_RATE
+        self.checks += 1
+        self.last_score = score
+        if self.best_score is None or score < self.best_score:
+            self.best_score = score
+        hit = score <= self.threshold
+        if hit:
+            self.candidates += 1
+        return hit, score
+
+    def status(self) -> dict:
+        """Templates, threshold and the cost of the checks run so far."""
+        return {
+            "templates": len(self._templates),
+            "templates_dir": str(self.templates_dir) if self.templates_dir else None,
+            "threshold": round(self.threshold, 4),
+            "calibrated": not self.fixed_threshold and len(self._templates) >= 2,
+            "window_seconds": round(self.window_samples / SAMPLE_RATE, 2),
+            "checks": self.checks,
+            "candidates": self.candidates,
+            "last_score": round(self.last_score, 4) if self.last_score is not None else None,
+            "best_score": round(self.best_score, 4) if self.best_score is not None else None,
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "audio_seconds": round(self.audio_seconds, 1),
+            # Fraction of one core spent per second of audio scanned
+            "cpu_share": round(self.cpu_seconds / self.audio_seconds, 4) if self.audio_seconds else None,
+        }
@@ -0,0 +1,195 @@
+"""
+Registry of resident Whisper models.
+
+Different callers want different trade-offs from the same ability:
+``small.en`` accuracy for dictation, ``tiny.en`` latency for voice
+commands. ``ModelRegistry`` keeps several ``SpeechToText`` engines loaded
+at once under a memory budget. When loading another model would exceed the
+budget, the least recently used idle engines are unloaded first; an engine
+leased by a request in progress is never unloaded under it. The
+default model is pinned so the wake-word listener and streaming sessions
+never lose it.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from .stt import SpeechToText
+
+# Approximate fp32 weight size per model, used before a model is loaded
+MODEL_SIZE_MB = {
+    "tiny": 151, "tiny.en": 151,
+    "base": 290, "base.en": 290,
+    "small": 967, "small.en": 967,
+    "medium": 3055, "medium.en": 3055,
+    "large": 6174, "large-v2": 6174, "large-v3": 6180,
+}
+
+
+class _ModelEntry:
+    __slots__ = ("engine", "load_ms", "uses", "leases", "loaded_at", "last_used")
+
+    def __init__(self, engine: SpeechToText):
+        self.engine = engine
+        self.load_ms = 0.0
+        self.uses = 0
+        self.leases = 0  # requests currently holding the engine
+        self.loaded_at = 0.0
+        self.last_used = 0.0
+
+
+class ModelRegistry:
+    """
+    Keeps multiple Whisper models resident with LRU eviction.
+
+    Example:
+        >>> registry = ModelRegistry("tiny.en", max_memory_mb=2048)
+        >>> async with registry.lease("small.en") as engine:
+        ...     result = await engine.transcribe(audio)
+    """
+
+    def __init__(
+        self,
+        default_model: str,
+        max_memory_mb: float = 2048,
+        max_queue: int = 8,
+        quantize: str = "none",
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            default_model: Model used when a request names none (never evicted)
+            max_memory_mb: Budget for all resident models' weights
+            max_queue: Inference queue bound for each engine
+            quantize: Weight quantization mode for every engine
+        """
+        self.default_model = default_model
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.max_queue = max_queue
+        self.quantize = quantize
+        self._entries: "OrderedDict[str, _ModelEntry]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    async def get(self, model_name: Optional[str] = None) -> SpeechToText:
+        """
+        Return a loaded engine for ``model_name`` (default model if None).
+
+        Concurrent requests for a model that is still loading share the
+        same load.
+
+        Raises:
+            ValueError: If the model name is not supported
+        """
+        name = model_name or self.default_model
+        if name not in SpeechToText.SUPPORTED_MODELS:
+            raise ValueError(
+                f"Unknown model: {name}. Supported: {SpeechToText.SUPPORTED_MODELS}"
+            )
+
+        entry = self._entries.get(name)
+        if entry is None or not entry.engine.is_loaded:
+            if name not in self._loading:
+                self._loading[name] = asyncio.ensure_future(self._load(name))
+            try:
+                entry = await asyncio.shield(self._loading[name])
+            finally:
+                if name in self._loading and self._loading[name].done():
+                    del self._loading[name]
+
+        self._entries.move_to_end(name)
+        entry.uses += 1
+        entry.last_used = time.time()
+        return entry.engine
+
+    @asynccontextmanager
+    async def lease(self, model_name: Optional[str] = None) -> AsyncIterator[SpeechToText]:
+        """
+        Hold the engine for ``model_name`` resident until the block exits.
+
+        Use this rather than ``get()`` whenever the engine is used after
+        another await: an engine that is only fetched can be unloaded by a
+        concurrent load before its request reaches it.
+
+        Raises:
+            ValueError: If the model name is not supported
+        """
+        name = model_name or self.default_model
+        while True:
+            engine = await self.get(name)
+            entry = self._entries.get(name)
+            # Another load may have evicted it before this task resumed
+            if entry is not None and entry.engine is engine and engine.is_loaded:
+                break
+        entry.leases += 1
+        try:
+            yield engine
+        finally:
+            entry.leases -= 1
+
+    def peek(self, model_name: Optional[str] = None) -> Optional[SpeechToText]:
+        """Return the engine if it is resident, without loading or counting a use."""
+        entry = self._entries.get(model_name or self.default_model)
+        return entry.engine if entry is not None and entry.engine.is_loaded else None
+
+    async def _load(self, name: str) -> _ModelEntry:
+        await self._make_room(MODEL_SIZE_MB.get(name, 0) * 1024 * 1024, keep=name)
+        entry = self._entries.get(name) or _ModelEntry(
+            SpeechToText(model_name=name, max_queue=self.max_queue, quantize=self.quantize)
+        )
+        started = time.perf_counter()
+        await entry.engine.load()
+        entry.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        entry.loaded_at = time.time()
+        self._entries[name] = entry
+        self.loads += 1
+        print(f"[STT] Model {name} resident ({entry.engine.memory_bytes / 1e6:.0f} MB, "
+              f"loaded in {entry.load_ms:.0f} ms)")
+        # The estimate may have been low; settle the budget with real sizes
+        await self._make_room(0, keep=name)
+        return entry
+
+    def _resident_bytes(self) -> int:
+        return sum(e.engine.memory_bytes for e in self._entries.values())
+
+    async def _make_room(self, incoming: int, keep: str) -> None:
+        """Unload idle, unleased LRU models until ``incoming`` more bytes fit the budget."""
+        for name in list(self._entries):
+            if self._resident_bytes() + incoming <= self.max_bytes:
+                return
+            entry = self._entries[name]
+            if name in (keep, self.default_model) or entry.leases or entry.engine.is_busy():
+                continue
+            print(f"[STT] Evicting model {name} (LRU)")
+            await entry.engine.unload()
+            del self._entries[name]
+            self.evictions += 1
+
+    def status(self) -> dict:
+        """Resident models with memory, load time and use counts."""
+        return {
+            "default_model": self.default_model,
+            "quantize": self.quantize,
+            "max_memory_mb": round(self.max_bytes / (1024 * 1024)),
+            "resident_mb": round(self._resident_bytes() / (1024 * 1024)),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "models": [
+                {
+                    "model": name,
+                    "memory_mb": round(entry.engine.memory_bytes / (1024 * 1024)),
+                    "load_ms": entry.load_ms,
+                    "uses": entry.uses,
+                    "leases": entry.leases,
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                    "busy": entry.engine.is_busy(),
+                }
+                for name, entry in self._entries.items()
+            ],
+        }
@@ -0,0 +1,281 @@
+"""
+Resident Piper synthesis worker.
+
+Spawning the ``piper`` CLI for every utterance reloads the ONNX voice each
+time, and model load dominates latency for short phrases. ``PiperWorker``
+keeps one child process per voice with the model loaded and feeds it
+line-delimited JSON requests. The child answers with a JSON header line
+followed by raw int16 PCM on stdout, so no WAV file is written or re-read.
+
+The voice runs in a child process rather than in the ability so a native
+crash in onnxruntime or espeak can't take the broker connection down: the
+parent sees the pipe close, restarts the worker and retries the request
+once.
+
+Protocol (one request at a time):
+    -> {"text": "...", "speaker_id": 0, "length_scale": 1.0,
+        "noise_scale": 0.667, "noise_w": 0.8, "sentence_silence": 0.2}
+    <- {"ok": true, "sample_rate": 22050, "samples": N} + N int16 samples
+    <- {"ok": false, "error": "..."}
+After loading the voice the worker announces itself with
+{"ok": true, "ready": true, "sample_rate": ...}.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class PiperWorkerCrashed(RuntimeError):
+    """The worker process exited or closed its pipes mid-request."""
+
+
+class PiperWorker:
+    """
+    Long-lived Piper process for one voice.
+
+    Example:
+        >>> worker = PiperWorker("en_US-lessac-medium.onnx", "en_US-lessac-medium.onnx.json")
+        >>> pcm, sample_rate = await worker.synthesize("Hello, world!")
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        config_path: str,
+        use_cuda: bool = False,
+        timeout: float = 120.0,
+        threads: int = 0,
+    ):
+        """
+        Initialize the worker (the process starts on first use).
+
+        Args:
+            model_path: Path to the voice .onnx model
+            config_path: Path to the voice .onnx.json config
+            use_cuda: Run the voice on the CUDA execution provider
+            timeout: Seconds to wait for a load or a synthesis before the
+                worker is considered hung and killed
+            threads: ONNX Runtime intra-op threads (0 = runtime default,
+                which uses every core; set it when running several workers)
+        """
+        self.model_path = model_path
+        self.config_path = config_path
+        self.use_cuda = use_cuda
+        self.timeout = timeout
+        self.threads = threads
+        self.sample_rate: Optional[int] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+        self.closed = False
+        self.starts = 0
+        self.crashes = 0
+        self.requests = 0
+        self.load_ms = 0.0
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    def is_busy(self) -> bool:
+        return self._lock.locked()
+
+    async def start(self) -> None:
+        """Start the worker and wait until the voice is loaded."""
+        # Run this file as a script: "-m" would import the package, and with
+        # it Whisper and the broker client, into every worker
+        args = [sys.executable, os.path.abspath(__file__), self.model_path, self.config_path]
+        if self.use_cuda:
+            args.append("--cuda")
+        if self.threads:
+            args += ["--threads", str(self.threads)]
+        started = time.perf_counter()
+        # stderr is inherited so the worker's log lines appear with ours
+        self._process = await asyncio.create_subprocess_exec(
+            *args, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+        )
+        self.starts += 1
+        try:
+            header = await asyncio.wait_for(self._read_header(), self.timeout)
+        except BaseException:
+            self._kill()
+            raise
+        if not header.get("ok"):
+            self._kill()
+            raise RuntimeError(header.get("error", "Piper worker failed to start"))
+        self.sample_rate = header["sample_rate"]
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(f"[TTS] Piper worker {self._process.pid} ready (loaded in {self.load_ms:.0f} ms)")
+
+    async def synthesize(
+        self,
+        text: str,
+        speaker_id: int = 0,
+        length_scale: float = 1.0,
+        noise_scale: float = 0.667,
+        noise_w: float = 0.8,
+        sentence_silence: float = 0.0,
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Synthesize text in the worker.
+
+        ``sentence_silence`` seconds of silence are inserted between the
+        sentences Piper finds in the text.
+
+        Returns:
+            Tuple of (int16 PCM array, sample rate)
+
+        Raises:
+            RuntimeError: If Piper rejects the request, the worker hangs,
+                it crashes again after a restart, or it has been closed
+        """
+        request = json.dumps({
+            "text": text,
+            "speaker_id": speaker_id,
+            "length_scale": length_scale,
+            "noise_scale": noise_scale,
+            "noise_w": noise_w,
+            "sentence_silence": sentence_silence,
+        }).encode("utf-8") + b"\n"
+
+        async with self._lock:
+            for attempt in (1, 2):
+                if self.closed:
+                    # Never respawn a worker its owner has let go of
+                    raise RuntimeError("Piper worker is closed")
+                if not self.is_alive:
+                    if self.starts:
+                        print("[TTS] Restarting Piper worker")
+                    await self.start()
+                try:
+                    result = await asyncio.wait_for(self._roundtrip(request), self.timeout)
+                except PiperWorkerCrashed as e:
+                    self.crashes += 1
+                    print(f"[TTS] Piper worker crashed: {e}")
+                    self._kill()
+                    if attempt == 2:
+                        raise RuntimeError(f"Piper worker crashed twice: {e}") from e
+                    continue
+                except asyncio.TimeoutError:
+                    self._kill()
+                    raise RuntimeError(f"Piper synthesis timed out after {self.timeout:.0f}s")
+                except asyncio.CancelledError:
+                    # The reply is still in flight; the pipe can't be reused
+                    self._kill()
+                    raise
+                self.requests += 1
+                return result
+
+    async def _roundtrip(self, request: bytes) -> Tuple[np.ndarray, int]:
+        try:
+            self._process.stdin.write(request)
+            await self._process.stdin.drain()
+            header = await self._read_header()
+            if not header.get("ok"):
+                raise RuntimeError(f"Piper synthesis failed: {header.get('error')}")
+            data = await self._process.stdout.readexactly(header["samples"] * 2)
+        except (BrokenPipeError, ConnectionResetError, asyncio.IncompleteReadError) as e:
+            raise PiperWorkerCrashed(f"exit code {self._process.returncode}") from e
+        return np.frombuffer(data, dtype=np.int16), header["sample_rate"]
+
+    async def _read_header(self) -> dict:
+        line = await self._process.stdout.readline()
+        if not line:
+            raise PiperWorkerCrashed("worker closed its output")
+        return json.loads(line)
+
+    def _kill(self) -> None:
+        if self.is_alive:
+            self._process.kill()
+        self._process = None
+
+    async def close(self) -> None:
+        """Stop the worker for good, letting it finish the current request."""
+        self.closed = True
+        process, self._process = self._process, None
+        if process is None or process.returncode is not None:
+            return
+        process.stdin.close()  # the worker exits at end of input
+        try:
+            await asyncio.wait_for(process.wait(), 5.0)
+        except asyncio.TimeoutError:
+            process.kill()
+
+    def status(self) -> dict:
+        return {
+            "alive": self.is_alive,
+            "pid": self._process.pid if self.is_alive else None,
+            "starts": self.starts,
+            "crashes": self.crashes,
+            "requests": self.requests,
+            "load_ms": self.load_ms,
+        }
+
+
+def _serve(model_path: str, config_path: str, use_cuda: bool, threads: int) -> int:
+    """Worker side: load the voice once, then answer requests from stdin."""
+    from piper import PiperVoice, SynthesisConfig
+
+    out = sys.stdout.buffer
+    sys.stdout = sys.stderr  # stray prints must not corrupt the PCM stream
+
+    def send(header: dict, pcm: bytes = b"") -> None:
+        out.write(json.dumps(header).encode("utf-8") + b"\n")
+        out.write(pcm)
+        out.flush()
+
+    try:
+        voice = PiperVoice.load(model_path, config_path=config_path, use_cuda=use_cuda)
+        if threads:
+            # PiperVoice.load doesn't take session options; rebuild the session
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = threads
+            voice.session = onnxruntime.InferenceSession(
+                model_path, sess_options=options, providers=voice.session.get_providers()
+            )
+    except Exception as e:
+        send({"ok": False, "error": f"Could not load voice {model_path}: {e}"})
+        return 1
+    sample_rate = voice.config.sample_rate
+    send({"ok": True, "ready": True, "sample_rate": sample_rate})
+
+    for line in sys.stdin.buffer:
+        try:
+            request = json.loads(line)
+            syn_config = SynthesisConfig(
+                speaker_id=request.get("speaker_id"),
+                length_scale=request.get("length_scale"),
+                noise_scale=request.get("noise_scale"),
+                noise_w_scale=request.get("noise_w"),
+            )
+            silence = np.zeros(int(sample_rate * request.get("sentence_silence", 0.0)), dtype=np.int16)
+            chunks = []
+            # Piper yields one chunk per sentence
+            for chunk in voice.synthesize(request["text"], syn_config=syn_config):
+                if chunks and len(silence):
+                    chunks.append(silence)
+                chunks.append(chunk.audio_int16_array)
+            pcm = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int16)
+        except Exception as e:
+            send({"ok": False, "error": str(e)})
+            continue
+        send({"ok": True, "sample_rate": sample_rate, "samples": len(pcm)}, pcm.tobytes())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.pop(0)  # keep sibling modules from shadowing top-level ones
+    parser = argparse.ArgumentParser(description="Resident Piper synthesis worker")
+    parser.add_argument("model_path")
+    parser.add_argument("config_path")
+    parser.add_argument("--cuda", action="store_true")
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(_serve(args.model_path, args.config_path, args.cuda, args.threads))
@@ -0,0 +1,372 @@
+"""
+Persistent audio output with an utterance queue.
+
+Opening a PortAudio stream per utterance adds open/close latency to every
+``speak`` call, and a new call cuts off the one still playing.
+``AudioOutput`` instead keeps one output stream open for the life of the
+ability and feeds it from a preallocated ring buffer:
+
+    - utterances are queued in order and written back to back into the
+      ring, so consecutive ones play without a gap
+    - each utterance can be fed chunk by chunk while it is still being
+      synthesized
+    - ``cancel()`` (barge-in) drops the queue and everything buffered; the
+      device falls silent on the next callback
+    - the time from enqueueing an utterance to its first sample reaching
+      the device is recorded per utterance
+    - if the stream stops, errors or stalls, every utterance written to it
+      but not yet played out is resolved with an error instead of leaving
+      its waiters hanging; the stream reopens for the next utterance
+
+The ring is single-producer/single-consumer: the event loop writes and
+advances ``_written``, the PortAudio callback reads and advances
+``_read``. Each counter has one writer, so no lock is needed.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Set, Tuple
+
+import numpy as np
+import sounddevice as sd
+
+from .resample import StreamingResampler
+
+# Seconds buffered audio may sit unconsumed before the stream counts as stalled
+STALL_SECONDS = 2.0
+
+
+class Utterance:
+    """One queued piece of speech, fed with ``write()`` and ended with ``close()``."""
+
+    def __init__(self, utterance_id: int, volume: float, lead_in_ms: int):
+        self.id = utterance_id
+        self.volume = volume
+        self.lead_in_ms = lead_in_ms
+        self.enqueued_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+        self.error: Optional[str] = None  # set if the output failed under it
+        self.samples = 0
+        self._chunks: asyncio.Queue = asyncio.Queue()
+        self._done = asyncio.get_running_loop().create_future()
+
+    def write(self, audio: np.ndarray, sample_rate: int) -> None:
+        """Append mono float32 audio (any rate; resampled to the device rate)."""
+        self._chunks.put_nowait((audio, sample_rate))
+
+    def close(self) -> None:
+        """Mark the end of the utterance's audio."""
+        self._chunks.put_nowait(None)
+
+    async def wait(self) -> "Utterance":
+        """Wait until the utterance has played out, was cancelled, or failed."""
+        await asyncio.shield(self._done)
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._done.done()
+
+    @property
+    def played(self) -> bool:
+        """True once the utterance has played out in full."""
+        return self.done and not self.cancelled and self.error is None and self.started_at is not None
+
+    @property
+    def start_latency_ms(self) -> Optional[float]:
+        """Enqueue to first sample at the device, None until it starts."""
+        if self.started_at is None:
+            return None
+        return round((self.started_at - self.enqueued_at) * 1000, 1)
+
+    def _finish(self, at: Optional[float] = None) -> None:
+        if not self._done.done():
+            self.finished_at = at or time.perf_counter()
+            self._done.set_result(self)
+
+
+class AudioOutput:
+    """
+    Long-lived output stream playing queued utterances gaplessly.
+
+    Example:
+        >>> output = AudioOutput()
+        >>> utterance = output.play()
+        >>> utterance.write(audio, 22050)
+        >>> utterance.close()
+        >>> await utterance.wait()
+    """
+
+    def __init__(self, sample_rate: int = 0, buffer_seconds: float = 2.0):
+        """
+        Initialize the output (the stream opens on first use).
+
+        Args:
+            sample_rate: Stream rate (0 = the device's default rate)
+            buffer_seconds: Ring buffer size; bounds how far audio is
+                queued ahead of the device, and so what a cancel discards
+        """
+        self.sample_rate = sample_rate
+        self.buffer_seconds = buffer_seconds
+        self._stream = None
+        self._ring: Optional[np.ndarray] = None
+        self._written = 0  # total samples written (event loop only)
+        self._read = 0     # total samples played (callback only)
+        self._skip_to: Optional[int] = None
+        # (position, action) pairs fired by the callback once _read reaches position
+        self._marks: Deque[Tuple[int, Callable[[float], None]]] = deque()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._current: Optional[Utterance] = None
+        # Utterances being fed or waiting to play out; resolved if the stream dies
+        self._unfinished: Set[Utterance] = set()
+        self._feeder: Optional[asyncio.Task] = None
+        self._watchdog: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count(1)
+        self._latencies: Deque[float] = deque(maxlen=100)
+
+        # Statistics
+        self.played = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.underflows = 0
+
+    def _open(self) -> None:
+        if self._stream is not None and self._stream.active:
+            return
+        if not self.sample_rate:
+            try:
+                self.sample_rate = int(sd.query_devices(kind="output")["default_samplerate"])
+            except Exception:
+                self.sample_rate = 48000
+        if self._ring is None:
+            self._ring = np.zeros(int(self.sample_rate * self.buffer_seconds), dtype=np.float32)
+        self._stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="float32",
+            latency="low",
+            callback=self._callback,
+            finished_callback=lambda: self._call(self._stream_finished),
+        )
+        self._stream.start()
+        print(f"[TTS] Output stream open at {self.sample_rate} Hz")
+
+    def play(self, volume: float = 1.0, lead_in_ms: int = 0) -> Utterance:
+        """
+        Queue a new utterance behind any already queued.
+
+        Args:
+            volume: Gain applied to the utterance
+            lead_in_ms: Silence before the utterance, only added when the
+                output is idle (gives amplifiers time to wake up)
+        """
+        self._loop = asyncio.get_running_loop()
+        utterance = Utterance(next(self._ids), volume, lead_in_ms)
+        self._queue.put_nowait(utterance)
+        if self._feeder is None or self._feeder.done():
+            self._feeder = asyncio.create_task(self._feed())
+        return utterance
+
+    def cancel(self) -> int:
+        """
+        Barge-in: stop the current utterance and drop the queued ones.
+
+        Returns:
+            Number of utterances cancelled
+        """
+        # Includes utterances fully written but still playing out of the ring
+        cancelled = [u for u in self._unfinished if not u.done]
+        if self._current is not None and not self._current.done:
+            self._current._chunks.put_nowait(None)  # wake the feeder if it's waiting on synthesis
+        while not self._queue.empty():
+            cancelled.append(self._queue.get_nowait())
+        for utterance in cancelled:
+            utterance.cancelled = True
+            utterance._finish()
+        self._marks.clear()
+        self._unfinished.clear()
+        self._skip_to = self._written  # the callback drops what's buffered
+        self.cancelled += len(cancelled)
+        if cancelled:
+            print(f"[TTS] Playback cancelled ({len(cancelled)} utterances)")
+        return len(cancelled)
+
+    @property
+    def buffered_ms(self) -> float:
+        read = max(self._read, self._skip_to or 0)
+        return (self._written - read) / self.sample_rate * 1000 if self.sample_rate else 0.0
+
+    async def _feed(self) -> None:
+        """Write queued utterances into the ring, one after another."""
+        while not self._queue.empty():
+            utterance = self._queue.get_nowait()
+            if utterance.cancelled:
+                continue
+            self._current = utterance
+            self._unfinished.add(utterance)
+            try:
+                await asyncio.to_thread(self._open)
+                await self._feed_one(utterance)
+            except Exception as e:
+                self._abandon(f"Playback failed: {e}")
+            finally:
+                self._current = None
+
+    def _abandon(self, reason: str) -> None:
+        """Resolve every unfinished utterance with ``reason`` and drop the stream."""
+        stranded = [u for u in self._unfinished if not u.done]
+        self._unfinished.clear()
+        self._marks.clear()
+        self._skip_to = self._written
+        for utterance in stranded:
+            utterance.error = reason
+            utterance._finish()
+        self.failed += len(stranded)
+        print(f"[TTS] {reason} ({len(stranded)} utterances not played)")
+        stream, self._stream = self._stream, None  # reopen on the next utterance
+        if stream is not None:
+            # Closing a wedged device can block; keep it off the event loop
+            self._loop.run_in_executor(None, stream.close)
+
+    def _stream_finished(self) -> None:
+        """PortAudio reported the stream inactive (device lost or callback error)."""
+        if self._stream is not None and not self._stream.active:
+            self._abandon("Output stream stopped")
+
+    async def _watch(self) -> None:
+        """Abandon buffered audio the device stops consuming without reporting an error."""
+        read, since = self._read, time.perf_counter()
+        while self._unfinished:
+            await asyncio.sleep(STALL_SECONDS / 4)
+            if self._read != read or self._written <= self._read:
+                read, since = self._read, time.perf_counter()
+            elif time.perf_counter() - since > STALL_SECONDS:
+                self._abandon(f"Output stream stalled for {STALL_SECONDS:.0f}s")
+
+    async def _feed_one(self, utterance: Utterance) -> None:
+        if utterance.lead_in_ms > 0 and self._written <= self._read:
+            await self._write(np.zeros(int(self.sample_rate * utterance.lead_in_ms / 1000), dtype=np.float32), utterance)
+        resampler = None
+        started = False
+        while True:
+            item = await utterance._chunks.get()
+            if item is None or utterance.done:
+                break
+            audio, sample_rate = item
+            if resampler is None:
+                resampler = StreamingResampler(sample_rate, self.sample_rate)
+            if not resampler.passthrough:
+                audio = await asyncio.to_thread(resampler.process, audio)
+            await self._write(self._prepare(audio, utterance.volume), utterance, start=not started)
+            started = started or len(audio) > 0
+        if resampler is not None and not utterance.done:
+            await self._write(self._prepare(resampler.flush(), utterance.volume), utterance)
+        if utterance.done:  # cancelled, or the stream failed under it
+            return
+        if not started:
+            self._unfinished.discard(utterance)
+            utterance._finish()
+            return
+        self._marks.append((self._written, lambda at: self._call(self._finished, utterance, at)))
+        if self._watchdog is None or self._watchdog.done():
+            self._watchdog = asyncio.create_task(self._watch())
+
+    def _started(self, utterance: Utterance, at: float) -> None:
+        if utterance.started_at is None and not utterance.cancelled:
+            utterance.started_at = at
+            self._latencies.append(at - utterance.enqueued_at)
+
+    def _finished(self, utterance: Utterance, at: float) -> None:
+        self._unfinished.discard(utterance)
+        if not utterance.done:
+            self.played += 1
+            utterance._finish(at)
+
+    @staticmethod
+    def _prepare(audio: np.ndarray, volume: float) -> np.ndarray:
+        if volume != 1.0:
+            audio = audio * volume
+        return np.clip(audio, -1.0, 1.0).astype(np.float32, copy=False)
+
+    async def _write(self, audio: np.ndarray, utterance: Utterance, start: bool = False) -> None:
+        """Copy audio into the ring, waiting for the device to free space."""
+        if start and len(audio):
+            self._marks.append((self._written + 1, lambda at: self._call(self._started, utterance, at)))
+        capacity = len(self._ring)
+        i = 0
+        while i < len(audio):
+            if utterance.done:
+                return
+            space = capacity - (self._written - self._read)
+            if space <= 0:
+                if self._stream is None or not self._stream.active:
+                    raise RuntimeError("Output stream stopped")
+                await asyncio.sleep(0.02)
+                continue
+            n = min(space, len(audio) - i)
+            start_idx = self._written % capacity
+            first = min(n, capacity - start_idx)
+            self._ring[start_idx:start_idx + first] = audio[i:i + first]
+            self._ring[:n - first] = audio[i + first:i + n]
+            self._written += n  # publish only after the samples are in place
+            utterance.samples += n
+            i += n
+
+    def _call(self, action: Callable, *args) -> None:
+        self._loop.call_soon_threadsafe(action, *args)
+
+    def _callback(self, outdata, frames, time_info, status) -> None:
+        """PortAudio thread: copy the next frames out of the ring."""
+        if status.output_underflow:
+            self.underflows += 1
+        skip = self._skip_to
+        if skip is not None:
+            self._skip_to = None
+            self._read = max(self._read, skip)
+        out = outdata[:, 0]
+        read = self._read
+        n = min(frames, self._written - read)
+        if n > 0:
+            capacity = len(self._ring)
+            start = read % capacity
+            first = min(n, capacity - start)
+            out[:first] = self._ring[start:start + first]
+            out[first:n] = self._ring[:n - first]
+        out[max(n, 0):] = 0.0
+        self._read = read + max(n, 0)
+
+        # Device time of this block's first sample, on our clock
+        dac_delay = max(0.0, time_info.outputBufferDacTime - time_info.currentTime)
+        now = time.perf_counter() + dac_delay
+        try:
+            while self._marks and self._marks[0][0] <= self._read:
+                position, action = self._marks.popleft()
+                action(now + max(0, position - 1 - read) / self.sample_rate)
+        except IndexError:
+            pass  # cancel() cleared the marks under us
+
+    def status(self) -> dict:
+        """Stream state, queue depth and start latency statistics."""
+        latencies = sorted(self._latencies)
+        last = self._latencies[-1] if latencies else None
+        return {
+            "open": self._stream is not None and self._stream.active,
+            "sample_rate": self.sample_rate,
+            "buffered_ms": round(self.buffered_ms, 1),
+            "current": self._current.id if self._current is not None else None,
+            "queued": self._queue.qsize(),
+            "played": self.played,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "underflows": self.underflows,
+            "start_latency_ms": {
+                "last": round(last * 1000, 1) if last is not None else None,
+                "p50": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                "max": round(latencies[-1] * 1000, 1) if latencies else None,
+            },
+        }
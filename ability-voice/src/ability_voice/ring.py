@@ -0,0 +1,139 @@
+"""
+Fixed-size ring buffer for the microphone stream.
+
+The wake word listener used to grow its buffers with ``np.concatenate`` on
+every 30ms chunk, copying everything received so far each time. ``AudioRing``
+preallocates its storage once and addresses samples by absolute position
+(samples received since the stream started), so the listener can keep
+markers such as "start of the wake window" or "start of the command"
+without moving any audio.
+
+Every sample is stored twice, ``capacity`` apart. Any window of up to
+``capacity`` samples is then one contiguous slice of the storage, and
+``view()`` returns it without copying.
+
+``FrameFlags`` runs alongside the audio with one entry per 30ms frame, so
+each frame's voice-activity decision is made once, when it arrives, and
+the share of speech in any recent span is a subtraction.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRing:
+    """
+    Preallocated mono ring buffer with zero-copy window views.
+
+    Example:
+        >>> ring = AudioRing(16000 * 35)
+        >>> ring.append(chunk)
+        >>> window = ring.view(ring.total - 48000)  # last 3 seconds
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Samples retained; older audio is overwritten
+        """
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        self.total = 0  # absolute position one past the newest sample
+
+    @property
+    def oldest(self) -> int:
+        """Absolute position of the oldest sample still held."""
+        return max(0, self.total - self.capacity)
+
+    def append(self, chunk: np.ndarray) -> None:
+        """Copy samples in, overwriting the oldest once full."""
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        if len(chunk) > self.capacity:
+            self.total += len(chunk) - self.capacity
+            chunk = chunk[-self.capacity:]
+        n = len(chunk)
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        for offset in (0, self.capacity):
+            self._data[offset + start:offset + start + first] = chunk[:first]
+            self._data[offset:offset + n - first] = chunk[first:]
+        self.total += n
+
+    def view(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """
+        Read-only view of samples [start, end) by absolute position.
+
+        ``start`` is clamped to the oldest sample still held. The view
+        aliases the ring, so it is only valid until ``capacity`` more
+        samples have been appended.
+        """
+        end = self.total if end is None else min(end, self.total)
+        start = min(max(start, self.oldest), end)
+        offset = start % self.capacity
+        window = self._data[offset:offset + end - start]
+        window.flags.writeable = False
+        return window
+
+    def latest(self, n: int) -> np.ndarray:
+        """View of the newest ``n`` samples (fewer if not received yet)."""
+        return self.view(self.total - n)
+
+
+class FrameFlags:
+    """
+    Ring of per-frame flags stored as running counts.
+
+    Entry ``k`` holds how many of frames ``0..k`` were flagged, so the
+    number of flagged frames in any span still held is the difference of
+    two entries: O(1) however long the span.
+
+    Example:
+        >>> speech = FrameFlags(1200)
+        >>> speech.append(speech_frames(new_audio))
+        >>> speech.ratio(speech.total - 100)  # share of speech in the last 3 seconds
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Frames retained; older frames are overwritten
+        """
+        self.capacity = capacity
+        # One extra slot keeps the count *before* the oldest frame too
+        self._counts = np.zeros(capacity + 1, dtype=np.int64)
+        self._flagged = 0
+        self.total = 0  # absolute frame index one past the newest frame
+
+    def append(self, flags: np.ndarray) -> None:
+        """Record the flags of the next frames, in order."""
+        flags = np.asarray(flags, dtype=bool)
+        if not len(flags):
+            return
+        counts = self._flagged + np.cumsum(flags, dtype=np.int64)
+        size = len(self._counts)
+        if len(counts) > size:
+            self.total += len(counts) - size
+            counts = counts[-size:]
+        start = self.total % size
+        first = min(len(counts), size - start)
+        self._counts[start:start + first] = counts[:first]
+        self._counts[:len(counts) - first] = counts[first:]
+        self._flagged = int(counts[-1])
+        self.total += len(counts)
+
+    def _before(self, frame: int) -> int:
+        """Flagged frames among frames [0, frame)."""
+        return int(self._counts[(frame - 1) % len(self._counts)]) if frame > 0 else 0
+
+    def count(self, start: int, end: Optional[int] = None) -> int:
+        """Flagged frames in [start, end), clamped to the frames still held."""
+        end = self.total if end is None else min(end, self.total)
+        start = min(max(start, self.total - self.capacity), end)
+        return self._before(end) - self._before(start)
+
+    def ratio(self, start: int, end: Optional[int] = None) -> float:
+        """Share of flagged frames in [start, end); 0.0 for an empty span."""
+        end = self.total if end is None else min(end, self.total)
+        start = min(max(start, self.total - self.capacity), end)
+        return (self._before(end) - self._before(start)) / (end - start) if end > start else 0.0
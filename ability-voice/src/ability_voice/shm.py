@@ -0,0 +1,108 @@
+"""
+Zero-copy local audio handoff.
+
+Agents on the same host don't need to base64 audio through the broker:
+they can write raw PCM to a file in ``/dev/shm`` (or another allowed
+directory, e.g. a ``multiprocessing.shared_memory`` segment) and pass its
+path with dtype, sample rate and length. The ability memory-maps the file
+read-only and hands the mapped array to Whisper, so float32 16 kHz audio
+reaches the model without an intermediate copy.
+
+Ownership rules:
+    - the caller creates the segment and owns it by default; the ability
+      only reads it and drops its mapping when the call returns
+    - the caller must not modify or truncate the segment until the call
+      returns (truncating a mapped file crashes the reader)
+    - with ``release=True`` ownership passes to the ability once the
+      segment has been mapped as valid PCM; the ability then unlinks it
+      when transcription has finished, whether or not that succeeded. A
+      segment that fails validation is never unlinked
+    - only files inside ``SHM_DIRS`` (``/dev/shm`` by default) are
+      accepted, so a caller can never make the ability read or delete
+      paths outside them
+"""
+
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from .upload import PCM_FORMATS
+
+SHM_DIRS: List[str] = [
+    os.path.realpath(d)
+    for d in os.getenv(
+        "KADI_SHM_DIRS", "/dev/shm"
+    ).split(os.pathsep)
+    if d
+]
+
+
+def resolve_shm_path(path: str) -> str:
+    """
+    Resolve a segment path, or a bare shared-memory name, inside SHM_DIRS.
+
+    Raises:
+        ValueError: If the path lies outside the allowed directories
+        FileNotFoundError: If the segment doesn't exist
+    """
+    if os.sep not in path:
+        path = os.path.join("/dev/shm", path)  # multiprocessing.shared_memory name
+    real = os.path.realpath(path)
+    if not any(os.path.commonpath([real, d]) == d for d in SHM_DIRS):
+        raise ValueError(f"Audio segment must be inside one of {SHM_DIRS}: {path}")
+    if not os.path.isfile(real):
+        raise FileNotFoundError(f"Audio segment not found: {path}")
+    return real
+
+
+def map_pcm(
+    path: str,
+    fmt: str = "float32",
+    length: Optional[int] = None,
+    offset: int = 0,
+) -> np.ndarray:
+    """
+    Memory-map raw mono PCM as a read-only numpy array.
+
+    Args:
+        path: Segment path or shared-memory name (see resolve_shm_path)
+        fmt: "float32" (zero-copy) or "int16" (converted once to float32)
+        length: Number of samples (default: the rest of the file)
+        offset: Byte offset of the first sample
+
+    Returns:
+        float32 array; for float32 segments a view of the mapping
+
+    Raises:
+        ValueError: For unsupported formats, bad bounds or disallowed paths
+        FileNotFoundError: If the segment doesn't exist
+    """
+    if fmt not in PCM_FORMATS:
+        raise ValueError(f"Unsupported format for local handoff: {fmt}. Supported: {PCM_FORMATS}")
+    real = resolve_shm_path(path)
+    dtype = np.dtype(np.float32 if fmt == "float32" else np.int16)
+    available = (os.path.getsize(real) - offset) // dtype.itemsize
+    if offset < 0 or available < 0:
+        raise ValueError(f"Offset {offset} is outside the segment")
+    if length is None:
+        length = available
+    if length > available:
+        raise ValueError(f"Segment holds {available} samples, {length} requested")
+    if length == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    mapped = np.memmap(real, dtype=dtype, mode="r", offset=offset, shape=(length,))
+    if fmt == "float32":
+        return mapped
+    audio = np.empty(length, dtype=np.float32)
+    np.multiply(mapped, 1 / 32768.0, out=audio, casting="unsafe")
+    return audio
+
+
+def release_segment(path: str) -> None:
+    """Unlink a segment the caller handed over with ``release=True``."""
+    try:
+        os.unlink(resolve_shm_path(path))
+    except (OSError, ValueError) as e:
+        print(f"[STT] Could not release audio segment {path}: {e}")
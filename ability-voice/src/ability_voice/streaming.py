@@ -0,0 +1,364 @@
+"""
+Streaming transcription sessions.
+
+Instead of one base64 blob per clip, a caller opens a session, pushes audio
+chunks as they are captured, and finishes the session when the utterance
+ends. Each session keeps a sliding window of log-mel frames (computed once
+per hop as audio arrives, so overlapping re-decodes never recompute them)
+and re-decodes the window as audio accumulates:
+
+    - segments that two consecutive decodes agree on are *committed*,
+      emitted as ``voice.transcript_committed`` and dropped from the window
+    - the rest of the hypothesis is emitted as ``voice.transcript_partial``
+
+Because committed audio leaves the window, finishing a long utterance only
+decodes the short uncommitted tail.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .resample import StreamingResampler
+
+try:
+    import torch
+    import whisper
+except ImportError:
+    torch = None
+    whisper = None
+
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+FRAMES_PER_SECOND = SAMPLE_RATE // HOP_LENGTH  # 100
+MAX_WINDOW_FRAMES = 3000  # Whisper's 30s context
+
+
+class IncrementalLogMel:
+    """
+    Whisper log-mel spectrogram computed incrementally.
+
+    Frame ``i`` is centred on sample ``i * HOP_LENGTH`` and needs
+    ``N_FFT // 2`` samples either side, so it is computed as soon as those
+    samples exist and never again. Frames hold raw ``log10`` energies;
+    Whisper's per-window clamp/normalization is applied in ``window()``.
+    """
+
+    def __init__(self, n_mels: int = 80, device: str = "cpu"):
+        self.n_mels = n_mels
+        self.device = device
+        self._window = torch.hann_window(N_FFT).to(device)
+        self._filters = whisper.audio.mel_filters(device, n_mels)
+        # Zero padding stands in for Whisper's reflect padding at stream start
+        self._audio = np.zeros(N_FFT // 2, dtype=np.float32)
+        self._audio_start = -(N_FFT // 2)  # absolute index of self._audio[0]
+        self._next_frame = 0
+        self._frames: List["torch.Tensor"] = []
+        self._first_frame = 0  # absolute index of the first retained frame
+        self._num_samples = 0
+
+    @property
+    def num_frames(self) -> int:
+        """Frames currently retained in the window."""
+        return self._next_frame - self._first_frame
+
+    @property
+    def first_frame(self) -> int:
+        """Absolute index of the first retained frame."""
+        return self._first_frame
+
+    def append(self, audio: np.ndarray) -> None:
+        """Add 16 kHz mono samples and compute every newly determined frame."""
+        self._audio = np.concatenate([self._audio, audio.astype(np.float32, copy=False)])
+        self._num_samples += len(audio)
+        self._compute(self._audio_start + len(self._audio))
+
+    def flush(self) -> None:
+        """Zero-pad the end of the stream and compute the remaining frames."""
+        self._audio = np.concatenate([self._audio, np.zeros(N_FFT // 2, dtype=np.float32)])
+        # Whisper drops the frame centred exactly on the last sample
+        self._compute(self._audio_start + len(self._audio), limit=self._num_samples // HOP_LENGTH)
+
+    def _compute(self, available_end: int, limit: Optional[int] = None) -> None:
+        last = (available_end - N_FFT // 2) // HOP_LENGTH
+        if limit is not None:
+            last = min(last, limit - 1)
+        if last < self._next_frame:
+            return
+        lo = self._next_frame * HOP_LENGTH - N_FFT // 2 - self._audio_start
+        hi = last * HOP_LENGTH + N_FFT // 2 - self._audio_start
+        segment = torch.from_numpy(self._audio[lo:hi].copy()).to(self.device)
+        stft = torch.stft(
+            segment, N_FFT, HOP_LENGTH, window=self._window,
+            center=False, return_complex=True,
+        )
+        mel = self._filters @ (stft.abs() ** 2)
+        self._frames.append(torch.clamp(mel, min=1e-10).log10())
+        self._next_frame = last + 1
+
+        # Keep only the samples future frames still need
+        keep_from = self._next_frame * HOP_LENGTH - N_FFT // 2
+        drop = keep_from - self._audio_start
+        if drop > 0:
+            self._audio = self._audio[drop:]
+            self._audio_start = keep_from
+
+    def drop_until(self, frame: int) -> None:
+        """Discard retained frames before absolute frame index ``frame``."""
+        frame = min(frame, self._next_frame)
+        if frame <= self._first_frame:
+            return
+        frames = torch.cat(self._frames, dim=1) if self._frames else None
+        if frames is not None:
+            frames = frames[:, frame - self._first_frame:]
+            self._frames = [frames] if frames.shape[1] else []
+        self._first_frame = frame
+
+    def window(self, max_frames: int = MAX_WINDOW_FRAMES) -> "torch.Tensor":
+        """Normalized log-mel of the retained window (last ``max_frames``)."""
+        if not self._frames:
+            return torch.zeros((self.n_mels, 0), device=self.device)
+        if len(self._frames) > 1:
+            self._frames = [torch.cat(self._frames, dim=1)]
+        log_spec = self._frames[0][:, -max_frames:]
+        # Pad as if followed by digital silence, then apply Whisper's
+        # dynamic-range clamp and scaling over the window.
+        pad = MAX_WINDOW_FRAMES - log_spec.shape[1]
+        if pad > 0:
+            log_spec = torch.nn.functional.pad(log_spec, (0, pad), value=-10.0)
+        log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+        return (log_spec + 4.0) / 4.0
+
+
+class StreamingSession:
+    """
+    One streaming transcription: sliding mel window plus committed text.
+
+    Attributes:
+        session_id: Identifier returned to the caller
+        language: Language code for decoding
+        committed: Segments committed so far (absolute timestamps)
+        partial_text: Latest uncommitted hypothesis
+    """
+
+    # Commit a segment only if it ends this far before the window end
+    COMMIT_GUARD_SECONDS = 1.0
+    # Force commits once the window grows past this (Whisper sees 30s)
+    MAX_WINDOW_SECONDS = 24.0
+    # Characters of committed text fed back to the decoder as a prompt
+    PROMPT_CHARS = 200
+
+    def __init__(
+        self,
+        engine,
+        language: str = "en",
+        step_ms: int = 1000,
+        event_emitter: Optional[Callable] = None,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        self.session_id = uuid.uuid4().hex[:12]
+        self.language = language
+        self.sample_rate = sample_rate
+        # Chunk-wise resampling keeps filter state across pushes, so chunk
+        # boundaries leave no artifacts in the mel frames
+        self._resampler = (
+            StreamingResampler(sample_rate, SAMPLE_RATE) if sample_rate != SAMPLE_RATE else None
+        )
+        self.step_samples = int(SAMPLE_RATE * step_ms / 1000)
+        self._engine = engine
+        self._emit = event_emitter
+        self._mel = IncrementalLogMel(n_mels=engine.n_mels, device=str(engine.model.device))
+        self._lock = asyncio.Lock()
+        self._decode_task: Optional[asyncio.Task] = None
+        self._samples_since_decode = 0
+        self._previous: List[dict] = []
+
+        self.committed: List[dict] = []
+        self.partial_text = ""
+        self.total_samples = 0
+        self.decodes = 0
+        self.created_at = time.time()
+        self.last_activity = self.created_at
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(s["text"] for s in self.committed).strip()
+
+    async def push(self, audio: np.ndarray) -> dict:
+        """Append audio at the session's rate; schedules a decode every ``step_ms``."""
+        self.last_activity = time.time()
+        if self._resampler is not None:
+            audio = self._resampler.process(audio)
+        async with self._lock:
+            self._mel.append(audio)
+        self.total_samples += len(audio)
+        self._samples_since_decode += len(audio)
+
+        if self._samples_since_decode >= self.step_samples and (
+            self._decode_task is None or self._decode_task.done()
+        ):
+            self._samples_since_decode = 0
+            self._decode_task = asyncio.create_task(self._decode(final=False))
+
+        return self.snapshot()
+
+    async def finish(self) -> dict:
+        """Decode the remaining tail, commit everything and return the transcript."""
+        started = time.perf_counter()
+        if self._decode_task is not None:
+            try:
+                await self._decode_task
+            except Exception as e:
+                print(f"[STT] Stream {self.session_id} decode error: {e}")
+        async with self._lock:
+            if self._resampler is not None:
+                tail = self._resampler.flush()
+                self._mel.append(tail)
+                self.total_samples += len(tail)
+            self._mel.flush()
+        await self._decode(final=True)
+        finalize_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        return {
+            "session_id": self.session_id,
+            "text": self.committed_text,
+            "language": self.language,
+            "segments": [
+                {"start": s["start"], "end": s["end"], "text": s["text"]}
+                for s in self.committed
+            ],
+            "duration_seconds": self.total_samples / SAMPLE_RATE,
+            "decodes": self.decodes,
+            "timing": {"finalize_ms": finalize_ms},
+        }
+
+    async def _decode(self, final: bool) -> None:
+        async with self._lock:
+            if self._mel.num_frames > MAX_WINDOW_FRAMES:
+                # Decoding fell behind the audio: the oldest uncommitted
+                # audio can no longer fit in Whisper's context.
+                print(f"[STT] Stream {self.session_id} window overflow, dropping audio")
+                self._mel.drop_until(self._mel.first_frame + self._mel.num_frames - MAX_WINDOW_FRAMES)
+            first_frame = self._mel.first_frame
+            offset = first_frame / FRAMES_PER_SECOND
+            window_seconds = self._mel.num_frames / FRAMES_PER_SECOND
+            if self._mel.num_frames == 0:
+                return
+            mel = self._mel.window()
+
+        prompt = self.committed_text[-self.PROMPT_CHARS:]
+        result = await self._engine.decode_segments(mel, language=self.language, prompt=prompt)
+        self.decodes += 1
+
+        segments = result["segments"]
+        if result["no_speech_prob"] > 0.6 and result["avg_logprob"] < -1.0:
+            segments = []
+
+        if final:
+            to_commit = segments
+        else:
+            to_commit = []
+            for i, seg in enumerate(segments):
+                if not seg["complete"] or seg["end"] > window_seconds - self.COMMIT_GUARD_SECONDS:
+                    break
+                agreed = i < len(self._previous) and self._previous[i]["text"] == seg["text"]
+                if not agreed and window_seconds < self.MAX_WINDOW_SECONDS:
+                    break
+                to_commit.append(seg)
+            # Never force-commit the last complete segment: it may still grow
+            if window_seconds >= self.MAX_WINDOW_SECONDS and len(to_commit) == len(segments):
+                to_commit = to_commit[:-1]
+
+        for seg in to_commit:
+            end = seg["end"] if seg["end"] is not None else window_seconds
+            committed = {
+                "start": round(offset + seg["start"], 2),
+                "end": round(offset + end, 2),
+                "text": seg["text"],
+            }
+            self.committed.append(committed)
+            if self._emit:
+                self._emit("voice.transcript_committed", {
+                    "session_id": self.session_id,
+                    **committed,
+                })
+
+        if to_commit and not final:
+            last_end = to_commit[-1]["end"]
+            async with self._lock:
+                self._mel.drop_until(first_frame + int(last_end * FRAMES_PER_SECOND))
+
+        remaining = segments[len(to_commit):]
+        self._previous = remaining
+        self.partial_text = " ".join(s["text"] for s in remaining).strip()
+        if self._emit and not final:
+            self._emit("voice.transcript_partial", {
+                "session_id": self.session_id,
+                "text": self.partial_text,
+                "committed_text": self.committed_text,
+            })
+
+    def snapshot(self) -> dict:
+        """Current state of the session for tool responses."""
+        return {
+            "session_id": self.session_id,
+            "buffered_seconds": round(self._mel.num_frames / FRAMES_PER_SECOND, 2),
+            "received_seconds": round(self.total_samples / SAMPLE_RATE, 2),
+            "committed_text": self.committed_text,
+            "partial_text": self.partial_text,
+            "decodes": self.decodes,
+        }
+
+
+class StreamingTranscriber:
+    """
+    Registry of open streaming sessions.
+
+    Sessions idle for longer than ``idle_timeout`` seconds are discarded
+    the next time a session is started.
+    """
+
+    def __init__(self, idle_timeout: float = 120.0, max_sessions: int = 16):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, StreamingSession] = {}
+
+    def _expire(self) -> None:
+        now = time.time()
+        for session_id, session in list(self._sessions.items()):
+            if now - session.last_activity > self.idle_timeout:
+                print(f"[STT] Stream {session_id} expired")
+                del self._sessions[session_id]
+
+    def start(self, engine, language: str = "en", step_ms: int = 1000,
+              event_emitter: Optional[Callable] = None,
+              sample_rate: int = SAMPLE_RATE) -> StreamingSession:
+        """Open a new session on a loaded SpeechToText engine."""
+        if torch is None or whisper is None:
+            raise RuntimeError("Whisper not available. Install with: pip install openai-whisper")
+        self._expire()
+        if len(self._sessions) >= self.max_sessions:
+            raise RuntimeError(f"Too many open streaming sessions ({self.max_sessions})")
+        session = StreamingSession(
+            engine, language=language, step_ms=step_ms,
+            event_emitter=event_emitter, sample_rate=sample_rate,
+        )
+        self._sessions[session.session_id] = session
+        print(f"[STT] Stream {session.session_id} started")
+        return session
+
+    def get(self, session_id: str) -> StreamingSession:
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown or expired streaming session: {session_id}")
+        return session
+
+    def close(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -11,6 +11,9 @@ import tempfile
 from typing import Optional, Union
 import numpy as np
 
+from .executor import EngineBusyError, InferenceExecutor
+from .resample import resample, to_mono
+
 try:
     import soundfile as sf
 except ImportError:
@@ -32,6 +35,87 @@ except ImportError:
     print("[STT] WARNING: Whisper not found!")
 
 
+QUANTIZE_MODES = ("none", "int8")
+QUANTIZED_CACHE_DIR = os.path.expanduser(
+    os.getenv("WHISPER_QUANTIZED_DIR", "~/.cache/whisper/quantized")
+)
+
+
+# Named speed/accuracy trade-offs, as keyword arguments for model.transcribe()
+DECODE_PROFILES = {
+    # Short commands: one greedy pass, no fallback ladder, no timestamps,
+    # capped output length
+    "fast": {
+        "temperature": 0.0,
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+        "sample_len": 96,
+        "compression_ratio_threshold": None,
+        "logprob_threshold": None,
+    },
+    # Greedy first with a short fallback ladder; segment timestamps kept
+    "balanced": {
+        "temperature": (0.0, 0.4, 0.8),
+        "condition_on_previous_text": False,
+    },
+    # Whisper's full fallback ladder and text conditioning, plus beam search
+    "accurate": {
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "condition_on_previous_text": True,
+        "beam_size": 5,
+        "best_of": 5,
+    },
+}
+DEFAULT_PROFILE = "balanced"
+
+
+def check_profile(profile: str) -> str:
+    """Validate a decoding profile name, returning it unchanged."""
+    if profile not in DECODE_PROFILES:
+        raise ValueError(
+            f"Unknown decoding profile: {profile}. Supported: {list(DECODE_PROFILES)}"
+        )
+    return profile
+
+
+def audio_seconds(audio_data: Union[bytes, np.ndarray], sample_rate: int) -> float:
+    """Duration of float32 bytes or a (frames[, channels]) array."""
+    frames = len(audio_data) // 4 if isinstance(audio_data, bytes) else len(audio_data)
+    return frames / sample_rate if sample_rate else 0.0
+
+
+class ProfileLatency:
+    """Per-decoding-profile latency accumulator."""
+
+    def __init__(self):
+        self._stats: dict = {}
+
+    def record(self, profile: str, latency_ms: float, seconds: float) -> None:
+        stats = self._stats.setdefault(
+            profile, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "audio_seconds": 0.0}
+        )
+        stats["calls"] += 1
+        stats["total_ms"] += latency_ms
+        stats["max_ms"] = max(stats["max_ms"], latency_ms)
+        stats["audio_seconds"] += seconds
+
+    def to_dict(self) -> dict:
+        """Calls, average/max latency and real-time factor per profile."""
+        return {
+            profile: {
+                "calls": stats["calls"],
+                "avg_ms": round(stats["total_ms"] / stats["calls"], 1),
+                "max_ms": round(stats["max_ms"], 1),
+                "rtf": round(stats["total_ms"] / 1000 / max(stats["audio_seconds"], 1e-9), 3),
+            }
+            for profile, stats in self._stats.items()
+        }
+
+
+class TranscriptionBusyError(EngineBusyError):
+    """Raised when a transcription backend is at capacity and rejects new work."""
+
+
 class SpeechToText:
     """
     Whisper-based speech recognition with CUDA acceleration.
@@ -55,7 +139,13 @@ class SpeechToText:
         "large", "large-v2", "large-v3"
     ]
     
-    def __init__(self, model_name: str = "base.en"):
+    def __init__(
+        self,
+        model_name: str = "base.en",
+        max_queue: int = 8,
+        quantize: str = "none",
+        quantized_dir: Optional[str] = None,
+    ):
         """
         Initialize the STT engine.
         
@@ -66,19 +156,34 @@ class SpeechToText:
                 - small.en: Better accuracy, English only (~244MB)
                 - base: Multilingual (~74MB)
                 - small: Multilingual (~244MB)
+            max_queue: Maximum queued + running transcriptions on the
+                inference thread before callers wait or are rejected
+            quantize: "int8" for dynamically quantized linear layers (CPU
+                only; ignored on CUDA) or "none" for fp32/fp16 weights
+            quantized_dir: Where quantized models are cached between runs
         """
         if model_name not in self.SUPPORTED_MODELS:
             raise ValueError(
                 f"Unknown model: {model_name}. "
                 f"Supported: {self.SUPPORTED_MODELS}"
             )
+        if quantize not in QUANTIZE_MODES:
+            raise ValueError(f"Unknown quantize mode: {quantize}. Supported: {QUANTIZE_MODES}")
         
         self.model_name = model_name
+        if quantize != "none" and DEVICE == "cuda":
+            print(f"[STT] {quantize} quantization is CPU-only; using {DEVICE} weights")
+            quantize = "none"
+        self.quantize = quantize
+        self.quantized_dir = quantized_dir or QUANTIZED_CACHE_DIR
         self.model = None
         self._loaded = False
-        self._lock = threading.Lock()  # Protect model from concurrent access
-        self._async_lock: Optional[asyncio.Lock] = None  # For async coordination
-        self._is_busy = False  # Track if model is currently transcribing
+        self._lock = threading.Lock()  # Protect model from concurrent sync access
+        # All async entry points run inference on this thread, never the event loop
+        self._executor = InferenceExecutor(
+            "stt", max_queue=max_queue, busy_error=TranscriptionBusyError
+        )
+        self.profile_latency = ProfileLatency()
         
     async def load(self) -> None:
         """
@@ -93,10 +198,57 @@ class SpeechToText:
             )
         
         print(f"[STT] Loading Whisper model: {self.model_name} on {DEVICE}")
-        self.model = whisper.load_model(self.model_name, device=DEVICE)
+        if self.quantize == "int8":
+            self.model = await asyncio.to_thread(self._load_int8)
+        else:
+            self.model = await asyncio.to_thread(
+                whisper.load_model, self.model_name, device=DEVICE
+            )
         self._loaded = True
         print("[STT] Model loaded successfully")
     
+    def _load_int8(self):
+        """
+        Load the model with int8 dynamically quantized linear layers (blocking).
+
+        Quantization happens once per model; the result is pickled under
+        ``quantized_dir`` keyed by whisper and torch versions, so later
+        starts load it directly instead of loading fp32 and re-quantizing.
+        """
+        cache_path = os.path.join(
+            self.quantized_dir,
+            f"{self.model_name}-int8-whisper{whisper.__version__}-torch{torch.__version__}.pt",
+        )
+        if os.path.exists(cache_path):
+            try:
+                model = torch.load(cache_path, map_location="cpu", weights_only=False)
+                print(f"[STT] Loaded int8 model from {cache_path}")
+                return model
+            except Exception as e:
+                print(f"[STT] Quantized cache unreadable ({e}), re-quantizing")
+
+        model = whisper.load_model(self.model_name, device="cpu")
+        # whisper's Linear subclass only adds a dtype cast (a no-op in fp32);
+        # quantize_dynamic matches exact types, so present them as nn.Linear
+        for module in model.modules():
+            if type(module) is whisper.model.Linear:
+                module.__class__ = torch.nn.Linear
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.quantized_dir, exist_ok=True)
+            torch.save(model, tmp_path)
+            os.replace(tmp_path, cache_path)
+            print(f"[STT] Cached int8 model at {cache_path}")
+        except Exception as e:
+            print(f"[STT] Could not cache int8 model: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return model
+
     async def unload(self) -> None:
         """
         Unload the Whisper model from memory to free GPU/RAM.
@@ -127,32 +279,19 @@ class SpeechToText:
         
         print(f"[STT] Model unloaded")
     
-    async def transcribe(
+    def _prepare_audio(
         self,
         audio_data: Union[bytes, np.ndarray],
-        sample_rate: int = 16000,
-        language: str = "en"
-    ) -> dict:
+        sample_rate: int,
+    ) -> Optional[np.ndarray]:
         """
-        Transcribe audio to text.
-        
-        Args:
-            audio_data: Audio as raw bytes (float32) or numpy array
-            sample_rate: Audio sample rate in Hz (Whisper expects 16kHz)
-            language: Language code for transcription (e.g., 'en', 'es', 'fr')
-            
+        Convert input audio to the mono float32 16 kHz array Whisper expects.
+
+        This is the single preprocessing path shared by every entry point.
+
         Returns:
-            dict with keys:
-                - text: Transcribed text
-                - language: Detected or specified language
-                - segments: List of timestamped segments (if available)
-                
-        Raises:
-            RuntimeError: If model is not loaded
+            The prepared array, or None if the audio is empty or silent
         """
-        if not self._loaded:
-            await self.load()
-        
         # Convert bytes to numpy array if needed
         if isinstance(audio_data, bytes):
             audio_array = np.frombuffer(audio_data, dtype=np.float32)
@@ -160,39 +299,40 @@ class SpeechToText:
             audio_array = np.array(audio_data, dtype=np.float32)
         else:
             audio_array = np.asarray(audio_data)
-            
-        # Ensure correct dtype
-        if audio_array.dtype != np.float32:
-            audio_array = audio_array.astype(np.float32)
-        
+
+        # Handle stereo -> mono conversion first so every later step
+        # (resampling, normalization) touches one channel only
+        audio_array = to_mono(audio_array)
+
+        # Check for empty or invalid audio
+        if len(audio_array) == 0:
+            print("[STT] Empty audio, skipping")
+            return None
+
         # Resample if needed (Whisper expects 16kHz)
         if sample_rate != 16000:
-            from scipy import signal
-            num_samples = int(len(audio_array) * 16000 / sample_rate)
-            audio_array = signal.resample(audio_array, num_samples)
-            print(f"[STT] Resampled from {sample_rate}Hz to 16000Hz")
-        
-        # Normalize audio to [-1, 1] range
-        max_val = np.abs(audio_array).max()
+            audio_array = resample(audio_array, sample_rate, 16000)
+
+        # Normalize audio to [-1, 1] range (peak found without an abs() temp
+        # copy, so memory-mapped input stays uncopied)
+        max_val = max(float(audio_array.max()), -float(audio_array.min()))
         if max_val > 1.0:
             audio_array = audio_array / max_val
-        
-        # Handle stereo -> mono conversion
-        if len(audio_array.shape) > 1:
-            audio_array = audio_array.mean(axis=1)
-        
-        print(f"[STT] Transcribing {len(audio_array)/16000:.2f}s of audio...")
-        
-        # Transcribe (this is the blocking call)
-        result = self.model.transcribe(audio_array, language=language)
-        
-        # Extract and format result
+        elif max_val < 0.001:
+            # Audio is essentially silence
+            return None
+
+        return audio_array.astype(np.float32, copy=False)
+
+    @staticmethod
+    def _format_result(result: dict, language: str) -> dict:
+        """Reduce a raw Whisper result to the ability's transcription dict."""
         transcription = {
             "text": result["text"].strip(),
             "language": result.get("language", language),
             "segments": []
         }
-        
+
         # Include segments if available
         if "segments" in result:
             transcription["segments"] = [
@@ -203,256 +343,416 @@ class SpeechToText:
                 }
                 for seg in result["segments"]
             ]
-        
+        return transcription
+
+    def _transcribe_blocking(
+        self,
+        audio_data: Union[bytes, np.ndarray],
+        sample_rate: int = 16000,
+        language: str = "en",
+        profile: str = DEFAULT_PROFILE,
+    ) -> dict:
+        """
+        Preprocess and decode on the calling thread (blocking, no locking).
+
+        Every public transcribe method funnels into this one code path.
+        """
+        audio_array = self._prepare_audio(audio_data, sample_rate)
+        if audio_array is None:
+            return {"text": "", "language": language, "segments": []}
+
+        print(f"[STT] Transcribing {len(audio_array)/16000:.2f}s of audio ({profile})...")
+
+        # Transcribe (blocking call)
+        result = self.model.transcribe(
+            audio_array,
+            language=language,
+            fp16=(DEVICE == "cuda"),
+            **DECODE_PROFILES[profile],
+        )
+        transcription = self._format_result(result, language)
+
         print(f"[STT] Transcribed: '{transcription['text'][:50]}...'")
         return transcription
-    
+
+    async def transcribe(
+        self,
+        audio_data: Union[bytes, np.ndarray],
+        sample_rate: int = 16000,
+        language: str = "en",
+        busy: str = "wait",
+        profile: str = DEFAULT_PROFILE,
+    ) -> dict:
+        """
+        Transcribe audio to text without blocking the event loop.
+
+        Preprocessing and decoding run on the engine's inference thread.
+
+        Args:
+            audio_data: Audio as raw bytes (float32) or numpy array
+            sample_rate: Audio sample rate in Hz (Whisper expects 16kHz)
+            language: Language code for transcription (e.g., 'en', 'es', 'fr')
+            busy: What to do if the inference queue is full:
+                - "wait": wait for a free slot (default)
+                - "reject": raise TranscriptionBusyError
+                - "skip": raise TranscriptionBusyError if anything is running
+            profile: Decoding profile ("fast", "balanced" or "accurate");
+                see DECODE_PROFILES
+
+        Returns:
+            dict with keys:
+                - text: Transcribed text
+                - language: Detected or specified language
+                - segments: List of timestamped segments (if available)
+                - timing: queue_wait_ms and compute_ms for this call
+
+        Raises:
+            TranscriptionBusyError: If rejected according to ``busy``
+            ValueError: If the profile is unknown
+        """
+        check_profile(profile)
+        if not self._loaded:
+            await self.load()
+
+        transcription, timing = await self._executor.run(
+            self._transcribe_blocking,
+            audio_data,
+            sample_rate,
+            language,
+            profile,
+            busy=busy,
+        )
+        timing["profile"] = profile
+        transcription["timing"] = timing
+        self.profile_latency.record(
+            profile, timing["compute_ms"], audio_seconds(audio_data, sample_rate)
+        )
+        return transcription
+
     def transcribe_sync(
         self,
         audio_data: Union[bytes, np.ndarray],
         sample_rate: int = 16000,
-        language: str = "en"
+        language: str = "en",
+        profile: str = DEFAULT_PROFILE,
     ) -> dict:
         """
-        Synchronous transcribe method for use in thread pool executors.
-        
-        This method is identical to transcribe() but is synchronous,
-        making it suitable for running in a ThreadPoolExecutor to avoid
-        blocking the asyncio event loop.
-        
-        Note: Caller should check is_busy() before calling to avoid blocking.
+        Synchronous transcribe method for callers that own their own thread.
+
+        Used by the worker pool processes. Blocks while another synchronous
+        transcription holds the model lock.
         """
         if not self._loaded:
             raise RuntimeError("Model not loaded. Call load() first.")
-        
+
         # Acquire lock - will block if another transcription is running
         with self._lock:
-            # Convert bytes to numpy array if needed
-            if isinstance(audio_data, bytes):
-                audio_array = np.frombuffer(audio_data, dtype=np.float32)
-            elif isinstance(audio_data, list):
-                audio_array = np.array(audio_data, dtype=np.float32)
-            else:
-                audio_array = np.asarray(audio_data)
-                
-            # Ensure correct dtype
-            if audio_array.dtype != np.float32:
-                audio_array = audio_array.astype(np.float32)
-            
-            # Check for empty or invalid audio
-            if len(audio_array) == 0:
-                print("[STT] Empty audio, skipping")
-                return {"text": "", "language": language, "segments": []}
-            
-            # Resample if needed (Whisper expects 16kHz)
-            if sample_rate != 16000:
-                from scipy import signal
-                num_samples = int(len(audio_array) * 16000 / sample_rate)
-                audio_array = signal.resample(audio_array, num_samples)
-            
-            # Normalize audio to [-1, 1] range
-            max_val = np.abs(audio_array).max()
-            if max_val > 1.0:
-                audio_array = audio_array / max_val
-            elif max_val < 0.001:
-                # Audio is essentially silence
-                return {"text": "", "language": language, "segments": []}
-            
-            # Handle stereo -> mono conversion
-            if len(audio_array.shape) > 1:
-                audio_array = audio_array.mean(axis=1)
-            
-            print(f"[STT] Transcribing {len(audio_array)/16000:.2f}s of audio...")
-            
-            # Transcribe (blocking call)
-            result = self.model.transcribe(audio_array, language=language)
-            
-            # Extract and format result
-            transcription = {
-                "text": result["text"].strip(),
-                "language": result.get("language", language),
-                "segments": []
-            }
-            
-            # Include segments if available
-            if "segments" in result:
-                transcription["segments"] = [
-                    {
-                        "start": seg.get("start", 0),
-                        "end": seg.get("end", 0),
-                        "text": seg.get("text", "").strip()
-                    }
-                    for seg in result["segments"]
-                ]
-            
-            print(f"[STT] Transcribed: '{transcription['text'][:50]}...'")
-            return transcription
-    
+            return self._transcribe_blocking(
+                audio_data, sample_rate, language, check_profile(profile)
+            )
+
     def is_busy(self) -> bool:
         """Check if the model is currently transcribing (non-blocking check)."""
-        return self._is_busy
-    
+        return self._executor.busy
+
+    def is_queue_full(self) -> bool:
+        """Check if new work would have to wait for a queue slot."""
+        return self._executor.full
+
     async def transcribe_async(
         self,
         audio_data: Union[bytes, np.ndarray],
         sample_rate: int = 16000,
         language: str = "en",
-        skip_if_busy: bool = True
+        skip_if_busy: bool = True,
+        profile: str = DEFAULT_PROFILE,
     ) -> dict:
         """
-        Async transcribe that properly handles concurrency.
-        
+        Async transcribe that returns an empty result instead of queueing.
+
         Args:
             audio_data: Audio as raw bytes (float32) or numpy array
             sample_rate: Audio sample rate in Hz
             language: Language code for transcription
             skip_if_busy: If True, returns empty result if model is busy
                          If False, waits for model to be available
-        
+            profile: Decoding profile, as for transcribe()
+
         Returns:
             Transcription result dict
         """
+        try:
+            return await self.transcribe(
+                audio_data,
+                sample_rate=sample_rate,
+                language=language,
+                busy="skip" if skip_if_busy else "wait",
+                profile=profile,
+            )
+        except TranscriptionBusyError:
+            return {"text": "", "language": language, "segments": []}
+
+    def _transcribe_batch_blocking(
+        self,
+        items: list,
+        language: str = "en",
+        sample_len: Optional[int] = None,
+    ) -> list:
+        """
+        Greedy-decode several short clips in one encoder/decoder pass.
+
+        Args:
+            items: List of (audio_data, sample_rate) tuples, each <= 30s
+            language: Language code shared by the whole batch
+            sample_len: Maximum tokens per clip (None = model default)
+
+        Returns:
+            One transcription dict per item, in order
+        """
+        empty = {"text": "", "language": language, "segments": []}
+        results = [None] * len(items)
+        mels, durations, indices = [], [], []
+        for i, (audio_data, sample_rate) in enumerate(items):
+            audio_array = self._prepare_audio(audio_data, sample_rate)
+            if audio_array is None:
+                results[i] = dict(empty)
+                continue
+            # Pad every clip to a full 30s log-mel segment so they stack
+            mels.append(whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(audio_array), n_mels=self.n_mels
+            ))
+            durations.append(len(audio_array) / 16000)
+            indices.append(i)
+
+        if mels:
+            print(f"[STT] Batch-transcribing {len(mels)} clips...")
+            mel_batch = torch.stack(mels).to(self.model.device)
+            options = whisper.DecodingOptions(
+                language=language,
+                temperature=0.0,
+                without_timestamps=True,
+                sample_len=sample_len,
+                fp16=(DEVICE == "cuda"),
+            )
+            decoded = whisper.decode(self.model, mel_batch, options)
+            for i, duration, result in zip(indices, durations, decoded):
+                text = result.text.strip()
+                # Same no-speech gate model.transcribe applies per segment
+                if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+                    text = ""
+                results[i] = {
+                    "text": text,
+                    "language": language,
+                    "segments": [{"start": 0.0, "end": round(duration, 2), "text": text}] if text else [],
+                }
+        return results
+
+    async def transcribe_batch(
+        self,
+        items: list,
+        language: str = "en",
+        busy: str = "wait",
+        profile: str = DEFAULT_PROFILE,
+    ) -> list:
+        """
+        Transcribe a batch of short clips with one model pass.
+
+        See ``_transcribe_batch_blocking``. Batched decoding is always a
+        single greedy pass; the profile only contributes its output cap.
+        Each result carries the shared batch timing plus ``batch_size``;
+        the pass is recorded once in the profile latency stats.
+        """
         if not self._loaded:
             await self.load()
-        
-        # Initialize async lock if needed (must be done in async context)
-        if self._async_lock is None:
-            self._async_lock = asyncio.Lock()
-        
-        # Check if busy and skip if requested
-        if skip_if_busy and self._is_busy:
-            return {"text": "", "language": language, "segments": []}
-        
-        # Acquire async lock (this properly queues waiters)
-        async with self._async_lock:
-            self._is_busy = True
-            try:
-                # Run transcription in thread pool
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(
-                    None,
-                    self._transcribe_internal,
-                    audio_data,
-                    sample_rate,
-                    language
-                )
-                return result
-            finally:
-                self._is_busy = False
-    
-    def _transcribe_internal(
+        sample_len = DECODE_PROFILES[check_profile(profile)].get("sample_len")
+        results, timing = await self._executor.run(
+            self._transcribe_batch_blocking, items, language, sample_len, busy=busy
+        )
+        for result in results:
+            result["timing"] = {**timing, "batch_size": len(items), "profile": profile}
+        self.profile_latency.record(
+            profile, timing["compute_ms"],
+            sum(audio_seconds(audio_data, sample_rate) for audio_data, sample_rate in items),
+        )
+        return results
+
+    def _get_tokenizer(self, language: str):
+        return whisper.tokenizer.get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=self.model.num_languages,
+            language=language,
+            task="transcribe",
+        )
+
+    def _decode_segments_blocking(
         self,
-        audio_data: Union[bytes, np.ndarray],
-        sample_rate: int = 16000,
-        language: str = "en"
+        mel: "torch.Tensor",
+        language: str = "en",
+        prompt: Optional[str] = None,
     ) -> dict:
         """
-        Internal transcription method - no locking, called from transcribe_async.
+        Greedy-decode one log-mel window (at most 30s) into timed segments.
+
+        Args:
+            mel: Normalized log-mel frames, shape (n_mels, n_frames <= 3000)
+            language: Language code
+            prompt: Previous text to condition the decoder on
+
+        Returns:
+            dict with ``segments`` (start/end seconds relative to the window,
+            text, and ``complete`` False for a trailing segment with no
+            closing timestamp) plus ``no_speech_prob`` and ``avg_logprob``
         """
-        # Convert bytes to numpy array if needed
-        if isinstance(audio_data, bytes):
-            audio_array = np.frombuffer(audio_data, dtype=np.float32)
-        elif isinstance(audio_data, list):
-            audio_array = np.array(audio_data, dtype=np.float32)
-        else:
-            audio_array = np.asarray(audio_data)
-            
-        # Ensure correct dtype
-        if audio_array.dtype != np.float32:
-            audio_array = audio_array.astype(np.float32)
-        
-        # Check for empty or invalid audio
-        if len(audio_array) == 0:
-            return {"text": "", "language": language, "segments": []}
-        
-        # Resample if needed (Whisper expects 16kHz)
-        if sample_rate != 16000:
-            from scipy import signal
-            num_samples = int(len(audio_array) * 16000 / sample_rate)
-            audio_array = signal.resample(audio_array, num_samples)
-        
-        # Normalize audio to [-1, 1] range
-        max_val = np.abs(audio_array).max()
-        if max_val > 1.0:
-            audio_array = audio_array / max_val
-        elif max_val < 0.001:
-            # Audio is essentially silence
-            return {"text": "", "language": language, "segments": []}
-        
-        # Handle stereo -> mono conversion
-        if len(audio_array.shape) > 1:
-            audio_array = audio_array.mean(axis=1)
-        
-        print(f"[STT] Transcribing {len(audio_array)/16000:.2f}s of audio...")
-        
-        # Transcribe (blocking call)
-        result = self.model.transcribe(audio_array, language=language)
-        
-        # Extract and format result
-        transcription = {
-            "text": result["text"].strip(),
-            "language": result.get("language", language),
-            "segments": []
+        mel = whisper.pad_or_trim(mel, whisper.audio.N_FRAMES).to(self.model.device)
+        options = whisper.DecodingOptions(
+            language=language,
+            temperature=0.0,
+            prompt=prompt or None,
+            without_timestamps=False,
+            fp16=(DEVICE == "cuda"),
+        )
+        result = whisper.decode(self.model, mel, options)
+        tokenizer = self._get_tokenizer(language)
+        ts_begin = tokenizer.timestamp_begin
+        precision = whisper.audio.CHUNK_LENGTH / self.model.dims.n_audio_ctx
+
+        segments = []
+        start = 0.0
+        text_tokens = []
+        for token in result.tokens:
+            if token >= ts_begin:
+                ts = (token - ts_begin) * precision
+                if text_tokens:
+                    segments.append({
+                        "start": round(start, 2),
+                        "end": round(ts, 2),
+                        "text": tokenizer.decode(text_tokens).strip(),
+                        "complete": True,
+                    })
+                    text_tokens = []
+                start = ts
+            else:
+                text_tokens.append(token)
+        if text_tokens:
+            segments.append({
+                "start": round(start, 2),
+                "end": None,
+                "text": tokenizer.decode(text_tokens).strip(),
+                "complete": False,
+            })
+
+        return {
+            "segments": [s for s in segments if s["text"]],
+            "no_speech_prob": result.no_speech_prob,
+            "avg_logprob": result.avg_logprob,
         }
-        
-        # Include segments if available
-        if "segments" in result:
-            transcription["segments"] = [
-                {
-                    "start": seg.get("start", 0),
-                    "end": seg.get("end", 0),
-                    "text": seg.get("text", "").strip()
-                }
-                for seg in result["segments"]
-            ]
-        
-        print(f"[STT] Transcribed: '{transcription['text'][:50]}...'")
-        return transcription
-        return transcription
-    
+
+    async def decode_segments(
+        self,
+        mel: "torch.Tensor",
+        language: str = "en",
+        prompt: Optional[str] = None,
+        busy: str = "wait",
+    ) -> dict:
+        """
+        Decode a precomputed log-mel window on the inference thread.
+
+        Used by streaming sessions, which maintain their own mel frames.
+        See ``_decode_segments_blocking`` for the result shape.
+        """
+        if not self._loaded:
+            await self.load()
+        result, timing = await self._executor.run(
+            self._decode_segments_blocking, mel, language, prompt, busy=busy
+        )
+        result["timing"] = timing
+        return result
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the loaded model's weights and buffers (0 if unloaded)."""
+        if self.model is None:
+            return 0
+        total = 0
+        # state_dict also covers packed int8 weights, which aren't parameters
+        for value in self.model.state_dict().values():
+            for tensor in value if isinstance(value, tuple) else (value,):
+                if isinstance(tensor, torch.Tensor):
+                    total += tensor.numel() * tensor.element_size()
+        return total
+
+    @property
+    def n_mels(self) -> int:
+        """Mel bins the loaded model expects (80, or 128 for large-v3)."""
+        return self.model.dims.n_mels if self.model is not None else 80
+
+    @staticmethod
+    def read_file(file_path: str):
+        """Read an audio file as float32 mono (blocking)."""
+        audio_array, sample_rate = sf.read(file_path, dtype="float32")
+
+        # Convert stereo to mono if needed
+        return to_mono(audio_array), sample_rate
+
     async def transcribe_file(
         self,
         file_path: str,
-        language: str = "en"
+        language: str = "en",
+        busy: str = "wait",
+        profile: str = DEFAULT_PROFILE,
     ) -> dict:
         """
         Transcribe audio from a file.
-        
+
         Args:
             file_path: Path to audio file (WAV, MP3, FLAC, etc.)
             language: Language code for transcription
-            
+            busy: Queue-full behaviour, as for transcribe()
+            profile: Decoding profile, as for transcribe()
+
         Returns:
             dict with transcription results (same as transcribe())
-            
+
         Raises:
             FileNotFoundError: If audio file doesn't exist
             RuntimeError: If soundfile is not installed
         """
         if sf is None:
             raise RuntimeError("soundfile is required for file transcription")
-            
+
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Audio file not found: {file_path}")
-            
+
         print(f"[STT] Loading audio from: {file_path}")
-        audio_array, sample_rate = sf.read(file_path)
-        
-        # Convert stereo to mono if needed
-        if len(audio_array.shape) > 1:
-            audio_array = audio_array.mean(axis=1)
-            
+        # File decoding is I/O-bound; keep it off both the loop and the
+        # inference thread.
+        audio_array, sample_rate = await asyncio.to_thread(self.read_file, file_path)
+
         return await self.transcribe(
             audio_data=audio_array,
             sample_rate=sample_rate,
-            language=language
+            language=language,
+            busy=busy,
+            profile=profile,
         )
-    
+
     @property
     def is_loaded(self) -> bool:
         """Check if model is loaded."""
         return self._loaded
     
+    def status(self) -> dict:
+        """Inference queue depth and timing statistics."""
+        return {
+            "backend": "in_process",
+            "model": self.model_name,
+            "loaded": self._loaded,
+            "device": DEVICE,
+            "quantize": self.quantize,
+            "executor": self._executor.status(),
+            "profiles": self.profile_latency.to_dict(),
+        }
+
     @property
     def uses_tensorrt(self) -> bool:
         """Check if TensorRT acceleration is being used."""
@@ -0,0 +1,480 @@
+"""
+Multi-process Whisper worker pool.
+
+A single Whisper model can only decode one clip at a time, so on CPU-only
+hosts transcription throughput is pinned to one core. This module runs a
+configurable number of worker processes (see stt_worker.py), each holding
+its own model. The parent hands each queued job to the next idle worker
+over that worker's pipes, so it always knows which job a worker holds:
+
+    - a worker that dies mid-job fails that job at once (it may be what
+      crashed the worker); one that dies while idle is simply restarted
+    - workers that keep failing are given up on, and queued jobs fail
+      once no healthy worker is left
+    - at most ``max_pending`` jobs are queued or running; callers wait for
+      a slot or are rejected, depending on ``busy`` (backpressure)
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+from . import stt_worker
+from .stt import (
+    DEFAULT_PROFILE,
+    ProfileLatency,
+    SpeechToText,
+    TranscriptionBusyError,
+    audio_seconds,
+    check_profile,
+)
+
+
+class _WorkerCrashed(RuntimeError):
+    """The worker process exited or closed its pipes mid-job."""
+
+
+class _Job:
+    __slots__ = ("job_id", "audio", "sample_rate", "language", "profile", "future")
+
+    def __init__(self, job_id: int, audio: np.ndarray, sample_rate: int, language: str,
+                 profile: str, future: asyncio.Future):
+        self.job_id = job_id
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.language = language
+        self.profile = profile
+        self.future = future
+
+
+class _WorkerState:
+    """Health bookkeeping for one worker process (parent side)."""
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.exited: Optional[asyncio.Future] = None
+        self.task: Optional[asyncio.Task] = None
+        self.pid: Optional[int] = None
+        self.state = "starting"  # starting | idle | busy | dead | failed
+        self.current_job: Optional[int] = None
+        self.jobs_completed = 0
+        self.errors = 0
+        self.restarts = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.last_seen = time.time()
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    def to_dict(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "pid": self.pid,
+            "state": self.state,
+            "current_job": self.current_job,
+            "jobs_completed": self.jobs_completed,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+            "last_seen_seconds_ago": round(time.time() - self.last_seen, 1),
+        }
+
+
+class TranscriptionPool:
+    """
+    Pool of Whisper worker processes fed from one job queue.
+
+    Exposes the same ``transcribe`` / ``transcribe_file`` coroutines as
+    ``SpeechToText`` so callers can use either interchangeably.
+
+    Attributes:
+        model_name: Whisper model loaded by every worker
+        num_workers: Number of worker processes
+        max_pending: Maximum queued + running jobs before new work waits
+            or is rejected
+
+    Example:
+        >>> pool = TranscriptionPool(model_name="base.en", num_workers=4)
+        >>> await pool.start()
+        >>> result = await pool.transcribe(audio_data)
+        >>> print(result['text'])
+    """
+
+    MAX_CONSECUTIVE_FAILURES = 3
+
+    def __init__(
+        self,
+        model_name: str = "base.en",
+        num_workers: int = 2,
+        max_pending: int = 32,
+        job_timeout: float = 300.0,
+        quantize: str = "none",
+    ):
+        """
+        Initialize the pool (workers are spawned by ``start()``).
+
+        Args:
+            model_name: Whisper model each worker loads
+            num_workers: Number of worker processes (>= 1)
+            max_pending: Backpressure limit on queued + running jobs
+            job_timeout: Seconds before an unanswered job is failed (and a
+                worker still running it is killed)
+            quantize: Weight quantization mode each worker loads with
+        """
+        if model_name not in SpeechToText.SUPPORTED_MODELS:
+            raise ValueError(
+                f"Unknown model: {model_name}. "
+                f"Supported: {SpeechToText.SUPPORTED_MODELS}"
+            )
+        if num_workers < 1:
+            raise ValueError("num_workers must be >= 1")
+
+        self.model_name = model_name
+        self.num_workers = num_workers
+        self.max_pending = max_pending
+        self.job_timeout = job_timeout
+        self.quantize = quantize
+
+        self._workers: Dict[int, _WorkerState] = {}
+        self._jobs: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._job_ids = itertools.count(1)
+        self._running = False
+        self._torch_threads = max(1, (os.cpu_count() or 1) // num_workers)
+        self.profile_latency = ProfileLatency()
+
+    async def start(self) -> None:
+        """Start one task per worker; each spawns and supervises its process."""
+        if self._running:
+            return
+        self._jobs = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._running = True
+
+        for worker_id in range(self.num_workers):
+            worker = self._workers[worker_id] = _WorkerState(worker_id)
+            worker.task = asyncio.create_task(self._supervise(worker))
+        print(
+            f"[STT] Worker pool started: {self.num_workers} x {self.model_name} "
+            f"({self._torch_threads} threads each)"
+        )
+
+    async def stop(self) -> None:
+        """Stop all workers and fail any jobs still pending."""
+        if not self._running:
+            return
+        self._running = False
+        for worker in self._workers.values():
+            worker.task.cancel()
+            await asyncio.gather(worker.task, return_exceptions=True)
+            await self._close_process(worker)
+            worker.state = "dead"
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Transcription pool stopped"))
+        self._pending.clear()
+        print("[STT] Worker pool stopped")
+
+    # ------------------------------------------------------------------
+    # Worker supervision
+    # ------------------------------------------------------------------
+
+    async def _spawn_worker(self, worker: _WorkerState) -> bool:
+        """Start the worker's process and wait for its model to load."""
+        worker.state = "starting"
+        worker.current_job = None
+        # Run the worker as a script, like piper_worker: a multiprocessing
+        # child would import this package into every Whisper process
+        try:
+            worker.process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(stt_worker.__file__), self.model_name,
+                "--quantize", self.quantize, "--threads", str(self._torch_threads),
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            )
+        except OSError as e:
+            self._failed(worker, f"could not start: {e}")
+            print(f"[STT] Worker {worker.worker_id} {worker.last_error}")
+            return False
+        worker.pid = worker.process.pid
+        worker.exited = asyncio.ensure_future(worker.process.wait())
+        worker.last_seen = time.time()
+        try:
+            header = await asyncio.wait_for(self._read_header(worker), self.job_timeout)
+        except (_WorkerCrashed, asyncio.TimeoutError) as e:
+            header = {"ok": False, "error": str(e) or "timed out loading the model"}
+        if not header.get("ok"):
+            self._failed(worker, header.get("error", "failed to start"))
+            print(f"[STT] Worker {worker.worker_id} failed to load model: {worker.last_error}")
+            await self._close_process(worker)
+            return False
+        worker.state = "idle"
+        worker.pid = header.get("pid", worker.pid)
+        worker.consecutive_failures = 0
+        worker.last_seen = time.time()
+        return True
+
+    async def _supervise(self, worker: _WorkerState) -> None:
+        """Keep one worker alive and feed it jobs, one at a time."""
+        while self._running:
+            if not worker.is_alive:
+                if worker.consecutive_failures >= self.MAX_CONSECUTIVE_FAILURES:
+                    worker.state = "failed"
+                    self._fail_queued_if_unserved()
+                    return
+                if worker.process is not None:
+                    worker.restarts += 1
+                    print(f"[STT] Restarting worker {worker.worker_id}")
+                await self._spawn_worker(worker)
+                continue
+
+            getter = asyncio.ensure_future(self._jobs.get())
+            try:
+                await asyncio.wait({getter, worker.exited}, return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                getter.cancel()
+                raise
+            if not getter.done():
+                # Died while idle: nothing was lost, just restart it
+                getter.cancel()
+                self._failed(worker, f"exited with code {worker.process.returncode}")
+                print(f"[STT] Worker {worker.worker_id} died ({worker.last_error})")
+                continue
+            job = getter.result()
+            if job.future.done():
+                continue  # the caller gave up while it was queued
+            if not worker.is_alive:
+                self._jobs.put_nowait(job)
+                continue
+            await self._run_job(worker, job)
+
+    async def _run_job(self, worker: _WorkerState, job: _Job) -> None:
+        worker.state = "busy"
+        worker.current_job = job.job_id
+        try:
+            result = await asyncio.wait_for(self._roundtrip(worker, job), self.job_timeout)
+        except _WorkerCrashed as e:
+            # Fail (rather than retry) the job it was running: it may be
+            # what crashed the worker.
+            self._failed(worker, str(e))
+            print(f"[STT] Worker {worker.worker_id} died ({worker.last_error})")
+            self._settle(job, error=RuntimeError(f"Transcription worker {worker.worker_id} crashed"))
+            return
+        except asyncio.TimeoutError:
+            self._failed(worker, f"job {job.job_id} timed out")
+            await self._close_process(worker)
+            self._settle(job, error=RuntimeError(
+                f"Transcription timed out after {self.job_timeout:.0f}s"
+            ))
+            return
+        except asyncio.CancelledError:
+            # The reply is still in flight; the pipe can't be reused
+            await self._close_process(worker)
+            raise
+        finally:
+            worker.current_job = None
+        worker.last_seen = time.time()
+        worker.state = "idle"
+        if isinstance(result, Exception):
+            worker.errors += 1
+            worker.last_error = str(result)
+            self._settle(job, error=result)
+        else:
+            worker.jobs_completed += 1
+            self._settle(job, result=result)
+
+    async def _roundtrip(self, worker: _WorkerState, job: _Job) -> Union[dict, Exception]:
+        """Send one job and read its answer (an Exception if the worker reported one)."""
+        audio = np.ascontiguousarray(job.audio, dtype=np.float32)
+        header = {
+            "samples": len(audio),
+            "sample_rate": job.sample_rate,
+            "language": job.language,
+            "profile": job.profile,
+        }
+        try:
+            worker.process.stdin.write(json.dumps(header).encode("utf-8") + b"\n")
+            worker.process.stdin.write(audio.tobytes())
+            await worker.process.stdin.drain()
+            reply = await self._read_header(worker)
+            if not reply.get("ok"):
+                return RuntimeError(reply.get("error", "transcription failed"))
+            payload = await worker.process.stdout.readexactly(reply["bytes"])
+        except (BrokenPipeError, ConnectionResetError, asyncio.IncompleteReadError) as e:
+            await worker.exited
+            raise _WorkerCrashed(f"exited with code {worker.process.returncode}") from e
+        return json.loads(payload)
+
+    async def _read_header(self, worker: _WorkerState) -> dict:
+        line = await worker.process.stdout.readline()
+        if not line:
+            await worker.exited
+            raise _WorkerCrashed(f"exited with code {worker.process.returncode}")
+        return json.loads(line)
+
+    def _failed(self, worker: _WorkerState, error: str) -> None:
+        worker.state = "dead"
+        worker.errors += 1
+        worker.consecutive_failures += 1
+        worker.last_error = error
+
+    async def _close_process(self, worker: _WorkerState) -> None:
+        """Let the worker exit at end of input, killing it if it doesn't."""
+        process = worker.process
+        if process is None or process.returncode is not None:
+            return
+        process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), 5.0)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    def _fail_queued_if_unserved(self) -> None:
+        """Fail queued jobs once every worker has been given up on."""
+        if self.healthy_workers:
+            return
+        error = RuntimeError("No healthy transcription workers available")
+        while not self._jobs.empty():
+            self._settle(self._jobs.get_nowait(), error=error)
+
+    def _settle(self, job: _Job, result: Optional[dict] = None, error: Optional[Exception] = None) -> None:
+        if job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def transcribe(
+        self,
+        audio_data: Union[bytes, np.ndarray],
+        sample_rate: int = 16000,
+        language: str = "en",
+        busy: str = "wait",
+        profile: str = DEFAULT_PROFILE,
+    ) -> dict:
+        """
+        Transcribe audio on the next free worker.
+
+        Args:
+            audio_data: Audio as raw bytes (float32) or numpy array
+            sample_rate: Audio sample rate in Hz
+            language: Language code for transcription
+            busy: "wait" waits for one of the max_pending slots, "reject"
+                raises instead when none is free, and "skip" raises unless a
+                worker is idle
+            profile: Decoding profile, as for SpeechToText.transcribe()
+
+        Returns:
+            Transcription result dict (same shape as SpeechToText.transcribe)
+
+        Raises:
+            TranscriptionBusyError: If busy isn't "wait" and the pool is at
+                capacity
+            RuntimeError: If the pool has no live workers or the job fails
+        """
+        check_profile(profile)
+        if not self._running:
+            await self.start()
+        if not self.healthy_workers:
+            raise RuntimeError("No healthy transcription workers available")
+        if busy == "skip" and not any(w.state == "idle" for w in self._workers.values()):
+            raise TranscriptionBusyError("All transcription workers are busy")
+        if busy != "wait" and self.is_queue_full():
+            raise TranscriptionBusyError(
+                f"Transcription queue full ({self.max_pending} pending)"
+            )
+
+        if isinstance(audio_data, bytes):
+            audio_array = np.frombuffer(audio_data, dtype=np.float32)
+        else:
+            audio_array = np.asarray(audio_data, dtype=np.float32)
+
+        submitted_at = time.perf_counter()
+        async with self._slots:
+            job_id = next(self._job_ids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[job_id] = future
+            self._jobs.put_nowait(_Job(job_id, audio_array, sample_rate, language, profile, future))
+            try:
+                result = await asyncio.wait_for(future, timeout=self.job_timeout)
+            finally:
+                self._pending.pop(job_id, None)
+        # Workers don't report timing, so record end-to-end latency
+        self.profile_latency.record(
+            profile,
+            (time.perf_counter() - submitted_at) * 1000,
+            audio_seconds(audio_array, sample_rate),
+        )
+        return result
+
+    async def transcribe_file(
+        self,
+        file_path: str,
+        language: str = "en",
+        busy: str = "wait",
+        profile: str = DEFAULT_PROFILE,
+    ) -> dict:
+        """
+        Transcribe audio from a file on the next free worker.
+
+        The file is decoded in the parent so workers only ever see PCM.
+        """
+        if sf is None:
+            raise RuntimeError("soundfile is required for file transcription")
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Audio file not found: {file_path}")
+
+        audio_array, sample_rate = await asyncio.to_thread(
+            SpeechToText.read_file, file_path
+        )
+        return await self.transcribe(
+            audio_data=audio_array, sample_rate=sample_rate, language=language,
+            busy=busy, profile=profile,
+        )
+
+    def is_queue_full(self) -> bool:
+        """Check if new work would be rejected by backpressure."""
+        return len(self._pending) >= self.max_pending
+
+    @property
+    def healthy_workers(self) -> List[int]:
+        """IDs of workers that are starting, idle, or busy."""
+        return [
+            w.worker_id for w in self._workers.values()
+            if w.state in ("starting", "idle", "busy")
+        ]
+
+    def status(self) -> dict:
+        """Pool-level and per-worker health snapshot."""
+        return {
+            "backend": "pool",
+            "model": self.model_name,
+            "quantize": self.quantize,
+            "running": self._running,
+            "num_workers": self.num_workers,
+            "healthy_workers": len(self.healthy_workers),
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "workers": [w.to_dict() for w in self._workers.values()],
+            "profiles": self.profile_latency.to_dict(),
+        }
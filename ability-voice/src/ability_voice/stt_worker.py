@@ -0,0 +1,107 @@
+"""
+Whisper worker process for ``TranscriptionPool``.
+
+The worker is started as a script (``python stt_worker.py base.en``), not
+through ``multiprocessing``: a spawned child imports the module its target
+lives in, and with it this package's ``__init__`` (broker client,
+PortAudio, the phrase cache and wake word templates), none of which a
+Whisper worker needs and any of which can stop it from starting. Only
+``stt.py`` and its two helpers are loaded here.
+
+Protocol (one request at a time, over stdin/stdout):
+    -> {"samples": N, "sample_rate": 16000, "language": "en",
+        "profile": "balanced"} + N float32 samples
+    <- {"ok": true, "bytes": M} + M bytes of the JSON result
+    <- {"ok": false, "error": "..."}
+After loading the model the worker announces itself with
+{"ok": true, "ready": true, "pid": ...}. It exits at end of input.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import types
+
+import numpy as np
+
+
+def _plain(value):
+    """JSON fallback for numpy scalars and arrays in Whisper results."""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def encode_result(result: dict) -> bytes:
+    """Serialize a transcription dict for the pipe."""
+    return json.dumps(result, default=_plain).encode("utf-8")
+
+
+def _import_stt():
+    """Import stt.py as part of the package without running its ``__init__``."""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    name = os.path.basename(package_dir)
+    package = types.ModuleType(name)
+    package.__path__ = [package_dir]
+    sys.modules[name] = package
+    return importlib.import_module(f"{name}.stt")
+
+
+def _serve(model_name: str, quantize: str, threads: int) -> int:
+    """Worker side: load the model once, then answer requests from stdin."""
+    out = sys.stdout.buffer
+    sys.stdout = sys.stderr  # the engine's log lines must not corrupt the protocol
+    stdin = sys.stdin.buffer
+
+    def send(header: dict, payload: bytes = b"") -> None:
+        out.write(json.dumps(header).encode("utf-8") + b"\n")
+        out.write(payload)
+        out.flush()
+
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+
+    try:
+        stt = _import_stt()
+        engine = stt.SpeechToText(model_name=model_name, quantize=quantize)
+        asyncio.run(engine.load())
+    except Exception as e:
+        send({"ok": False, "error": f"Could not load model {model_name}: {e}"})
+        return 1
+    send({"ok": True, "ready": True, "pid": os.getpid()})
+
+    for line in stdin:
+        try:
+            request = json.loads(line)
+            audio = np.frombuffer(bytearray(stdin.read(request["samples"] * 4)), dtype=np.float32)
+        except (ValueError, KeyError) as e:
+            send({"ok": False, "error": f"Bad request: {e}"})
+            return 1  # the stream is out of step; let the parent restart us
+        try:
+            result = engine.transcribe_sync(
+                audio, sample_rate=request["sample_rate"],
+                language=request["language"], profile=request["profile"],
+            )
+            payload = encode_result(result)
+        except Exception as e:
+            send({"ok": False, "error": str(e)})
+            continue
+        send({"ok": True, "bytes": len(payload)}, payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.pop(0)  # keep sibling modules from shadowing top-level ones
+    parser = argparse.ArgumentParser(description="Resident Whisper transcription worker")
+    parser.add_argument("model_name")
+    parser.add_argument("--quantize", default="none")
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(_serve(args.model_name, args.quantize, args.threads))
@@ -3,22 +3,78 @@ Text-to-Speech Module using Piper on Jetson.
 
 This module provides fast, offline text-to-speech synthesis using the
 Piper TTS engine, which is optimized for edge devices like the Jetson.
+
+When the piper-tts Python package is installed, synthesis runs in a
+resident worker process that keeps the voice loaded (see piper_worker.py).
+Otherwise each call falls back to spawning the piper CLI.
 """
 
 import os
+import re
+from collections import deque
 import subprocess
 import tempfile
 import asyncio
 from pathlib import Path
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Tuple
 
 import numpy as np
 
+from .piper_worker import PiperWorker
+from .tts_cache import PhraseCache, phrase_key
+
 try:
     import soundfile as sf
 except ImportError:
     sf = None
 
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\s*\n+\s*")
+_CLAUSE_BREAK = re.compile(r"(?<=[,;:])\s+")
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "e.g.", "i.e."}
+
+
+def _pack(parts: List[str], max_chars: int) -> List[str]:
+    """Greedily join parts with spaces into pieces of at most max_chars."""
+    pieces, current = [], ""
+    for part in parts:
+        if current and len(current) + 1 + len(part) > max_chars:
+            pieces.append(current)
+            current = part
+        else:
+            current = f"{current} {part}" if current else part
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_sentences(text: str, max_chars: int = 250) -> List[str]:
+    """
+    Split text into sentence-sized pieces for streamed synthesis.
+    
+    Sentences longer than ``max_chars`` are split further at clause
+    punctuation, then at word boundaries, so no single piece holds up the
+    start of playback for long.
+    """
+    sentences: List[str] = []
+    for sentence in _SENTENCE_BREAK.split(text.strip()):
+        if not sentence:
+            continue
+        if sentences and sentences[-1].rsplit(None, 1)[-1].lower() in _ABBREVIATIONS:
+            sentences[-1] += " " + sentence  # "Dr. Smith" is one sentence
+        else:
+            sentences.append(sentence)
+    
+    pieces = []
+    for sentence in sentences:
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        parts = []
+        for clause in _CLAUSE_BREAK.split(sentence):
+            parts.extend(clause.split() if len(clause) > max_chars else [clause])
+        pieces.extend(_pack(parts, max_chars))
+    return pieces
+
 
 class TextToSpeech:
     """
@@ -29,7 +85,8 @@ class TextToSpeech:
     
     Attributes:
         voice: Name of the voice model (e.g., 'en_US-lessac-medium')
-        piper_path: Path to the piper executable
+        piper_path: Path to the piper executable, or "piper-python" for
+            the resident worker
         
     Example:
         >>> tts = TextToSpeech(voice="en_US-lessac-medium")
@@ -53,7 +110,11 @@ class TextToSpeech:
         self,
         voice: Optional[str] = None,
         piper_path: Optional[str] = None,
-        voices_dir: Optional[Path] = None
+        voices_dir: Optional[Path] = None,
+        use_cuda: bool = False,
+        cache: Optional[PhraseCache] = None,
+        workers: int = 1,
+        sentence_silence: float = 0.2
     ):
         """
         Initialize the TTS engine.
@@ -62,6 +123,11 @@ class TextToSpeech:
             voice: Voice model name (default: en_US-lessac-medium)
             piper_path: Path to piper executable (auto-detected if None)
             voices_dir: Directory containing voice models
+            use_cuda: Run the resident voice on CUDA
+            cache: Phrase cache consulted before synthesizing (None = off)
+            workers: Resident Piper processes; long texts are split at
+                sentence boundaries and synthesized across all of them
+            sentence_silence: Seconds of silence between sentences
         """
         self.voice = voice or self.DEFAULT_VOICE
         self.voices_dir = Path(voices_dir) if voices_dir else self.VOICES_DIR
@@ -70,8 +136,29 @@ class TextToSpeech:
         # Validate setup
         self._validate_setup()
         
+        self.cache = cache
+        self.sentence_silence = sentence_silence
+        self._workers: List[PiperWorker] = []
+        if self.piper_path == "piper-python":
+            workers = max(1, workers)
+            # Workers start on first use; share the cores instead of each
+            # runtime spinning up a thread per core
+            threads = max(1, (os.cpu_count() or 1) // workers) if workers > 1 else 0
+            self._workers = [
+                PiperWorker(self.model_path, self.config_path, use_cuda=use_cuda, threads=threads)
+                for _ in range(workers)
+            ]
+        self._next_worker = 0
+        
     def _find_piper(self) -> str:
-        """Find the piper executable."""
+        """Find the piper library (resident worker) or executable."""
+        # The library keeps the voice loaded between calls; prefer it
+        try:
+            from piper import PiperVoice
+            return "piper-python"
+        except ImportError:
+            pass
+        
         # Check common locations
         locations = [
             "/usr/local/bin/piper",
@@ -105,14 +192,6 @@ class TextToSpeech:
         if venv_piper.exists() and os.access(str(venv_piper), os.X_OK):
             print(f"[TTS] Found piper in venv: {venv_piper}")
             return str(venv_piper)
-        
-        # Try piper-tts Python package as last resort (may have issues)
-        try:
-            from piper import PiperVoice
-            print("[TTS] Warning: Using piper-python library (CLI not found)")
-            return "piper-python"  # Use Python library instead
-        except ImportError:
-            pass
             
         raise RuntimeError(
             "Piper executable not found.\n"
@@ -168,7 +247,7 @@ class TextToSpeech:
             
         Returns:
             dict with keys:
-                - audio: Audio samples as list of floats
+                - audio: Audio samples as a float32 numpy array
                 - sample_rate: Audio sample rate (typically 22050)
                 - duration_seconds: Duration of generated audio
                 
@@ -178,34 +257,170 @@ class TextToSpeech:
         text = text.strip()
         if not text:
             return {
-                "audio": [],
+                "audio": np.zeros(0, dtype=np.float32),
                 "sample_rate": 22050,
                 "duration_seconds": 0.0
             }
         
-        print(f"[TTS] Synthesizing: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+        params = (speaker_id, length_scale, noise_scale, noise_w)
+        pieces = split_sentences(text) if len(self._workers) > 1 else [text]
+        print(f"[TTS] Synthesizing: '{text[:50]}{'...' if len(text) > 50 else ''}'"
+              + (f" ({len(pieces)} pieces)" if len(pieces) > 1 else ""))
+        if len(pieces) > 1:
+            results: List[Tuple[np.ndarray, int]] = [None] * len(pieces)
+            queue = iter(enumerate(pieces))
+            
+            async def drain(worker: PiperWorker) -> None:
+                # Each worker takes the next piece as soon as it frees up
+                for i, piece in queue:
+                    results[i] = await self._synthesize_pcm(piece, *params, worker=worker)
+            
+            await asyncio.gather(*(drain(worker) for worker in self._workers))
+            sample_rate = results[0][1]
+            pcm = self._join([r[0] for r in results], sample_rate)
+        else:
+            pcm, sample_rate = await self._synthesize_pcm(text, *params)
         
-        # Create temp file for output
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            output_path = f.name
+        result = self._to_result(pcm, sample_rate)
+        print(f"[TTS] Generated {result['duration_seconds']:.2f}s of audio")
+        return result
+    
+    async def _synthesize_pcm(
+        self,
+        text: str,
+        speaker_id: int,
+        length_scale: float,
+        noise_scale: float,
+        noise_w: float,
+        worker: Optional[PiperWorker] = None
+    ) -> Tuple[np.ndarray, int]:
+        """Synthesize one piece (or fetch it from the cache) as int16 PCM."""
+        key = None
+        if self.cache is not None:
+            key = phrase_key(
+                self.voice, text, speaker_id, length_scale, noise_scale, noise_w,
+                self.sentence_silence,
+            )
+            cached = self.cache.get(key, disk=False)
+            if cached is None:
+                # A disk hit decodes FLAC; keep it off the event loop like put()
+                cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
         
-        try:
-            if self.piper_path == "piper-python":
-                # Use Python library
-                return await self._synthesize_python(
-                    text, speaker_id, length_scale, noise_scale, noise_w
-                )
-            else:
-                # Use piper executable
-                return await self._synthesize_cli(
+        if self._workers:
+            pcm, sample_rate = await (worker or self._pick_worker()).synthesize(
+                text,
+                speaker_id=speaker_id,
+                length_scale=length_scale,
+                noise_scale=noise_scale,
+                noise_w=noise_w,
+                sentence_silence=self.sentence_silence,
+            )
+        else:
+            # Create temp file for output
+            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+                output_path = f.name
+            try:
+                pcm, sample_rate = await self._synthesize_cli(
                     text, output_path, speaker_id,
                     length_scale, noise_scale, noise_w
                 )
-                
+            finally:
+                # Clean up temp file
+                if os.path.exists(output_path):
+                    os.unlink(output_path)
+        
+        if key is not None:
+            # FLAC encoding for the disk tier stays off the event loop
+            await asyncio.to_thread(self.cache.put, key, pcm, sample_rate)
+        return pcm, sample_rate
+    
+    def _pick_worker(self) -> PiperWorker:
+        """An idle worker if there is one, otherwise the next in turn."""
+        for worker in self._workers:
+            if not worker.is_busy():
+                return worker
+        worker = self._workers[self._next_worker % len(self._workers)]
+        self._next_worker += 1
+        return worker
+    
+    def _join(self, pieces: List[np.ndarray], sample_rate: int) -> np.ndarray:
+        """Concatenate pieces with sentence_silence between them."""
+        silence = np.zeros(int(sample_rate * self.sentence_silence), dtype=np.int16)
+        parts = []
+        for pcm in pieces:
+            if parts and len(silence):
+                parts.append(silence)
+            parts.append(pcm)
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int16)
+    
+    @staticmethod
+    def _to_result(pcm: np.ndarray, sample_rate: int) -> dict:
+        """Build a synthesize() result from int16 PCM."""
+        audio_float = np.empty(len(pcm), dtype=np.float32)
+        np.multiply(pcm, 1 / 32768.0, out=audio_float, casting="unsafe")
+        return {
+            "audio": audio_float,
+            "sample_rate": sample_rate,
+            "duration_seconds": len(pcm) / sample_rate
+        }
+    
+    async def warm_cache(self, phrases: List[str], **kwargs) -> int:
+        """
+        Make sure phrases are in the phrase cache.
+        
+        Phrases already on disk are only read back into memory.
+        
+        Args:
+            phrases: Texts to synthesize
+            **kwargs: Synthesis parameters, as for synthesize()
+            
+        Returns:
+            Number of phrases cached
+        """
+        if self.cache is None:
+            return 0
+        for phrase in phrases:
+            await self.synthesize(phrase, **kwargs)
+        return len(phrases)
+    
+    async def synthesize_stream(
+        self,
+        text: str,
+        speaker_id: int = 0,
+        length_scale: float = 1.0,
+        noise_scale: float = 0.667,
+        noise_w: float = 0.8,
+        max_chars: int = 250
+    ) -> AsyncIterator[dict]:
+        """
+        Synthesize text one sentence at a time.
+        
+        Yields one result dict (see synthesize) per piece from
+        split_sentences, in order, so playback can start while the rest
+        of the text is still being synthesized. With several workers, up
+        to one piece per worker is synthesized ahead of the consumer.
+        Every piece after the first starts with sentence_silence.
+        """
+        params = (speaker_id, length_scale, noise_scale, noise_w)
+        pieces = split_sentences(text, max_chars)
+        ahead = max(1, len(self._workers))
+        tasks = deque()
+        try:
+            for i in range(len(pieces)):
+                # Keep up to one piece per worker in flight
+                while len(tasks) < ahead and i + len(tasks) < len(pieces):
+                    piece = pieces[i + len(tasks)]
+                    tasks.append(asyncio.ensure_future(self._synthesize_pcm(piece, *params)))
+                pcm, sample_rate = await tasks.popleft()
+                if i:
+                    silence = np.zeros(int(sample_rate * self.sentence_silence), dtype=np.int16)
+                    pcm = np.concatenate([silence, pcm])
+                yield self._to_result(pcm, sample_rate)
         finally:
-            # Clean up temp file
-            if os.path.exists(output_path):
-                os.unlink(output_path)
+            for task in tasks:
+                task.cancel()
     
     async def _synthesize_cli(
         self,
@@ -215,8 +430,8 @@ class TextToSpeech:
         length_scale: float,
         noise_scale: float,
         noise_w: float
-    ) -> dict:
-        """Synthesize using piper CLI executable."""
+    ) -> Tuple[np.ndarray, int]:
+        """Synthesize using piper CLI executable; returns (int16 PCM, sample rate)."""
         # Build piper command
         cmd = [
             self.piper_path,
@@ -226,7 +441,8 @@ class TextToSpeech:
             "--speaker", str(speaker_id),
             "--length_scale", str(length_scale),
             "--noise_scale", str(noise_scale),
-            "--noise_w", str(noise_w)
+            "--noise_w", str(noise_w),
+            "--sentence_silence", str(self.sentence_silence)
         ]
         
         # Run piper asynchronously
@@ -247,87 +463,26 @@ class TextToSpeech:
         if sf is None:
             raise RuntimeError("soundfile is required to read audio output")
             
-        audio_array, sample_rate = sf.read(output_path)
-        duration = len(audio_array) / sample_rate
-        
-        print(f"[TTS] Generated {duration:.2f}s of audio")
-        
+        pcm, sample_rate = sf.read(output_path, dtype="int16")
+        return pcm, sample_rate
+    
+    async def close(self) -> None:
+        """Stop the resident worker, if any."""
+        for worker in self._workers:
+            await worker.close()
+    
+    def status(self) -> dict:
+        """Engine mode and resident worker health."""
         return {
-            "audio": audio_array.tolist(),
-            "sample_rate": sample_rate,
-            "duration_seconds": duration
+            "voice": self.voice,
+            "engine": "resident" if self._workers else "cli",
+            "sentence_silence": self.sentence_silence,
+            "workers": [worker.status() for worker in self._workers],
         }
     
-    async def _synthesize_python(
-        self,
-        text: str,
-        speaker_id: int,
-        length_scale: float,
-        noise_scale: float,
-        noise_w: float
-    ) -> dict:
-        """Synthesize using piper-tts Python library."""
-        from piper import PiperVoice
-        import wave
-        import tempfile
-        
-        # Load voice if not cached
-        if not hasattr(self, '_piper_voice') or self._piper_voice is None:
-            print(f"[TTS] Loading Piper voice from {self.model_path}")
-            self._piper_voice = PiperVoice.load(self.model_path)
-        
-        # Use a temp file instead of BytesIO - more reliable with Piper
-        temp_wav_path = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-                temp_wav_path = tmp.name
-            
-            # Synthesize to temp WAV file
-            with wave.open(temp_wav_path, 'wb') as wav_file:
-                self._piper_voice.synthesize(text, wav_file)
-            
-            # Read back the WAV data
-            with wave.open(temp_wav_path, 'rb') as wav_file:
-                sample_rate = wav_file.getframerate()
-                n_frames = wav_file.getnframes()
-                audio_data = wav_file.readframes(n_frames)
-            
-            if n_frames == 0:
-                print(f"[TTS] Warning: Piper produced no audio frames, retrying with fresh voice...")
-                # Reset voice and retry once
-                self._piper_voice = PiperVoice.load(self.model_path)
-                with wave.open(temp_wav_path, 'wb') as wav_file:
-                    self._piper_voice.synthesize(text, wav_file)
-                with wave.open(temp_wav_path, 'rb') as wav_file:
-                    sample_rate = wav_file.getframerate()
-                    n_frames = wav_file.getnframes()
-                    audio_data = wav_file.readframes(n_frames)
-            
-            # Convert to float32
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            audio_float = audio_array.astype(np.float32) / 32768.0
-            
-            duration = len(audio_float) / sample_rate if sample_rate > 0 else 0.0
-            
-            print(f"[TTS] Generated {duration:.2f}s of audio")
-            
-            return {
-                "audio": audio_float.tolist(),
-                "sample_rate": sample_rate,
-                "duration_seconds": duration
-            }
-        except Exception as e:
-            # Reset the voice object on failure - it may be in a bad state
-            print(f"[TTS] Synthesis failed, resetting voice: {e}")
-            self._piper_voice = None
-            raise
-        finally:
-            # Clean up temp file
-            if temp_wav_path and os.path.exists(temp_wav_path):
-                try:
-                    os.unlink(temp_wav_path)
-                except:
-                    pass
+    def is_busy(self) -> bool:
+        """True while any resident worker is synthesizing."""
+        return any(worker.is_busy() for worker in self._workers)
     
     async def synthesize_to_file(
         self,
@@ -351,8 +506,7 @@ class TextToSpeech:
         if sf is None:
             raise RuntimeError("soundfile is required to save audio files")
         
-        audio_array = np.array(result["audio"], dtype=np.float32)
-        sf.write(output_path, audio_array, result["sample_rate"])
+        await asyncio.to_thread(sf.write, output_path, result["audio"], result["sample_rate"])
         
         return {
             "file_path": output_path,
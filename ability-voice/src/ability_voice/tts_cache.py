@@ -0,0 +1,232 @@
+"""
+Phrase cache for synthesized speech.
+
+Agents speak the same confirmations and status phrases over and over, and
+Piper output is deterministic for a given voice, text and set of synthesis
+parameters. ``PhraseCache`` keeps the audio keyed by those inputs:
+
+    - an in-memory LRU tier of int16 PCM bounded by a byte budget
+    - an optional on-disk tier of FLAC files (lossless, about half the size
+      of int16 PCM) capped in total size, oldest-used files removed first
+
+A hit skips synthesis entirely. Phrases listed in a warm-up file are
+synthesized (or read back from disk) at startup.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+
+def phrase_key(
+    voice: str,
+    text: str,
+    speaker_id: int,
+    length_scale: float,
+    noise_scale: float,
+    noise_w: float,
+    sentence_silence: float = 0.0,
+) -> str:
+    """
+    Hash a voice, text and synthesis parameters into a cache key.
+
+    ``sentence_silence`` is part of the key because Piper inserts it
+    between the sentences of a multi-sentence phrase.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(
+        f"{voice}|{speaker_id}|{length_scale:.4f}|{noise_scale:.4f}|{noise_w:.4f}|"
+        f"{sentence_silence:.4f}|".encode()
+    )
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_phrases(path: str) -> List[str]:
+    """Read a warm-up list: one phrase per line, blank lines and # comments ignored."""
+    with open(os.path.expanduser(path), "r", encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+class PhraseCache:
+    """
+    Two-tier LRU cache of synthesized int16 audio.
+
+    Example:
+        >>> cache = PhraseCache(max_bytes=32 << 20, disk_dir="~/.cache/kadi-tts")
+        >>> key = phrase_key("en_US-lessac-medium", "Done.", 0, 1.0, 0.667, 0.8)
+        >>> cache.get(key) or cache.put(key, pcm, 22050)
+
+    ``get`` and ``put`` touch the disk tier, so async callers run them in
+    a thread; ``get(key, disk=False)`` is a memory-only lookup that is
+    safe on the event loop.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 << 20,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 256 << 20,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget for cached PCM
+            disk_dir: Directory for the persistent FLAC tier (None = memory only)
+            disk_max_bytes: Size cap for the disk tier
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = os.path.expanduser(disk_dir) if disk_dir else None
+        if self.disk_dir and sf is None:
+            print("[TTS] soundfile not installed, phrase cache is memory-only")
+            self.disk_dir = None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+        # Statistics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.flac")
+
+    def _disk_files(self) -> List[Tuple[str, int, float]]:
+        """(path, size, last use) of every file in the disk tier."""
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith(".flac"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((path, st.st_size, st.st_mtime))
+        return files
+
+    def get(self, key: str, disk: bool = True) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Return (int16 PCM, sample rate), or None on a miss.
+
+        With ``disk=False`` only the memory tier is checked, and a miss
+        there isn't counted (the caller is expected to retry with the disk).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+        if not disk:
+            return None
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                pcm, sample_rate = sf.read(path, dtype="int16")
+                os.utime(path)  # mtime marks last use for disk eviction
+            except Exception:
+                pcm = None
+            if pcm is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._insert(key, pcm, sample_rate)
+                return pcm, sample_rate
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, pcm: np.ndarray, sample_rate: int) -> None:
+        """Store int16 PCM in both tiers."""
+        pcm = np.asarray(pcm, dtype=np.int16)
+        pcm.setflags(write=False)  # shared by every hit
+        with self._lock:
+            self._insert(key, pcm, sample_rate)
+
+        if self.disk_dir and len(pcm):
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                sf.write(tmp_path, pcm, sample_rate, format="FLAC", subtype="PCM_16")
+                size = os.path.getsize(tmp_path)
+                existed = os.path.exists(path)
+                os.replace(tmp_path, path)  # atomic: readers never see partial files
+            except Exception as e:
+                print(f"[TTS] Phrase cache write failed: {e}")
+                return
+            with self._lock:
+                if not existed:
+                    self._disk_bytes += size
+                over = self._disk_bytes > self.disk_max_bytes
+            if over:
+                self._trim_disk()
+
+    def _insert(self, key: str, pcm: np.ndarray, sample_rate: int) -> None:
+        if pcm.nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[0].nbytes
+        self._entries[key] = (pcm, sample_rate)
+        self._bytes += pcm.nbytes
+        while self._bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def _trim_disk(self) -> None:
+        """Delete least recently used files until the disk tier is 10% under its cap."""
+        files = sorted(self._disk_files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        target = int(self.disk_max_bytes * 0.9)
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            self.disk_evictions += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self) -> dict:
+        """Hit/miss counters and memory and disk usage."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk_dir": self.disk_dir,
+            "disk_bytes": self._disk_bytes,
+            "disk_max_bytes": self.disk_max_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / max(lookups, 1), 3),
+        }
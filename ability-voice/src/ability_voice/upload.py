@@ -0,0 +1,232 @@
+"""
+Audio upload decoding, chunked upload assembly and response encoding.
+
+Raw float32 PCM in base64 costs ~85 KB per second of 16 kHz audio, so a
+30s clip becomes a multi-megabyte broker message. Callers can instead send
+int16 PCM (half the size) or a compressed container (FLAC, Ogg/Vorbis,
+Ogg/Opus), decoded here with soundfile.
+
+Large uploads can also be split across several messages. ``ChunkedUpload``
+appends each chunk into one growing ``bytearray`` (or a preallocated one
+when the total size is announced), so assembly never re-copies the chunks
+received so far, and PCM formats are viewed with ``np.frombuffer`` without
+a final copy.
+
+``encode_audio`` is the inverse of ``decode_audio`` for audio the ability
+sends back, e.g. synthesized speech as int16, FLAC or Opus.
+"""
+
+import io
+import time
+import uuid
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from .resample import to_mono
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+PCM_FORMATS = ("float32", "int16")
+CONTAINER_FORMATS = ("wav", "flac", "ogg", "opus")
+UPLOAD_FORMATS = PCM_FORMATS + CONTAINER_FORMATS
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def decode_audio(data: BytesLike, fmt: str, sample_rate: int) -> Tuple[np.ndarray, int]:
+    """
+    Decode uploaded audio bytes to mono float32 samples.
+
+    Args:
+        data: Encoded audio
+        fmt: One of UPLOAD_FORMATS ("opus" means Ogg/Opus)
+        sample_rate: Rate of PCM data; containers carry their own rate
+
+    Returns:
+        Tuple of (mono float32 array, sample rate)
+
+    Raises:
+        ValueError: If the format is unsupported or the data can't be decoded
+    """
+    if fmt == "float32":
+        if len(data) % 4:
+            raise ValueError("float32 audio length must be a multiple of 4 bytes")
+        return np.frombuffer(data, dtype=np.float32), sample_rate
+    if fmt == "int16":
+        if len(data) % 2:
+            raise ValueError("int16 audio length must be a multiple of 2 bytes")
+        pcm = np.frombuffer(data, dtype=np.int16)
+        audio = np.empty(len(pcm), dtype=np.float32)
+        np.multiply(pcm, 1 / 32768.0, out=audio, casting="unsafe")
+        return audio, sample_rate
+    if fmt in CONTAINER_FORMATS:
+        if sf is None:
+            raise ValueError("soundfile is required to decode compressed audio")
+        try:
+            audio, container_rate = sf.read(io.BytesIO(data), dtype="float32")
+        except Exception as e:
+            raise ValueError(f"Could not decode {fmt} audio: {e}") from e
+        # The container knows its own rate; downmix before any resampling
+        return to_mono(audio), container_rate
+    raise ValueError(f"Unsupported format: {fmt}. Supported: {UPLOAD_FORMATS}")
+
+
+def opus_rate(sample_rate: int) -> int:
+    """The lowest Opus-supported rate that doesn't discard bandwidth."""
+    return next((r for r in OPUS_RATES if r >= sample_rate), OPUS_RATES[-1])
+
+
+def encode_audio(audio: np.ndarray, sample_rate: int, fmt: str) -> bytes:
+    """
+    Encode mono float32 samples for a response.
+
+    Args:
+        audio: Mono float32 samples in [-1, 1]
+        sample_rate: Rate of the samples
+        fmt: One of UPLOAD_FORMATS
+
+    Returns:
+        Encoded bytes
+
+    Raises:
+        ValueError: If the format is unsupported or can't hold the audio
+    """
+    if fmt == "float32":
+        return np.asarray(audio, dtype=np.float32).tobytes()
+    if fmt == "int16":
+        pcm = np.empty(len(audio), dtype=np.int16)
+        np.clip(np.rint(audio * 32768.0), -32768, 32767, out=pcm, casting="unsafe")
+        return pcm.tobytes()
+    if fmt in CONTAINER_FORMATS:
+        if sf is None:
+            raise ValueError("soundfile is required to encode compressed audio")
+        if fmt == "opus" and sample_rate not in OPUS_RATES:
+            raise ValueError(f"Opus supports sample rates {OPUS_RATES}, got {sample_rate}")
+        container, subtype = {
+            "wav": ("WAV", "PCM_16"),
+            "flac": ("FLAC", "PCM_16"),
+            "ogg": ("OGG", "VORBIS"),
+            "opus": ("OGG", "OPUS"),
+        }[fmt]
+        buffer = io.BytesIO()
+        try:
+            sf.write(buffer, audio, sample_rate, format=container, subtype=subtype)
+        except Exception as e:
+            raise ValueError(f"Could not encode {fmt} audio: {e}") from e
+        return buffer.getvalue()
+    raise ValueError(f"Unsupported format: {fmt}. Supported: {UPLOAD_FORMATS}")
+
+
+class ChunkedUpload:
+    """One audio upload arriving as an ordered sequence of chunks."""
+
+    def __init__(
+        self,
+        fmt: str,
+        sample_rate: int,
+        total_bytes: Optional[int] = None,
+        max_bytes: int = 64 << 20,
+    ):
+        if fmt not in UPLOAD_FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}. Supported: {UPLOAD_FORMATS}")
+        if total_bytes is not None and total_bytes > max_bytes:
+            raise ValueError(f"Upload too large ({total_bytes} > {max_bytes} bytes)")
+        self.upload_id = uuid.uuid4().hex[:12]
+        self.format = fmt
+        self.sample_rate = sample_rate
+        self.total_bytes = total_bytes
+        self.max_bytes = max_bytes
+        self._buffer = bytearray(total_bytes or 0)
+        self.received = 0
+        self.chunks = 0
+        self.last_activity = time.time()
+
+    def append(self, index: int, data: BytesLike) -> None:
+        """
+        Add the next chunk.
+
+        Raises:
+            ValueError: If the chunk is out of order or overflows the upload
+        """
+        if index != self.chunks:
+            raise ValueError(f"Expected chunk {self.chunks}, got {index}")
+        end = self.received + len(data)
+        limit = self.total_bytes if self.total_bytes is not None else self.max_bytes
+        if end > limit:
+            raise ValueError(f"Upload exceeds {limit} bytes")
+        if self.total_bytes is not None:
+            self._buffer[self.received:end] = data
+        else:
+            self._buffer += data  # amortized growth, earlier chunks aren't re-copied
+        self.received = end
+        self.chunks += 1
+        self.last_activity = time.time()
+
+    @property
+    def complete(self) -> bool:
+        if self.total_bytes is None:
+            return self.received > 0
+        return self.received == self.total_bytes
+
+    def decode(self) -> Tuple[np.ndarray, int]:
+        """Decode the assembled upload (see ``decode_audio``)."""
+        if not self.complete:
+            raise ValueError(
+                f"Upload incomplete: {self.received} of {self.total_bytes} bytes received"
+            )
+        return decode_audio(memoryview(self._buffer)[:self.received], self.format, self.sample_rate)
+
+    def status(self) -> dict:
+        return {
+            "upload_id": self.upload_id,
+            "format": self.format,
+            "chunks": self.chunks,
+            "received_bytes": self.received,
+            "total_bytes": self.total_bytes,
+            "complete": self.complete,
+        }
+
+
+class UploadRegistry:
+    """
+    Open chunked uploads, keyed by upload ID.
+
+    Uploads idle for longer than ``idle_timeout`` seconds are discarded the
+    next time an upload is started.
+    """
+
+    def __init__(self, idle_timeout: float = 120.0, max_uploads: int = 16, max_bytes: int = 64 << 20):
+        self.idle_timeout = idle_timeout
+        self.max_uploads = max_uploads
+        self.max_bytes = max_bytes
+        self._uploads: Dict[str, ChunkedUpload] = {}
+
+    def _expire(self) -> None:
+        now = time.time()
+        for upload_id, upload in list(self._uploads.items()):
+            if now - upload.last_activity > self.idle_timeout:
+                print(f"[STT] Upload {upload_id} expired")
+                del self._uploads[upload_id]
+
+    def start(self, fmt: str, sample_rate: int, total_bytes: Optional[int] = None) -> ChunkedUpload:
+        """Open a new upload."""
+        self._expire()
+        if len(self._uploads) >= self.max_uploads:
+            raise RuntimeError(f"Too many open uploads ({self.max_uploads})")
+        upload = ChunkedUpload(fmt, sample_rate, total_bytes, max_bytes=self.max_bytes)
+        self._uploads[upload.upload_id] = upload
+        return upload
+
+    def get(self, upload_id: str) -> ChunkedUpload:
+        upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise KeyError(f"Unknown or expired upload: {upload_id}")
+        return upload
+
+    def close(self, upload_id: str) -> None:
+        self._uploads.pop(upload_id, None)
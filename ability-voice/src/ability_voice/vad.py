@@ -0,0 +1,235 @@
+"""
+Voice-activity segmentation for long recordings.
+
+Whisper's cost is dominated by 30s decoding windows, and long recordings
+(meetings, voice notes) are often mostly silence. This module runs a cheap
+WebRTC VAD pass over the audio, keeps only the speech regions (with a
+little padding), packs nearby regions into segments of up to ~30s, and
+transcribes those segments concurrently. Timestamps from each segment are
+mapped back onto the original recording.
+"""
+
+import asyncio
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from .stt import DEFAULT_PROFILE
+
+try:
+    import webrtcvad
+    VAD_AVAILABLE = True
+except ImportError:
+    VAD_AVAILABLE = False
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SIZE = SAMPLE_RATE * FRAME_MS // 1000  # 480 samples
+ENERGY_THRESHOLD = 0.02
+JOIN_GAP = int(0.2 * SAMPLE_RATE)  # silence inserted between joined regions
+
+
+def speech_frames(audio: np.ndarray, aggressiveness: int = 2, vad=None) -> np.ndarray:
+    """
+    Classify each 30ms frame of 16 kHz mono audio as speech or not.
+
+    Uses webrtcvad when installed, otherwise an RMS energy threshold.
+
+    Args:
+        audio: 16 kHz mono float32 samples
+        aggressiveness: webrtcvad mode (0-3) when no ``vad`` is given
+        vad: Existing ``webrtcvad.Vad`` to reuse across calls
+
+    Returns:
+        Boolean array with one entry per complete frame
+    """
+    n_frames = len(audio) // FRAME_SIZE
+    frames = audio[:n_frames * FRAME_SIZE].reshape(n_frames, FRAME_SIZE)
+    if not VAD_AVAILABLE:
+        return np.sqrt(np.mean(frames ** 2, axis=1)) > ENERGY_THRESHOLD
+
+    if vad is None:
+        vad = webrtcvad.Vad(aggressiveness)
+    pcm = (np.clip(frames, -1.0, 1.0) * 32767).astype(np.int16)
+    return np.fromiter(
+        (vad.is_speech(frame.tobytes(), SAMPLE_RATE) for frame in pcm),
+        dtype=bool,
+        count=n_frames,
+    )
+
+
+def speech_regions(
+    flags: np.ndarray,
+    pad_ms: int = 300,
+    min_speech_ms: int = 150,
+    merge_gap_ms: int = 500,
+) -> List[Tuple[int, int]]:
+    """
+    Turn per-frame speech flags into padded (start, end) sample ranges.
+
+    Args:
+        flags: Output of speech_frames()
+        pad_ms: Audio kept either side of each region so words aren't clipped
+        min_speech_ms: Regions shorter than this are treated as noise
+        merge_gap_ms: Regions separated by less than this are joined
+    """
+    if not flags.any():
+        return []
+    # Rising/falling edges of the speech mask
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], flags.astype(np.int8), [0]])))
+    runs = edges.reshape(-1, 2)  # [start_frame, end_frame)
+
+    min_frames = max(1, min_speech_ms // FRAME_MS)
+    pad = pad_ms * SAMPLE_RATE // 1000
+    gap = merge_gap_ms * SAMPLE_RATE // 1000
+    total = len(flags) * FRAME_SIZE
+
+    regions: List[Tuple[int, int]] = []
+    for start_frame, end_frame in runs:
+        if end_frame - start_frame < min_frames:
+            continue
+        start = max(0, start_frame * FRAME_SIZE - pad)
+        end = min(total, end_frame * FRAME_SIZE + pad)
+        if regions and start - regions[-1][1] <= gap:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def pack_segments(
+    regions: List[Tuple[int, int]],
+    max_segment_seconds: float = 29.0,
+) -> List[List[Tuple[int, int]]]:
+    """
+    Greedily group consecutive speech regions into segments of at most
+    ``max_segment_seconds``, counting the ``JOIN_GAP`` of silence placed
+    between joined regions (a single longer region stays whole; Whisper
+    windows it internally).
+    """
+    limit = int(max_segment_seconds * SAMPLE_RATE)
+    segments: List[List[Tuple[int, int]]] = []
+    current: List[Tuple[int, int]] = []
+    current_len = 0
+    for start, end in regions:
+        length = end - start
+        if current and current_len + JOIN_GAP + length > limit:
+            segments.append(current)
+            current, current_len = [], 0
+        if current:
+            current_len += JOIN_GAP
+        current.append((start, end))
+        current_len += length
+    if current:
+        segments.append(current)
+    return segments
+
+
+class _Segment:
+    """Speech regions joined into one clip, plus the map back to the original."""
+
+    JOIN_GAP = JOIN_GAP
+
+    def __init__(self, audio: np.ndarray, regions: List[Tuple[int, int]]):
+        total = sum(e - s for s, e in regions) + self.JOIN_GAP * (len(regions) - 1)
+        self.audio = np.zeros(total, dtype=np.float32)
+        self.spans = []  # (clip_start, clip_end, original_start)
+        pos = 0
+        for start, end in regions:
+            self.audio[pos:pos + end - start] = audio[start:end]
+            self.spans.append((pos, pos + end - start, start))
+            pos += end - start + self.JOIN_GAP
+
+    def to_original(self, t: float) -> float:
+        """Map a time in the joined clip (seconds) to the original recording."""
+        sample = int(t * SAMPLE_RATE)
+        for clip_start, clip_end, original_start in self.spans:
+            if sample < clip_end + self.JOIN_GAP:
+                offset = min(max(sample, clip_start), clip_end) - clip_start
+                return round(float(original_start + offset) / SAMPLE_RATE, 2)
+        clip_start, clip_end, original_start = self.spans[-1]
+        return round(float(original_start + clip_end - clip_start) / SAMPLE_RATE, 2)
+
+
+async def transcribe_with_vad(
+    transcriber,
+    audio: np.ndarray,
+    language: str = "en",
+    aggressiveness: int = 2,
+    profile: str = DEFAULT_PROFILE,
+    max_in_flight: int = 2,
+) -> dict:
+    """
+    Drop silence, then transcribe the remaining speech segments concurrently.
+
+    At most ``max_in_flight`` segments are submitted at a time, so a long
+    recording never floods the backend's queue, and the rest are cancelled
+    as soon as one fails.
+
+    Args:
+        transcriber: Anything with SpeechToText's ``transcribe`` coroutine
+            (engine, batch scheduler or worker pool)
+        audio: 16 kHz mono float32 audio
+        language: Language code
+        aggressiveness: WebRTC VAD aggressiveness (0-3)
+        profile: Decoding profile for every segment
+        max_in_flight: Segments submitted to the transcriber at once (size
+            it to the worker count or batch size)
+
+    Returns:
+        Transcription dict with segments on the original timeline and a
+        ``vad`` summary (speech vs total seconds, segment count)
+    """
+    started = time.perf_counter()
+    flags = await asyncio.to_thread(speech_frames, audio, aggressiveness)
+    regions = speech_regions(flags)
+    packed = pack_segments(regions)
+    segments = [_Segment(audio, group) for group in packed]
+    vad_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    total_seconds = len(audio) / SAMPLE_RATE
+    speech_seconds = float(sum(e - s for s, e in regions)) / SAMPLE_RATE
+    print(
+        f"[STT] VAD: {speech_seconds:.1f}s speech of {total_seconds:.1f}s "
+        f"in {len(segments)} segments"
+    )
+
+    slots = asyncio.Semaphore(max(1, max_in_flight))
+
+    async def run(segment: _Segment) -> dict:
+        async with slots:
+            return await transcriber.transcribe(
+                audio_data=segment.audio, sample_rate=SAMPLE_RATE,
+                language=language, profile=profile,
+            )
+
+    tasks = [asyncio.ensure_future(run(segment)) for segment in segments]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # Nobody will read the other segments' results
+        for task in tasks:
+            task.cancel()
+        raise
+
+    stitched = []
+    for segment, result in zip(segments, results):
+        for seg in result.get("segments", []):
+            stitched.append({
+                "start": segment.to_original(seg.get("start", 0)),
+                "end": segment.to_original(seg.get("end", 0)),
+                "text": seg.get("text", "").strip(),
+            })
+
+    return {
+        "text": " ".join(r.get("text", "").strip() for r in results if r.get("text")).strip(),
+        "language": results[0].get("language", language) if results else language,
+        "segments": stitched,
+        "vad": {
+            "total_seconds": round(total_seconds, 2),
+            "speech_seconds": round(speech_seconds, 2),
+            "segments": len(segments),
+            "vad_ms": vad_ms,
+        },
+    }
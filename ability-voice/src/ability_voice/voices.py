@@ -0,0 +1,197 @@
+"""
+Pool of resident Piper voices.
+
+Multi-persona agents switch voices from one utterance to the next.
+``VoicePool`` loads a ``TextToSpeech`` engine (and its resident Piper
+worker) per voice on first use and keeps up to ``max_resident`` of them.
+When another voice is needed, the least recently used idle voice is
+closed first; a voice leased by a request in progress (a streaming speak
+releases its worker between sentences) is never closed under it. The
+default voice is pinned so warm-up and unqualified
+requests never pay for reloading it.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from .tts import TextToSpeech
+from .tts_cache import PhraseCache
+
+
+class _VoiceEntry:
+    __slots__ = ("engine", "load_ms", "uses", "leases", "loaded_at", "last_used")
+
+    def __init__(self, engine: TextToSpeech, load_ms: float):
+        self.engine = engine
+        self.load_ms = load_ms
+        self.uses = 0
+        self.leases = 0  # requests currently holding the engine
+        self.loaded_at = time.time()
+        self.last_used = 0.0
+
+
+class VoicePool:
+    """
+    Keeps multiple Piper voices resident with LRU eviction.
+
+    Example:
+        >>> pool = VoicePool("en_US-lessac-medium", max_resident=3)
+        >>> async with pool.lease("en_US-amy-medium") as engine:
+        ...     result = await engine.synthesize("Hello!")
+    """
+
+    def __init__(
+        self,
+        default_voice: str,
+        max_resident: int = 3,
+        cache: Optional[PhraseCache] = None,
+        voices_dir: Optional[Path] = None,
+        **engine_options,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            default_voice: Voice used when a request names none (never evicted)
+            max_resident: Voices kept loaded at once
+            cache: Phrase cache shared by every voice (keys include the voice)
+            voices_dir: Directory containing voice models
+            **engine_options: Passed to every TextToSpeech (e.g. workers)
+        """
+        self.default_voice = default_voice
+        self.max_resident = max(1, max_resident)
+        self.cache = cache
+        self.voices_dir = Path(voices_dir) if voices_dir else TextToSpeech.VOICES_DIR
+        self.engine_options = engine_options
+        self._entries: "OrderedDict[str, _VoiceEntry]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    async def get(self, voice: Optional[str] = None) -> TextToSpeech:
+        """
+        Return the engine for ``voice`` (default voice if None), loading it if needed.
+
+        Concurrent requests for a voice that is still loading share the
+        same load.
+
+        Raises:
+            ValueError: If a non-default voice isn't installed
+            RuntimeError: If the default voice or piper is missing
+        """
+        name = voice or self.default_voice
+        entry = self._entries.get(name)
+        if entry is None:
+            installed = Path(name).name == name and (self.voices_dir / f"{name}.onnx").exists()
+            if name != self.default_voice and not installed:
+                raise ValueError(
+                    f"Unknown voice: {name}. Installed: {self.available()}"
+                )
+            if name not in self._loading:
+                self._loading[name] = asyncio.ensure_future(self._load(name))
+            try:
+                entry = await asyncio.shield(self._loading[name])
+            finally:
+                if name in self._loading and self._loading[name].done():
+                    del self._loading[name]
+
+        self._entries.move_to_end(name)
+        entry.uses += 1
+        entry.last_used = time.time()
+        return entry.engine
+
+    @asynccontextmanager
+    async def lease(self, voice: Optional[str] = None) -> AsyncIterator[TextToSpeech]:
+        """
+        Hold the engine for ``voice`` resident until the block exits.
+
+        Use this rather than ``get()`` for anything spanning several
+        synthesis calls.
+
+        Raises:
+            ValueError: If a non-default voice isn't installed
+            RuntimeError: If the default voice or piper is missing
+        """
+        name = voice or self.default_voice
+        while True:
+            engine = await self.get(name)
+            entry = self._entries.get(name)
+            # Another load may have evicted it before this task resumed
+            if entry is not None and entry.engine is engine:
+                break
+        entry.leases += 1
+        try:
+            yield engine
+        finally:
+            entry.leases -= 1
+
+    def peek(self, voice: Optional[str] = None) -> Optional[TextToSpeech]:
+        """Return the engine if the voice is resident, without loading it."""
+        entry = self._entries.get(voice or self.default_voice)
+        return entry.engine if entry is not None else None
+
+    async def _load(self, name: str) -> _VoiceEntry:
+        await self._make_room(keep=name)
+        started = time.perf_counter()
+        # Locating piper and validating the voice touches disk and may
+        # spawn `which`; keep it off the event loop
+        engine = await asyncio.to_thread(
+            TextToSpeech, voice=name, voices_dir=self.voices_dir, cache=self.cache,
+            **self.engine_options,
+        )
+        entry = _VoiceEntry(engine, round((time.perf_counter() - started) * 1000, 1))
+        self._entries[name] = entry
+        self.loads += 1
+        return entry
+
+    async def _make_room(self, keep: str) -> None:
+        """Close idle, unleased LRU voices until one more fits."""
+        for name in list(self._entries):
+            if len(self._entries) < self.max_resident:
+                return
+            entry = self._entries[name]
+            if name in (keep, self.default_voice) or entry.leases or entry.engine.is_busy():
+                continue
+            print(f"[TTS] Evicting voice {name} (LRU)")
+            del self._entries[name]
+            await entry.engine.close()
+            self.evictions += 1
+
+    def available(self) -> list:
+        """Voice models installed in the voices directory."""
+        if not self.voices_dir.exists():
+            return []
+        return sorted(f.stem for f in self.voices_dir.glob("*.onnx"))
+
+    async def close(self) -> None:
+        """Close every resident voice."""
+        entries, self._entries = list(self._entries.values()), OrderedDict()
+        for entry in entries:
+            await entry.engine.close()
+
+    def status(self) -> dict:
+        """Resident voices with load time, use counts and engine health."""
+        return {
+            "default_voice": self.default_voice,
+            "max_resident": self.max_resident,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "voices": [
+                {
+                    "voice": name,
+                    "load_ms": entry.load_ms,
+                    "uses": entry.uses,
+                    "leases": entry.leases,
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                    "busy": entry.engine.is_busy(),
+                    "engine": entry.engine.status(),
+                }
+                for name, entry in self._entries.items()
+            ],
+        }
@@ -12,6 +12,12 @@ from typing import Callable, List, Optional
 import numpy as np
 import sounddevice as sd
 
+from .capture import CaptureBuffer
+from .kws import KeywordSpotter
+from .ring import AudioRing, FrameFlags
+from .stt import TranscriptionBusyError
+from .vad import speech_frames
+
 try:
     import webrtcvad
     VAD_AVAILABLE = True
@@ -21,6 +27,8 @@ except ImportError:
 MIC_SAMPLE_RATE = 16000
 CHUNK_DURATION_MS = 30
 CHUNK_SIZE = int(MIC_SAMPLE_RATE * CHUNK_DURATION_MS / 1000)  # 480 samples
+WAKE_WINDOW_SECONDS = 3.0
+READ_SAMPLES = CHUNK_SIZE * 8  # when behind, catch up 240ms at a time
 
 
 class WakeWordListener:
@@ -29,6 +37,7 @@ class WakeWordListener:
 
     1. Streams audio from the microphone
     2. Continuously transcribes short chunks looking for the wake word
+       (with a keyword spotter, only the windows it flags are transcribed)
     3. When detected, records until silence (pause detection)
     4. Transcribes the full command and emits event
     """
@@ -42,6 +51,13 @@ class WakeWordListener:
         max_recording_seconds: int = 30,
         stt_getter: Callable = None,
         event_emitter: Callable = None,
+        profile: str = "balanced",
+        probe_profile: str = "fast",
+        spotter: Optional[KeywordSpotter] = None,
+        kws_hop_ms: int = 240,
+        command_preroll_ms: int = 500,
+        capture_buffer_seconds: float = 10.0,
+        max_lag_ms: int = 2000,
     ):
         self.wake_word = wake_word.lower().strip()
         self.alternatives = [w.strip() for w in (alternatives or [])]
@@ -50,11 +66,38 @@ class WakeWordListener:
         self.max_recording_seconds = max_recording_seconds
         self._get_stt = stt_getter
         self._emit = event_emitter
+        # Decoding profiles: wake probes are short and disposable, commands
+        # are what the user actually said
+        self.profile = profile
+        self.probe_profile = probe_profile
+        # First stage: only windows the spotter flags are sent to Whisper
+        self.spotter = spotter if spotter is not None and spotter.ready else None
+        self.kws_hop_samples = int(MIC_SAMPLE_RATE * kws_hop_ms / 1000)
+        self._kws_pending = 0
+        # Commands start this far before the wake word boundary, so speech
+        # that follows the wake word without a pause isn't cut
+        self.command_preroll_samples = int(MIC_SAMPLE_RATE * command_preroll_ms / 1000)
+        # The whole stream lives in one preallocated ring: the wake window
+        # and the command are positions in it, not separate buffers
+        self._ring = AudioRing(
+            int(MIC_SAMPLE_RATE * (max_recording_seconds + WAKE_WINDOW_SECONDS))
+            + self.command_preroll_samples
+        )
+        # VAD decision for every 30ms frame of the ring, made once on arrival
+        self._speech = FrameFlags(self._ring.capacity // CHUNK_SIZE + 1)
+
+        # Statistics
+        self.started_at: Optional[float] = None
+        self.probes = 0
+        self.detections = 0
+        self.false_accepts = 0
 
         self.is_listening = False
         self.is_recording_command = False
         self._stop_event = asyncio.Event()
-        self._audio_queue: Optional[asyncio.Queue] = None
+        # Callback thread -> event loop; sized to ride out a slow wake probe
+        self._capture = CaptureBuffer(int(MIC_SAMPLE_RATE * capture_buffer_seconds), MIC_SAMPLE_RATE)
+        self.max_lag_samples = int(MIC_SAMPLE_RATE * max_lag_ms / 1000)
         self._stream = None
         self._listen_task: Optional[asyncio.Task] = None
         self._is_transcribing = False
@@ -70,40 +113,64 @@ class WakeWordListener:
         print(f"[WakeWord] Initialized: '{self.wake_word}'")
 
     def _audio_callback(self, indata, frames, time_info, status):
-        """Callback for sounddevice to receive audio data."""
-        if status:
-            print(f"[WakeWord] Audio status: {status}")
-        if self._audio_queue is not None:
-            try:
-                self._audio_queue.put_nowait(indata.copy())
-            except asyncio.QueueFull:
-                pass
-
-    def _is_speech(self, audio_chunk: np.ndarray) -> bool:
-        """Check if audio chunk contains speech using VAD or energy."""
-        if self.vad is not None:
-            audio_int16 = (audio_chunk * 32767).astype(np.int16)
-            frame_size = 480
-            if len(audio_int16) >= frame_size:
-                frame = audio_int16[:frame_size].tobytes()
-                try:
-                    return self.vad.is_speech(frame, MIC_SAMPLE_RATE)
-                except Exception:
-                    pass
-        energy = np.sqrt(np.mean(audio_chunk ** 2))
-        return energy > 0.02
-
-    def _buffer_has_speech(self, audio_buffer: np.ndarray, threshold: float = 0.2) -> bool:
-        """Check if buffer contains enough speech to be worth transcribing."""
-        frame_size = 480
-        total = len(audio_buffer) // frame_size
-        if total == 0:
-            return False
-        speech_count = sum(
-            1 for i in range(total)
-            if self._is_speech(audio_buffer[i * frame_size:(i + 1) * frame_size])
-        )
-        return (speech_count / total) >= threshold
+        """Callback for sounddevice to receive audio data (PortAudio thread)."""
+        self._capture.write(indata[:, 0], status.input_overflow)
+
+    def _append(self, chunk: np.ndarray) -> None:
+        """Add captured audio to the ring and classify each newly completed frame, once."""
+        self._ring.append(chunk)
+        start = self._speech.total * CHUNK_SIZE
+        end = self._ring.total // CHUNK_SIZE * CHUNK_SIZE
+        if end > start:
+            self._speech.append(speech_frames(self._ring.view(start, end), vad=self.vad))
+
+    def _has_speech(self, start: int, end: Optional[int] = None, threshold: float = 0.2) -> bool:
+        """Check if ring samples [start, end) hold enough speech to be worth transcribing."""
+        end = self._ring.total if end is None else end
+        return self._speech.ratio(-(-start // CHUNK_SIZE), end // CHUNK_SIZE) >= threshold
+
+    def _kws_candidate(self, wake_start: int, new_samples: int) -> Optional[int]:
+        """
+        Run the keyword spotter every hop over the newest window with speech in it.
+
+        Returns:
+            Ring position where the keyword ended, or None if no candidate
+        """
+        self._kws_pending += new_samples
+        window_samples = self.spotter.window_samples
+        window_start = self._ring.total - window_samples
+        if self._kws_pending < self.kws_hop_samples or window_start < wake_start:
+            return None
+        new_seconds = self._kws_pending / MIC_SAMPLE_RATE
+        self._kws_pending = 0
+        if not self._has_speech(window_start):
+            return None
+        window = self._ring.view(window_start)
+        hit, score = self.spotter.detect(window, new_seconds=new_seconds)
+        if not hit:
+            return None
+        print(f"[WakeWord] Keyword candidate (score {score:.3f})")
+        return window_start + self.spotter.last_end
+
+    def stats(self) -> dict:
+        """Capture health, Whisper probe counts and, with a keyword spotter, its cost and false accepts."""
+        hours = (time.time() - self.started_at) / 3600 if self.started_at else 0.0
+        stats = {
+            "first_stage": "kws" if self.spotter is not None else "vad",
+            "whisper_probes": self.probes,
+            "detections": self.detections,
+            "capture": self._capture.status(),
+        }
+        if self.spotter is not None:
+            confirmed = self.false_accepts + self.detections
+            stats.update({
+                "false_accepts": self.false_accepts,
+                # Share of the candidates sent to Whisper that it rejected
+                "false_accept_rate": round(self.false_accepts / confirmed, 3) if confirmed else None,
+                "false_accepts_per_hour": round(self.false_accepts / hours, 2) if hours else None,
+                "kws": self.spotter.status(),
+            })
+        return stats
 
     def _contains_wake_word(self, text: str) -> bool:
         """Check if transcribed text contains the wake word or alternatives."""
@@ -126,7 +193,7 @@ class WakeWordListener:
         if self.is_listening:
             return
         self._stop_event.clear()
-        self._audio_queue = asyncio.Queue(maxsize=100)
+        self._capture.attach(asyncio.get_running_loop())
         self._stream = sd.InputStream(
             samplerate=MIC_SAMPLE_RATE,
             channels=1,
@@ -136,8 +203,10 @@ class WakeWordListener:
         )
         self._stream.start()
         self.is_listening = True
+        self.started_at = time.time()
         self._listen_task = asyncio.create_task(self._listen_loop())
-        print("[WakeWord] Listening started")
+        stage = "keyword spotter + Whisper" if self.spotter else "Whisper"
+        print(f"[WakeWord] Listening started ({stage})")
 
     async def stop(self) -> None:
         """Stop listening."""
@@ -154,55 +223,90 @@ class WakeWordListener:
             except asyncio.CancelledError:
                 pass
             self._listen_task = None
-        self._audio_queue = None
+        self._capture.detach()
         print("[WakeWord] Listening stopped")
 
     async def _listen_loop(self) -> None:
         """Main loop: accumulate audio, check for wake word, record command."""
-        wake_buffer = np.array([], dtype=np.float32)
-        wake_chunk_seconds = 3.0
-        wake_chunk_samples = int(MIC_SAMPLE_RATE * wake_chunk_seconds)
+        ring = self._ring
+        wake_chunk_samples = int(MIC_SAMPLE_RATE * WAKE_WINDOW_SECONDS)
+        wake_start = ring.total  # ring position where the wake window begins
 
         while self.is_listening and not self._stop_event.is_set():
+            # Fell behind (e.g. a slow wake probe): jump back to live audio
+            # instead of scanning ever staler audio
+            if self._capture.backlog > self.max_lag_samples:
+                skipped = self._capture.recover()
+                print(f"[WakeWord] {skipped / MIC_SAMPLE_RATE:.1f}s behind, skipping to live audio")
+                wake_start = ring.total  # don't let a window span the gap
+                self._kws_pending = 0
+
             try:
-                chunk = await asyncio.wait_for(
-                    self._audio_queue.get(), timeout=0.5
-                )
-            except (asyncio.TimeoutError, asyncio.CancelledError):
+                chunk = await self._capture.read(READ_SAMPLES, timeout=0.5)
+            except asyncio.CancelledError:
+                continue
+            if chunk is None:
                 continue
 
-            audio = chunk.flatten()
-            wake_buffer = np.concatenate([wake_buffer, audio])
+            self._append(chunk)
+            wake_start = max(wake_start, ring.total - wake_chunk_samples)
 
-            if len(wake_buffer) < wake_chunk_samples:
-                continue
+            keyword_end = None
+            if self.spotter is not None:
+                keyword_end = self._kws_candidate(wake_start, len(chunk))
+                if keyword_end is None:
+                    continue
+            else:
+                if ring.total - wake_start < wake_chunk_samples:
+                    continue
 
-            # Check for speech before transcribing
-            if not self._buffer_has_speech(wake_buffer):
-                wake_buffer = wake_buffer[-CHUNK_SIZE * 5:]
-                continue
+                # Check for speech before transcribing
+                if not self._has_speech(wake_start):
+                    wake_start = ring.total - CHUNK_SIZE * 5
+                    continue
 
             # Throttle transcription
             now = time.time()
             if self._is_transcribing or (now - self._last_transcription_time) < self._min_transcription_gap:
-                wake_buffer = wake_buffer[-wake_chunk_samples // 2:]
+                wake_start = ring.total - wake_chunk_samples // 2
                 continue
 
             self._is_transcribing = True
+            probe_end = ring.total
             try:
                 stt = await self._get_stt()
+                # Wake probes are disposable: never queue behind other work.
+                # Nothing is appended while we wait, so the view stays valid
                 result = await asyncio.wait_for(
-                    stt.transcribe(audio_data=wake_buffer, sample_rate=MIC_SAMPLE_RATE),
+                    stt.transcribe(
+                        audio_data=ring.view(wake_start, probe_end),
+                        sample_rate=MIC_SAMPLE_RATE,
+                        busy="skip",
+                        profile=self.probe_profile,
+                    ),
                     timeout=self._transcription_timeout,
                 )
                 self._last_transcription_time = time.time()
+                self.probes += 1
                 text = result.get("text", "").strip()
 
                 if text and self._contains_wake_word(text):
                     print(f"[WakeWord] Detected: '{text}'")
+                    self.detections += 1
                     if self._emit:
                         self._emit("voice.wake_word_detected", {"text": text, "wake_word": self.wake_word})
-                    await self._record_command()
+                    # The spotter knows where the keyword ended; otherwise
+                    # the command can only be known to follow the probe
+                    boundary = keyword_end if keyword_end is not None else probe_end
+                    await self._record_command(max(wake_start, boundary - self.command_preroll_samples))
+                elif self.spotter is not None:
+                    # The spotter fired but Whisper heard something else
+                    self.false_accepts += 1
+            except TranscriptionBusyError:
+                # Engine is serving other callers; retry with the next window
+                self._is_transcribing = False
+                wake_start = ring.total - wake_chunk_samples // 2
+                continue
             except asyncio.TimeoutError:
                 print("[WakeWord] Transcription timeout")
             except Exception as e:
@@ -210,43 +314,48 @@ class WakeWordListener:
             finally:
                 self._is_transcribing = False
 
-            wake_buffer = np.array([], dtype=np.float32)
+            wake_start = ring.total
+
+    async def _record_command(self, start: int) -> None:
+        """
+        Record audio after wake word until silence, then transcribe.
 
-    async def _record_command(self) -> None:
-        """Record audio after wake word until silence, then transcribe."""
+        Args:
+            start: Ring position the command starts at (pre-roll included)
+        """
         self.is_recording_command = True
         print("[WakeWord] Recording command...")
         if self._emit:
             self._emit("voice.recording_started", {})
 
-        command_buffer = np.array([], dtype=np.float32)
-        silence_start = None
+        ring = self._ring
+        silent_samples = 0  # counted in audio, not wall time, so a backlog ends on time
+        silence_samples = MIC_SAMPLE_RATE * self.silence_timeout_ms // 1000
         max_samples = MIC_SAMPLE_RATE * self.max_recording_seconds
 
         while self.is_listening and not self._stop_event.is_set():
             try:
-                chunk = await asyncio.wait_for(
-                    self._audio_queue.get(), timeout=0.5
-                )
-            except (asyncio.TimeoutError, asyncio.CancelledError):
+                chunk = await self._capture.read(READ_SAMPLES, timeout=0.5)
+            except asyncio.CancelledError:
+                continue
+            if chunk is None:
                 continue
 
-            audio = chunk.flatten()
-            command_buffer = np.concatenate([command_buffer, audio])
+            self._append(chunk)
 
-            if self._is_speech(audio):
-                silence_start = None
+            if self._speech.count(self._speech.total - max(1, len(chunk) // CHUNK_SIZE)):
+                silent_samples = 0
             else:
-                if silence_start is None:
-                    silence_start = time.time()
-                elif (time.time() - silence_start) * 1000 >= self.silence_timeout_ms:
+                silent_samples += len(chunk)
+                if silent_samples >= silence_samples:
                     print("[WakeWord] Silence detected, ending recording")
                     break
 
-            if len(command_buffer) >= max_samples:
+            if ring.total - start >= max_samples:
                 print("[WakeWord] Max recording length reached")
                 break
 
+        command_buffer = ring.view(start)
         self.is_recording_command = False
 
         if len(command_buffer) < MIC_SAMPLE_RATE * 0.3:
@@ -258,7 +367,8 @@ class WakeWordListener:
         try:
             stt = await self._get_stt()
             result = await stt.transcribe(
-                audio_data=command_buffer, sample_rate=MIC_SAMPLE_RATE
+                audio_data=command_buffer, sample_rate=MIC_SAMPLE_RATE,
+                profile=self.profile,
             )
             text = result.get("text", "").strip()
             print(f"[WakeWord] Command: '{text}'")